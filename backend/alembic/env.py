@@ -4,6 +4,7 @@ import sys # Add this import
 
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
+from sqlalchemy import text
 
 from alembic import context
 
@@ -62,6 +63,46 @@ target_metadata = Base.metadata # Point to your Base.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Options of the run, e.g. `alembic -x lock_timeout=10s -x dry_run=true upgrade head`:
+# - lock_timeout / statement_timeout (PostgreSQL): default MIGRATION_LOCK_TIMEOUT / MIGRATION_STATEMENT_TIMEOUT.
+#   A revision whose DDL waits longer for a lock fails (and is rolled back) instead of
+#   queueing all writes to the table behind it; run it again when the blocker is gone.
+# - dry_run: run the revisions in one transaction that is rolled back, and report the
+#   table locks each one took. Run it against a staging copy: the locks are held until the end.
+x_args = context.get_x_argument(as_dictionary=True)
+lock_timeout = x_args.get("lock_timeout", settings.MIGRATION_LOCK_TIMEOUT)
+statement_timeout = x_args.get("statement_timeout", settings.MIGRATION_STATEMENT_TIMEOUT)
+dry_run = x_args.get("dry_run", "").lower() in ("1", "true", "yes")
+
+# Lock modes that conflict with INSERT/UPDATE/DELETE (RowExclusiveLock)
+WRITE_BLOCKING_LOCKS = {"ShareLock", "ShareRowExclusiveLock", "ExclusiveLock", "AccessExclusiveLock"}
+
+
+def report_locks(ctx, step, heads, run_args) -> None:
+    """`on_version_apply` hook of dry runs: prints the table locks a revision acquired."""
+    if ctx.dialect.name != "postgresql":
+        return
+    seen = ctx.opts.setdefault("reported_locks", set())
+    rows = ctx.connection.execute(text(
+        "SELECT c.relname, l.mode, greatest(c.reltuples, 0)::bigint FROM pg_locks l "
+        "JOIN pg_class c ON c.oid = l.relation JOIN pg_namespace n ON n.oid = c.relnamespace "
+        "WHERE l.pid = pg_backend_pid() AND l.granted AND c.relkind IN ('r', 'p') "
+        "AND n.nspname NOT IN ('pg_catalog', 'information_schema') AND c.relname <> 'alembic_version' "
+        "ORDER BY c.relname, l.mode"
+    )).all()
+    new = [row for row in rows if (row[0], row[1]) not in seen]
+    seen.update((row[0], row[1]) for row in rows)
+    direction = "upgrade" if step.is_upgrade else "downgrade"
+    print(f"-- dry run {direction} {step.up_revision_id}: {len(new)} new table lock(s)")
+    for table, mode, estimated_rows in new:
+        if mode == "AccessExclusiveLock":
+            impact = "blocks reads and writes"
+        elif mode in WRITE_BLOCKING_LOCKS:
+            impact = "blocks writes"
+        else:
+            impact = "does not block writes"
+        print(f"   {table} (~{estimated_rows} rows): {mode}, {impact} until the revision commits")
+
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
@@ -81,11 +122,17 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+        lock_timeout=lock_timeout,
+        statement_timeout=statement_timeout,
         # Include user-defined types for SQLite if necessary, e.g. for JSON
         # render_item=render_item_sqlite,
     )
 
     with context.begin_transaction():
+        if context.get_context().dialect.name == "postgresql":
+            context.execute(f"SET lock_timeout = '{lock_timeout}'")
+            context.execute(f"SET statement_timeout = '{statement_timeout}'")
         context.run_migrations()
 
 
@@ -95,6 +142,12 @@ def run_migrations_online() -> None:
     In this scenario we need to create an Engine
     and associate a connection with the context.
 
+    Every revision runs in its own transaction, so revisions with autocommit
+    blocks (see app/db/migrations.py) don't commit earlier ones half-way, and a
+    revision failing on its lock timeout leaves the ones before it applied.
+    On PostgreSQL the timeouts are set for the session, so they also apply
+    inside autocommit blocks.
+
     """
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}), # Uses sqlalchemy.url from config
@@ -103,15 +156,36 @@ def run_migrations_online() -> None:
     )
 
     with connectable.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(
+                text(
+                    "SELECT set_config('lock_timeout', :lock, false), "
+                    "set_config('statement_timeout', :statement, false)"
+                ),
+                {"lock": lock_timeout, "statement": statement_timeout},
+            )
+            connection.commit()
+        if dry_run:
+            # An outer transaction the revisions run in; Alembic leaves it to us, and we roll it back.
+            connection.begin()
+
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            lock_timeout=lock_timeout,
+            statement_timeout=statement_timeout,
+            dry_run=dry_run,
+            on_version_apply=report_locks if dry_run else (),
             # Include user-defined types for SQLite if necessary
             # render_item=render_item_sqlite,
         )
 
         with context.begin_transaction():
             context.run_migrations()
+        if dry_run:
+            connection.rollback()
+            print("-- dry run: rolled back, nothing was changed")
 
 # Optional: for SQLite, if you use types not natively supported by autogenerate (e.g. JSON)
 # you might need a render_item function. For basic types, this is not usually needed.
@@ -0,0 +1,35 @@
+"""Add row version columns for conditional updates
+
+Revision ID: 5d1e7a9c3b42
+Revises: c247f818f8a0
+Create Date: 2026-10-19 14:03:52.118406
+
+Every table gets `version INTEGER NOT NULL DEFAULT 1`, incremented by each
+UPDATE. It backs the ETags of single rows and the `If-Match` precondition of
+the PATCH endpoints. With a constant default, PostgreSQL adds the column
+without rewriting the table.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d1e7a9c3b42'
+down_revision: Union[str, None] = 'c247f818f8a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'team_members', 'objectives', 'progress_updates')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_column(table, 'version')
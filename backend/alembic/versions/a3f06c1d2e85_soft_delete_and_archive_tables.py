@@ -0,0 +1,153 @@
+"""Partial indexes for active rows and archive tables
+
+Revision ID: a3f06c1d2e85
+Revises: 5d1e7a9c3b42
+Create Date: 2026-10-19 16:40:08.512337
+
+Deletes through the API are now soft (active = false) and reads filter on
+`active`, so the lookup indexes that do not back foreign-key checks of hard
+deletes only cover active rows:
+
+- ix_objectives_owner_id_status
+- ix_team_members_supervisor_id
+- ix_users_team_member_id
+
+ix_progress_updates_objective_id_progress_date also backs the foreign-key
+checks of the archival job and stays complete; it includes `active` instead,
+so the progress aggregation remains an index-only scan on PostgreSQL.
+
+objectives_archive and progress_updates_archive receive the rows moved by the
+archival job (`python -m app.archive`). They reuse the enum types of the
+source tables.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f06c1d2e85'
+down_revision: Union[str, None] = '5d1e7a9c3b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_ROWS_ONLY = {'postgresql_where': sa.text('active'), 'sqlite_where': sa.text('active = 1')}
+
+
+def _enum(*values: str, name: str) -> sa.Enum:
+    return postgresql.ENUM(*values, name=name, create_type=False)
+
+
+def upgrade() -> None:
+    op.drop_index('ix_objectives_owner_id_status', table_name='objectives')
+    op.create_index('ix_objectives_owner_id_status', 'objectives', ['owner_id', 'status'], **ACTIVE_ROWS_ONLY)
+    op.drop_index('ix_team_members_supervisor_id', table_name='team_members')
+    op.create_index('ix_team_members_supervisor_id', 'team_members', ['supervisor_id'], **ACTIVE_ROWS_ONLY)
+    op.drop_index('ix_users_team_member_id', table_name='users')
+    op.create_index('ix_users_team_member_id', 'users', ['team_member_id'], **ACTIVE_ROWS_ONLY)
+    op.drop_index('ix_progress_updates_objective_id_progress_date', table_name='progress_updates')
+    op.create_index(
+        'ix_progress_updates_objective_id_progress_date',
+        'progress_updates',
+        ['objective_id', 'progress_date'],
+        unique=False,
+        postgresql_include=['progress', 'id', 'active'],
+    )
+
+    op.create_table(
+        'objectives_archive',
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column(
+            'level',
+            _enum('ORGANIZATIONAL', 'DEPARTMENTAL', 'TEAM', 'INDIVIDUAL', name='objectivelevel'),
+            nullable=True,
+        ),
+        sa.Column('owner_id', sa.Integer(), nullable=False),
+        sa.Column('parent_objective_id', sa.Integer(), nullable=True),
+        sa.Column(
+            'status',
+            _enum(
+                'NOT_STARTED',
+                'ON_TRACK',
+                'AT_RISK',
+                'DELAYED',
+                'ACHIEVED',
+                'ON_HOLD',
+                'CANCELLED',
+                name='objectivestatus',
+            ),
+            nullable=False,
+        ),
+        sa.Column('priority', _enum('HIGH', 'MEDIUM', 'LOW', name='objectivepriority'), nullable=True),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('target_completion_date', sa.Date(), nullable=False),
+        sa.Column('actual_completion_date', sa.Date(), nullable=True),
+        sa.Column('last_updated_date', sa.DateTime(), nullable=True),
+        sa.Column('alignment_statement', sa.Text(), nullable=True),
+        sa.Column('tags', sa.Text(), nullable=True),
+        sa.Column(
+            'confidentiality',
+            _enum('PUBLIC', 'INTERNAL', 'RESTRICTED', name='objectiveconfidentiality'),
+            nullable=True,
+        ),
+        sa.Column(
+            'strategic_perspective',
+            _enum('FINANCIAL', 'CUSTOMER', 'INTERNAL_PROCESS', 'LEARNING_GROWTH', name='objectivestrategicperspective'),
+            nullable=True,
+        ),
+        sa.Column(
+            'review_cadence',
+            _enum('MONTHLY', 'QUARTERLY', 'BI_ANNUALLY', 'ANNUALLY', name='objectivereviewcadence'),
+            nullable=True,
+        ),
+        sa.Column('last_review_date', sa.Date(), nullable=True),
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_table(
+        'progress_updates_archive',
+        sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('objective_id', sa.Integer(), nullable=False),
+        sa.Column('progress_date', sa.Date(), nullable=False),
+        sa.Column('comment', sa.Text(), nullable=False),
+        sa.Column('progress', sa.Float(), nullable=True),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_progress_updates_archive_objective_id', 'progress_updates_archive', ['objective_id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_progress_updates_archive_objective_id', table_name='progress_updates_archive')
+    op.drop_table('progress_updates_archive')
+    op.drop_table('objectives_archive')
+
+    op.drop_index('ix_progress_updates_objective_id_progress_date', table_name='progress_updates')
+    op.create_index(
+        'ix_progress_updates_objective_id_progress_date',
+        'progress_updates',
+        ['objective_id', 'progress_date'],
+        unique=False,
+        postgresql_include=['progress', 'id'],
+    )
+    op.drop_index('ix_users_team_member_id', table_name='users')
+    op.create_index('ix_users_team_member_id', 'users', ['team_member_id'], unique=False)
+    op.drop_index('ix_team_members_supervisor_id', table_name='team_members')
+    op.create_index('ix_team_members_supervisor_id', 'team_members', ['supervisor_id'], unique=False)
+    op.drop_index('ix_objectives_owner_id_status', table_name='objectives')
+    op.create_index('ix_objectives_owner_id_status', 'objectives', ['owner_id', 'status'], unique=False)
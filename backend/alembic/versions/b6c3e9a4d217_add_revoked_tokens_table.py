@@ -0,0 +1,40 @@
+"""Add revoked_tokens table
+
+Revision ID: b6c3e9a4d217
+Revises: e8b2d4f61a07
+Create Date: 2026-10-19 18:12:40.304518
+
+revoked_tokens persists the entries of the in-process revocation store
+(REVOCATION_BACKEND=memory): used refresh tokens, revoked token families and
+per-user cutoffs. The store loads it at startup and writes every revocation
+through, so a restart no longer makes revoked tokens valid again.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6c3e9a4d217'
+down_revision: Union[str, None] = 'e8b2d4f61a07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('kind', sa.String(length=8), nullable=False),
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('issued_before', sa.Integer(), nullable=True),
+        sa.Column('expires_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'key'),
+    )
+    op.create_index('ix_revoked_tokens_expires_at', 'revoked_tokens', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_revoked_tokens_expires_at', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
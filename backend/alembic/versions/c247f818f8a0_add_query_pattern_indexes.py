@@ -0,0 +1,49 @@
+"""Add indexes for the query patterns of the endpoints
+
+Revision ID: c247f818f8a0
+Revises: 40b72b067046
+Create Date: 2026-10-19 10:12:31.482915
+
+- objectives (owner_id, status): objectives of a team member, per status
+- objectives.parent_objective_id: objective hierarchy, FK checks on delete
+- team_members.supervisor_id: team members by supervisor
+- users.team_member_id: users by team member
+- progress_updates (objective_id, progress_date) INCLUDE (progress, id):
+  updates of an objective in date order and their aggregation; replaces the
+  single-column objective_id index, which is a prefix of it
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c247f818f8a0'
+down_revision: Union[str, None] = '40b72b067046'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_objectives_owner_id_status', 'objectives', ['owner_id', 'status'], unique=False)
+    op.create_index(op.f('ix_objectives_parent_objective_id'), 'objectives', ['parent_objective_id'], unique=False)
+    op.create_index(op.f('ix_team_members_supervisor_id'), 'team_members', ['supervisor_id'], unique=False)
+    op.create_index(op.f('ix_users_team_member_id'), 'users', ['team_member_id'], unique=False)
+    op.create_index(
+        'ix_progress_updates_objective_id_progress_date',
+        'progress_updates',
+        ['objective_id', 'progress_date'],
+        unique=False,
+        postgresql_include=['progress', 'id'],
+    )
+    op.drop_index(op.f('ix_progress_updates_objective_id'), table_name='progress_updates')
+
+
+def downgrade() -> None:
+    op.create_index(op.f('ix_progress_updates_objective_id'), 'progress_updates', ['objective_id'], unique=False)
+    op.drop_index('ix_progress_updates_objective_id_progress_date', table_name='progress_updates')
+    op.drop_index(op.f('ix_users_team_member_id'), table_name='users')
+    op.drop_index(op.f('ix_team_members_supervisor_id'), table_name='team_members')
+    op.drop_index(op.f('ix_objectives_parent_objective_id'), table_name='objectives')
+    op.drop_index('ix_objectives_owner_id_status', table_name='objectives')
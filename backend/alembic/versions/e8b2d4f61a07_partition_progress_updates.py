@@ -0,0 +1,41 @@
+"""Partition progress_updates by progress_date (PostgreSQL)
+
+Revision ID: e8b2d4f61a07
+Revises: a3f06c1d2e85
+Create Date: 2026-10-19 18:05:42.117904
+
+Recreates progress_updates as a table partitioned by RANGE (progress_date),
+one partition per calendar year plus a default partition, and copies the rows
+over; see app/db/partitioning.py. The primary key becomes (id, progress_date),
+as PostgreSQL requires for partitioned tables. The table is locked for the
+duration of the copy.
+
+Other databases keep the plain table; this revision is a no-op there.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db import partitioning
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b2d4f61a07'
+down_revision: Union[str, None] = 'a3f06c1d2e85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    for statement in partitioning.convert_statements():
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+    for statement in partitioning.revert_statements():
+        op.execute(statement)
@@ -1 +1,5 @@
 # This file can be empty, or you can define app-wide configurations or initializations here.
+import time
+
+IMPORT_STARTED = time.perf_counter()
+"""When the `app` package started importing; the startup report measures the import phase from here."""
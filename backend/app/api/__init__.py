@@ -1,9 +1,19 @@
-from fastapi import APIRouter
-from .endpoints import users, team_members, objectives, progress_updates, rewrite_text
+from fastapi import APIRouter, Depends
+from app.core.concurrency import threadpool_slot
+from app.core.rate_limit import login_rate_limit
+from .endpoints import users, team_members, objectives, progress_updates, rewrite_text, metrics, events
+
+# Sync endpoints hold a token of their route group's share of the threadpool (see app/core/concurrency.py);
+# login attempts over their rate limit are rejected before waiting for one (see app/core/rate_limit.py)
+limited = [Depends(login_rate_limit), Depends(threadpool_slot)]
 
 api_router = APIRouter()
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(team_members.router, prefix="/team-members", tags=["team-members"])
-api_router.include_router(objectives.router, prefix="/objectives", tags=["objectives"])
-api_router.include_router(progress_updates.router, prefix="/progress-updates", tags=["progress-updates"])
-api_router.include_router(rewrite_text.router, prefix="/rewrite-text", tags=["rewrite-text"])
+api_router.include_router(users.router, prefix="/users", tags=["users"], dependencies=limited)
+api_router.include_router(team_members.router, prefix="/team-members", tags=["team-members"], dependencies=limited)
+api_router.include_router(objectives.router, prefix="/objectives", tags=["objectives"], dependencies=limited)
+api_router.include_router(
+    progress_updates.router, prefix="/progress-updates", tags=["progress-updates"], dependencies=limited
+)
+api_router.include_router(rewrite_text.router, prefix="/rewrite-text", tags=["rewrite-text"], dependencies=limited)
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"], dependencies=limited)
+api_router.include_router(events.router, prefix="/events", tags=["events"])
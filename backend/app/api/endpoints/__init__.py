@@ -3,4 +3,6 @@ from .team_members import router as team_members_router
 from .objectives import router as objectives_router
 from .progress_updates import router as progress_updates_router
 from .rewrite_text import router as rewrite_text_router
+from .metrics import router as metrics_router
+from .events import router as events_router
 # you can add other endpoint routers here
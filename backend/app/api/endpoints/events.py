@@ -0,0 +1,130 @@
+"""
+API Endpoints for the Real-Time Change Feed.
+
+Clients subscribe to create/update/delete events of objectives, progress updates
+and team members instead of polling the list endpoints, either over
+Server-Sent Events (`GET /events/stream`) or over a WebSocket (`/events/ws`).
+
+Both accept the same optional filters as comma-separated query parameters:
+
+- **resources**: `objective`, `progress_update`, `team_member`
+- **ids**: only events for these row ids
+- **objective_ids**: only events of these objectives and their progress updates
+
+Each event is a JSON object: `{"resource", "action", "id", "objective_id", "timestamp"}`.
+"""
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.core import events
+from app.core.config import settings
+
+router = APIRouter()
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    return [part for part in value.split(",") if part.strip()] if value else None
+
+
+def _split_ints(value: Optional[str]) -> Optional[List[int]]:
+    parts = _split(value)
+    return [int(part) for part in parts] if parts else None
+
+
+def _query_filter(resources: Optional[str], ids: Optional[str], objective_ids: Optional[str]) -> events.EventFilter:
+    return events.parse_filter(_split(resources), _split_ints(ids), _split_ints(objective_ids))
+
+
+@router.get("/stream", summary="Subscribe to change events (Server-Sent Events)")
+async def stream_events(
+    request: Request,
+    resources: Optional[str] = None,
+    ids: Optional[str] = None,
+    objective_ids: Optional[str] = None,
+):
+    """
+    Streams matching change events as `text/event-stream`.
+
+    The SSE event name is `<resource>.<action>` (e.g. `objective.updated`) and the
+    data is the event JSON. A comment line is sent every
+    `EVENT_HEARTBEAT_SECONDS` to keep proxies from closing an idle connection.
+    """
+    try:
+        event_filter = _query_filter(resources, ids, objective_ids)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    subscription = events.broker.subscribe(event_filter)
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=settings.EVENT_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event.resource}.{event.action}\ndata: {event.to_json()}\n\n"
+        finally:
+            events.broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def events_websocket(
+    websocket: WebSocket,
+    resources: Optional[str] = None,
+    ids: Optional[str] = None,
+    objective_ids: Optional[str] = None,
+):
+    """
+    Pushes matching change events as JSON text messages.
+
+    The client may replace its filter at any time by sending
+    `{"resources": [...], "ids": [...], "objective_ids": [...]}`; invalid
+    filters are answered with `{"error": "..."}` and leave the filter unchanged.
+    """
+    try:
+        event_filter = _query_filter(resources, ids, objective_ids)
+    except ValueError as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc))
+        return
+    await websocket.accept()
+    subscription = events.broker.subscribe(event_filter)
+
+    async def receive_filters():
+        while True:
+            message = await websocket.receive_json()
+            try:
+                subscription.filter = events.parse_filter(
+                    message.get("resources"), message.get("ids"), message.get("objective_ids")
+                )
+            except (AttributeError, TypeError, ValueError) as exc:
+                await websocket.send_json({"error": f"Invalid filter: {exc}"})
+
+    async def send_events():
+        while True:
+            event = await subscription.get()
+            await websocket.send_text(event.to_json())
+
+    tasks = [asyncio.create_task(receive_filters()), asyncio.create_task(send_events())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            exc = task.exception()
+            if exc is not None and not isinstance(exc, WebSocketDisconnect):
+                raise exc
+    finally:
+        for task in tasks:
+            task.cancel()
+        events.broker.unsubscribe(subscription)
@@ -0,0 +1,64 @@
+"""
+API Endpoints for Runtime Metrics.
+
+This module exposes internal runtime statistics (e.g. cache hit ratios, startup
+timings) as JSON so they can be scraped by monitoring or inspected while tuning.
+"""
+from typing import Any
+
+from fastapi import APIRouter, Request
+
+from app.core.cache import cache
+from app.core.concurrency import partition
+from app.db.session import read_router
+
+router = APIRouter()
+
+
+@router.get("/cache", summary="Cache statistics")
+def read_cache_metrics() -> Any:
+    """
+    Returns hit/miss counters and hit ratios of the crud cache, overall and per namespace.
+    """
+    return cache.stats()
+
+
+@router.get("/startup", summary="Startup timings")
+def read_startup_metrics(request: Request) -> Any:
+    """
+    Returns how long this worker's startup took, in total and per phase
+    (module import, mapper configuration, pool warmup, event broker).
+    """
+    return request.app.state.startup_timings.as_dict()
+
+
+@router.get("/threadpool", summary="Threadpool saturation per route group")
+async def read_threadpool_metrics() -> Any:
+    """
+    Returns the shared threadpool's token usage and, per route group (auth,
+    rewrite, default), its capacity, current usage and queue wait times.
+
+    Async so that it runs on the event loop and stays responsive while the
+    threadpool is saturated.
+    """
+    return partition.stats()
+
+
+@router.get("/admission", summary="Adaptive concurrency limit")
+async def read_admission_metrics(request: Request) -> Any:
+    """
+    Returns the admission control's current concurrency limit, the requests in
+    flight, how many were admitted and shed, and the last window's p90 latency.
+    Null when the limit is disabled.
+    """
+    limit = request.app.state.admission_limit
+    return limit.stats() if limit is not None else None
+
+
+@router.get("/replicas", summary="Read replica routing")
+def read_replica_metrics() -> Any:
+    """
+    Returns the configured read replicas with their health, and how many
+    read-only sessions went to a replica versus the primary.
+    """
+    return read_router.stats()
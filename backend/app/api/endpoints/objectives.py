@@ -1,11 +1,15 @@
 """
 API Endpoints for Objective Management.
 """
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from datetime import date
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 from app import crud, schemas
-from app.db.session import get_db
+from app.core import http_cache
+from app.core.batch import batch_result, check_ids, parse_ids
+from app.db.session import get_db, get_read_db
 from app.schemas.progress_update import ProgressUpdate, ProgressUpdateCreate, ProgressUpdateUpdate
 from app.models import objective as objective_models
 
@@ -22,32 +26,99 @@ def create_objective_endpoint(
 
 @router.get("/", response_model=List[schemas.Objective])
 def read_objectives_endpoint(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    include_inactive: bool = False,
 ) -> Any:
-    objs = crud.crud_objective.get_objectives(db, skip=skip, limit=limit)
+    objs = crud.crud_objective.get_objective_rows(db, skip=skip, limit=limit, include_inactive=include_inactive)
     return objs
 
+# The enum values only change with a deploy, so the payload and its validator are
+# computed once and the response may be cached by clients for a day.
+OBJECTIVE_ENUMS = {
+    "priority": [e.value for e in objective_models.ObjectivePriority],
+    "status": [e.value for e in objective_models.ObjectiveStatus],
+    "level": [e.value for e in objective_models.ObjectiveLevel],
+    "confidentiality": [e.value for e in objective_models.ObjectiveConfidentiality],
+    "strategic_perspective": [e.value for e in objective_models.ObjectiveStrategicPerspective],
+    "review_cadence": [e.value for e in objective_models.ObjectiveReviewCadence],
+}
+OBJECTIVE_ENUMS_ETAG = http_cache.make_etag("objective-enums", json.dumps(OBJECTIVE_ENUMS, sort_keys=True))
+OBJECTIVE_ENUMS_CACHE_CONTROL = "public, max-age=86400"
+
 @router.get("/enums", tags=["objectives"])
-def get_objective_enums():
-    return {
-        "priority": [e.value for e in objective_models.ObjectivePriority],
-        "status": [e.value for e in objective_models.ObjectiveStatus],
-        "level": [e.value for e in objective_models.ObjectiveLevel],
-        "confidentiality": [e.value for e in objective_models.ObjectiveConfidentiality],
-        "strategic_perspective": [e.value for e in objective_models.ObjectiveStrategicPerspective],
-        "review_cadence": [e.value for e in objective_models.ObjectiveReviewCadence],
-    }
+def get_objective_enums(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+):
+    if http_cache.etag_matches(if_none_match, OBJECTIVE_ENUMS_ETAG):
+        return http_cache.not_modified_response(OBJECTIVE_ENUMS_ETAG, cache_control=OBJECTIVE_ENUMS_CACHE_CONTROL)
+    http_cache.set_cache_headers(response, OBJECTIVE_ENUMS_ETAG, cache_control=OBJECTIVE_ENUMS_CACHE_CONTROL)
+    return OBJECTIVE_ENUMS
+
+@router.get("/stats", response_model=schemas.ObjectiveStats)
+def read_objective_stats_endpoint(
+    owner_id: Optional[int] = Query(None, description="Only objectives of this team member and their reports"),
+    start: Optional[date] = Query(None, description="Only objectives running on or after this date"),
+    end: Optional[date] = Query(None, description="Only objectives running on or before this date"),
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """
+    Dashboard counts of the active objectives by status, level, priority, strategic
+    perspective and confidentiality, computed by the database in one query.
+    """
+    if start is not None and end is not None and start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end")
+    return crud.crud_objective.get_objective_stats(db, owner_id=owner_id, start=start, end=end)
+
+def _read_objectives_batch(db: Session, ids: List[int]) -> Any:
+    ids = check_ids(ids)
+    return batch_result(ids, crud.crud_objective.get_objectives_by_ids(db, ids))
+
+@router.get("/batch", response_model=schemas.BatchResult[schemas.Objective])
+def read_objectives_batch_endpoint(
+    ids: str = Query(..., description="Comma-separated objective ids, e.g. 1,2,3"),
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """Get several objectives by ID with one query; unknown ids are listed in `missing`."""
+    return _read_objectives_batch(db, parse_ids(ids))
+
+@router.post("/batch", response_model=schemas.BatchResult[schemas.Objective])
+def read_objectives_batch_post_endpoint(
+    body: schemas.BatchGetRequest,
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """Same as `GET /batch`, for id lists too long for a URL."""
+    return _read_objectives_batch(db, body.ids)
 
 @router.get("/{objective_id}", response_model=schemas.Objective)
 def read_objective_by_id_endpoint(
     objective_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
+    if_none_match: Optional[str] = Header(None),
+    if_modified_since: Optional[str] = Header(None),
 ) -> Any:
+    """
+    Get an objective by ID.
+
+    Supports conditional GETs: the ETag and Last-Modified validators are derived
+    from the row's version and last change timestamp, which are checked before
+    the full row is loaded, so an unchanged objective is answered with
+    `304 Not Modified`. The ETag is also the `If-Match` precondition of PATCH.
+    """
+    version = crud.crud_objective.get_objective_version(db, objective_id=objective_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Objective not found")
+    row_version, changed_at = version
+    etag = http_cache.version_etag(row_version)
+    if http_cache.is_not_modified(etag, if_none_match, changed_at, if_modified_since):
+        return http_cache.not_modified_response(etag, changed_at)
     obj = crud.crud_objective.get_objective(db, objective_id=objective_id)
     if not obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Objective not found")
+    http_cache.set_cache_headers(response, etag, changed_at)
     return obj
 
 @router.put("/{objective_id}", response_model=schemas.Objective)
@@ -63,6 +134,32 @@ def update_objective_endpoint(
     updated_obj = crud.crud_objective.update_objective(db=db, db_obj=obj, obj_in=obj_in)
     return updated_obj
 
+@router.patch("/{objective_id}", response_model=schemas.Objective)
+def patch_objective_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    objective_id: int,
+    obj_in: schemas.ObjectivePatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+) -> Any:
+    """
+    Partially update an objective with a single `UPDATE ... RETURNING`.
+
+    With `If-Match: <ETag>` the update only applies if the objective is still at
+    that version, otherwise `412 Precondition Failed` is returned and nothing
+    is written. The response carries the new ETag.
+    """
+    obj = crud.crud_objective.patch_objective(
+        db, objective_id=objective_id, obj_in=obj_in, versions=http_cache.if_match_versions(if_match)
+    )
+    if obj is None:
+        if crud.crud_objective.get_objective_version(db, objective_id=objective_id) is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Objective not found")
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Objective was modified")
+    response.headers["ETag"] = http_cache.version_etag(obj.version)
+    return obj
+
 @router.delete("/{objective_id}", response_model=schemas.Objective)
 def delete_objective_endpoint(
     *,
@@ -78,11 +175,16 @@ def delete_objective_endpoint(
 @router.get("/{objective_id}/progress-updates", response_model=List[ProgressUpdate])
 def list_progress_updates_for_objective(
     objective_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
 ):
-    return crud.crud_progress_update.get_progress_updates_by_objective(db, objective_id, skip=skip, limit=limit)
+    """Lists the objective's progress updates, optionally within a progress_date range (inclusive)."""
+    return crud.crud_progress_update.get_progress_updates_by_objective(
+        db, objective_id, skip=skip, limit=limit, start=start, end=end
+    )
 
 @router.post("/{objective_id}/progress-updates", response_model=ProgressUpdate, status_code=status.HTTP_201_CREATED)
 def create_progress_update_for_objective(
@@ -97,7 +199,7 @@ def create_progress_update_for_objective(
 @router.get("/progress-updates/{progress_update_id}", response_model=ProgressUpdate)
 def get_progress_update(
     progress_update_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ):
     obj = crud.crud_progress_update.get_progress_update(db, progress_update_id)
     if not obj:
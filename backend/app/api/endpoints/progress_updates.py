@@ -1,29 +1,70 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from app import crud
-from app.schemas.progress_update import ProgressUpdate, ProgressUpdateCreate, ProgressUpdateUpdate
-from app.db.session import get_db
+from app import crud, models
+from app.core import http_cache
+from app.core.config import settings
+from app.schemas.progress_update import (
+    ProgressInterval,
+    ProgressSeries,
+    ProgressUpdate,
+    ProgressUpdateCreate,
+    ProgressUpdateUpdate,
+)
+from app.db.session import get_db, get_read_db
 
 router = APIRouter()
 
 @router.get("/", response_model=List[ProgressUpdate])
 def list_progress_updates(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    include_inactive: bool = False,
 ):
     # Optionally, add filtering by objective_id as a query param
-    return db.query(crud.models.ProgressUpdate).offset(skip).limit(limit).all()
+    query = db.query(models.ProgressUpdate)
+    if not include_inactive:
+        query = query.filter(models.ProgressUpdate.active)
+    return query.offset(skip).limit(limit).all()
 
 @router.get("/by-objective/{objective_id}", response_model=List[ProgressUpdate])
 def list_progress_updates_for_objective(
     objective_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    """Lists the objective's progress updates, optionally within a progress_date range (inclusive)."""
+    return crud.crud_progress_update.get_progress_updates_by_objective(
+        db, objective_id, skip=skip, limit=limit, start=start, end=end
+    )
+
+@router.get("/aggregate", response_model=List[ProgressSeries])
+def aggregate_progress_updates(
+    objective_ids: List[int] = Query(..., description="Repeat for several: ?objective_ids=1&objective_ids=2"),
+    interval: ProgressInterval = ProgressInterval.WEEK,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    db: Session = Depends(get_read_db),
 ):
-    return crud.crud_progress_update.get_progress_updates_by_objective(db, objective_id, skip=skip, limit=limit)
+    """
+    Returns one bucketed progress series (last/avg/min/max per day, week, month
+    or quarter) per requested objective, in request order, for burn-up charts.
+    """
+    if len(objective_ids) > settings.PROGRESS_AGGREGATE_MAX_OBJECTIVES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PROGRESS_AGGREGATE_MAX_OBJECTIVES} objective_ids per request",
+        )
+    series = crud.crud_progress_update.aggregate_progress(db, objective_ids, interval, start=start, end=end)
+    return [
+        ProgressSeries(objective_id=objective_id, interval=interval, buckets=series.get(objective_id, []))
+        for objective_id in dict.fromkeys(objective_ids)
+    ]
 
 @router.post("/", response_model=ProgressUpdate, status_code=status.HTTP_201_CREATED)
 def create_progress_update(
@@ -35,11 +76,13 @@ def create_progress_update(
 @router.get("/{progress_update_id}", response_model=ProgressUpdate)
 def get_progress_update(
     progress_update_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
 ):
     obj = crud.crud_progress_update.get_progress_update(db, progress_update_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Progress update not found")
+    response.headers["ETag"] = http_cache.version_etag(obj.version)
     return obj
 
 @router.put("/{progress_update_id}", response_model=ProgressUpdate)
@@ -53,6 +96,31 @@ def update_progress_update(
         raise HTTPException(status_code=404, detail="Progress update not found")
     return crud.crud_progress_update.update_progress_update(db=db, db_obj=db_obj, obj_in=progress_update_in)
 
+@router.patch("/{progress_update_id}", response_model=ProgressUpdate)
+def patch_progress_update(
+    progress_update_id: int,
+    progress_update_in: ProgressUpdateUpdate,
+    response: Response,
+    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+):
+    """
+    Partially updates a progress update with a single `UPDATE ... RETURNING`;
+    with `If-Match` only while it is still at that version (else 412).
+    """
+    obj = crud.crud_progress_update.patch_progress_update(
+        db,
+        progress_update_id=progress_update_id,
+        obj_in=progress_update_in,
+        versions=http_cache.if_match_versions(if_match),
+    )
+    if obj is None:
+        if crud.crud_progress_update.get_progress_update(db, progress_update_id) is None:
+            raise HTTPException(status_code=404, detail="Progress update not found")
+        raise HTTPException(status_code=412, detail="Progress update was modified")
+    response.headers["ETag"] = http_cache.version_etag(obj.version)
+    return obj
+
 @router.delete("/{progress_update_id}", response_model=ProgressUpdate)
 def delete_progress_update(
     progress_update_id: int,
@@ -1,24 +1,39 @@
-from openai import OpenAI
+from functools import lru_cache
 from fastapi import APIRouter, HTTPException
 from app.schemas.rewrite_text import RewriteTextRequest, RewriteTextResponse
 from fastapi import status
+from app.core.concurrency import route_group
 from app.core.config import settings
 
 router = APIRouter()
 
 
-@router.post(
-    "/rewrite-text", response_model=RewriteTextResponse, status_code=status.HTTP_200_OK
-)
-def rewrite_text_endpoint(payload: RewriteTextRequest):
-    # Basic validation
-    if not payload.originalText or not payload.originalText.strip():
-        raise HTTPException(status_code=400, detail="originalText must not be empty.")
-    if not payload.instructions or not payload.instructions.strip():
-        raise HTTPException(status_code=400, detail="instructions must not be empty.")
+@lru_cache(maxsize=None)
+def get_openai_client(api_key: str):
+    """
+    Returns a shared OpenAI client for `api_key`.
+
+    The openai package is heavy to import, so it is loaded on the first rewrite
+    request instead of at application startup; the client (and its HTTP
+    connection pool) is then reused across requests.
+    """
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+def build_rewrite_prompt(original_text: str, instructions: str) -> str:
+    """
+    Builds the LLM prompt used to rewrite a business objective.
 
-    # Construct prompt for AI
-    prompt = (
+    Args:
+        original_text: The objective text supplied by the user.
+        instructions: Additional instructions supplied by the user.
+
+    Returns:
+        The full prompt string sent to the model.
+    """
+    return (
         "Act as an expert business analyst and communication specialist. Your input is a business objective.\n\n"
         "Your goal is to transform this objective into a more comprehensive and actionable plan.\n\n"
         "**Instructions:**\n\n"
@@ -31,10 +46,24 @@ def rewrite_text_endpoint(payload: RewriteTextRequest):
         "    * **Actionable Steps/Tasks:** Propose a sequence of 3-5 concrete steps or tasks that need to be undertaken to achieve the objective.\n\n"
         "    * **Readability and Tone:** Ensure the final text is well-structured, uses clear and concise professional language, and is easy to understand.\n\n"
         "3.  * **As last step in the process please make sure you translate ALL the text into the same language as the original objective.\n\n"
-        f"Original Objective: \n{payload.originalText}\n\n"
-        f"Additional Instructions: \n{payload.instructions}\n\n"
+        f"Original Objective: \n{original_text}\n\n"
+        f"Additional Instructions: \n{instructions}\n\n"
     )
 
+
+@router.post(
+    "/rewrite-text", response_model=RewriteTextResponse, status_code=status.HTTP_200_OK
+)
+@route_group("rewrite")
+def rewrite_text_endpoint(payload: RewriteTextRequest):
+    # Basic validation
+    if not payload.originalText or not payload.originalText.strip():
+        raise HTTPException(status_code=400, detail="originalText must not be empty.")
+    if not payload.instructions or not payload.instructions.strip():
+        raise HTTPException(status_code=400, detail="instructions must not be empty.")
+
+    prompt = build_rewrite_prompt(payload.originalText, payload.instructions)
+
     # Call OpenAI API (v1.x)
     try:
         api_key = settings.OPENAI_API_KEY
@@ -42,7 +71,7 @@ def rewrite_text_endpoint(payload: RewriteTextRequest):
             raise Exception(
                 "OpenAI API key not set in environment variable OPENAI_API_KEY."
             )
-        client = OpenAI(api_key=api_key)
+        client = get_openai_client(api_key)
         response = client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=[{"role": "user", "content": prompt}],
@@ -4,12 +4,17 @@ API Endpoints for Team Member Management.
 This module defines the FastAPI routes for CRUD operations on team members.
 """
 
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
-from app.db.session import get_db
+from app.core import http_cache
+from app.core.batch import batch_result, check_ids, parse_ids
+from app.core.bulk_import import OPENAPI_BODY, import_result, read_import_rows, validate_rows
+from app.db.session import get_db, get_read_db
 from app.models import TeamMember, Objective
 
 router = APIRouter()
@@ -42,6 +47,45 @@ def create_team_member_endpoint(
     return member
 
 
+@router.post(
+    "/import",
+    response_model=schemas.ImportResult,
+    summary="Import team members with their hierarchy",
+    response_description="Per row the created id or why it was skipped, and the throughput.",
+    openapi_extra=OPENAPI_BODY,
+)
+def import_team_members_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    rows: List[Any] = Depends(read_import_rows),
+) -> Any:
+    """
+    Create a whole organisation (e.g. an HR export) in one transaction.
+
+    The rows are a JSON array or CSV (a `text/csv` body or a multipart upload
+    in the `file` field) with the fields of a team member. The supervisor is
+    given as **supervisor_id** or as **supervisor_email**, which may be the
+    email of another row: the rows may come in any order, supervisors are
+    created before the people reporting to them.
+
+    Rows with a taken email, an unknown supervisor, a supervisor that was not
+    imported, or in a supervisor cycle are skipped and reported.
+    """
+    started = time.perf_counter()
+    members_in, errors = validate_rows(rows, schemas.TeamMemberImport)
+    results = {number: (None, error) for number, error in errors.items()}
+    if members_in:
+        try:
+            results.update(crud.import_team_members(db, members_in))
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An email was taken during the import; nothing was imported, please retry.",
+            )
+    return import_result(results, time.perf_counter() - started)
+
+
 @router.get(
     "/",
     response_model=List[schemas.TeamMember],
@@ -49,20 +93,75 @@ def create_team_member_endpoint(
     response_description="A list of team members.",
 )
 def read_team_members_endpoint(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    include_inactive: bool = False,
+    if_none_match: Optional[str] = Header(None),
 ) -> Any:
     """
     Retrieve a list of all team members.
 
     - **skip**: Number of records to skip for pagination
     - **limit**: Maximum number of records to return
+    - **include_inactive**: Also list deleted (inactive) team members
+
+    Responses carry an ETag derived from a cheap table fingerprint; pollers
+    sending it back in `If-None-Match` get `304 Not Modified` while nothing changed.
     """
-    members = crud.get_team_members(db, skip=skip, limit=limit)
+    count, max_id, changed_at, versions = crud.get_team_members_fingerprint(db)
+    etag = http_cache.make_etag(
+        "team-members", skip, limit, include_inactive, count, max_id, changed_at and changed_at.isoformat(), versions
+    )
+    if http_cache.etag_matches(if_none_match, etag):
+        return http_cache.not_modified_response(etag)
+    members = crud.get_team_member_rows(db, skip=skip, limit=limit, include_inactive=include_inactive)
+    http_cache.set_cache_headers(response, etag)
     return members
 
 
+def _read_team_members_batch(db: Session, ids: List[int]) -> Any:
+    ids = check_ids(ids)
+    return batch_result(ids, crud.get_team_members_by_ids(db, ids))
+
+
+@router.get(
+    "/batch",
+    response_model=schemas.BatchResult[schemas.TeamMember],
+    summary="Get several team members by ID",
+    response_description="The team members found, in request order, and the ids that were not.",
+)
+def read_team_members_batch_endpoint(
+    ids: str = Query(..., description="Comma-separated team member ids, e.g. 1,2,3"),
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """
+    Get several team members with a single query.
+
+    - **ids**: Comma-separated ids, at most `BATCH_GET_MAX_IDS` distinct ones
+    """
+    return _read_team_members_batch(db, parse_ids(ids))
+
+
+@router.post(
+    "/batch",
+    response_model=schemas.BatchResult[schemas.TeamMember],
+    summary="Get several team members by ID (ids in the body)",
+    response_description="The team members found, in request order, and the ids that were not.",
+)
+def read_team_members_batch_post_endpoint(
+    body: schemas.BatchGetRequest,
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """
+    Same as `GET /batch`, for id lists too long for a URL.
+
+    - **ids**: List of ids, at most `BATCH_GET_MAX_IDS` distinct ones
+    """
+    return _read_team_members_batch(db, body.ids)
+
+
 @router.get(
     "/{member_id}",
     response_model=schemas.TeamMember,
@@ -71,18 +170,22 @@ def read_team_members_endpoint(
 )
 def read_team_member_by_id_endpoint(
     member_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """
     Get a team member by their unique ID.
 
     - **member_id**: The ID of the team member to retrieve
+
+    The ETag of the response can be sent as `If-Match` with a PATCH.
     """
     member = crud.get_team_member(db, member_id=member_id)
     if not member:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Team member not found"
         )
+    response.headers["ETag"] = http_cache.version_etag(member.version)
     return member
 
 
@@ -94,19 +197,19 @@ def read_team_member_by_id_endpoint(
 )
 def read_team_members_by_supervisor_id(
     supervisor_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """
     Retrieve all team members who have the given supervisor_id.
     - **supervisor_id**: The ID of the supervisor
     """
-    members = db.query(TeamMember).filter(TeamMember.supervisor_id == supervisor_id).all()
+    members = db.query(TeamMember).filter(TeamMember.supervisor_id == supervisor_id, TeamMember.active).all()
     return members
 
 
 @router.get("/{team_member_id}/objectives", response_model=List[schemas.Objective])
-def get_objectives_for_team_member(team_member_id: int, db: Session = Depends(get_db)):
-    return db.query(Objective).filter(Objective.owner_id == team_member_id).all()
+def get_objectives_for_team_member(team_member_id: int, db: Session = Depends(get_read_db)):
+    return db.query(Objective).filter(Objective.owner_id == team_member_id, Objective.active).all()
 
 
 @router.put(
@@ -138,6 +241,49 @@ def update_team_member_endpoint(
     return updated_member
 
 
+@router.patch(
+    "/{member_id}",
+    response_model=schemas.TeamMember,
+    summary="Partially update a team member",
+    response_description="The updated team member.",
+)
+def patch_team_member_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    member_id: int,
+    member_in: schemas.TeamMemberPatch,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+) -> Any:
+    """
+    Update some fields of a team member with a single `UPDATE ... RETURNING`.
+
+    - **member_id**: The ID of the team member to update
+    - **member_in**: The fields to change; omitted fields are left as they are
+    - **If-Match** (header): ETag from a previous read; if the team member has
+      changed since, nothing is written and `412 Precondition Failed` is returned
+    """
+    try:
+        member = crud.patch_team_member(
+            db, member_id=member_id, member_in=member_in, versions=http_cache.if_match_versions(if_match)
+        )
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered or supervisor not found"
+        )
+    if member is None:
+        if crud.get_team_member(db, member_id=member_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Team member not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED, detail="Team member was modified"
+        )
+    response.headers["ETag"] = http_cache.version_etag(member.version)
+    return member
+
+
 @router.delete(
     "/{member_id}",
     response_model=schemas.TeamMember,
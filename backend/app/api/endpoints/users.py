@@ -5,16 +5,31 @@ This module defines the FastAPI routes for CRUD operations on users.
 It uses the Pydantic schemas for request and response validation and
 the CRUD functions for database interactions.
 """
-from typing import List, Any
-from fastapi import APIRouter, Depends, HTTPException, status
+import time
+from typing import List, Any, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
 from app import crud, models, schemas  # Application-specific imports
-from app.db.session import get_db  # Dependency to get a database session
-from app.core.security import verify_password, create_access_token, create_refresh_token, verify_token, get_password_hash
+from app.db.session import get_db, get_read_db  # Dependencies to get a database session
+from app.core import http_cache
+from app.core.batch import batch_result, check_ids, parse_ids
+from app.core.bulk_import import OPENAPI_BODY, import_result, read_import_rows, validate_rows
+from app.core.concurrency import route_group
+from app.core.rate_limit import rate_limit_headers, throttle_login
+from app.core.revocation import revocation
+from app.core.security import (
+    create_access_token,
+    create_refresh_token,
+    revoke_token_family,
+    verify_and_update_password,
+    verify_password,
+    verify_token,
+)
 
 router = APIRouter()
 """
@@ -40,6 +55,8 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             raise credentials_exception
     except JWTError as exc:
         raise credentials_exception from exc
+    if revocation.is_revoked(int(user_id), payload.get("iat")):
+        raise credentials_exception
     user = crud.get_user(db, user_id=int(user_id))
     if user is None:
         raise credentials_exception
@@ -47,6 +64,7 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
 
 
 @router.post("/", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+@route_group("auth")
 def create_user_endpoint(
     *,
     db: Session = Depends(get_db),
@@ -84,11 +102,52 @@ def create_user_endpoint(
     return user
 
 
+@router.post("/import", response_model=schemas.ImportResult, openapi_extra=OPENAPI_BODY)
+@route_group("auth")
+def import_users_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    rows: List[Any] = Depends(read_import_rows),
+) -> Any:
+    """
+    Create many users at once, e.g. when onboarding a department.
+
+    The users are sent as a JSON array of `UserCreate` objects or as CSV (a
+    `text/csv` body or a multipart upload in the `file` field) with the field
+    names in the header row. Every row is validated and checked for a unique
+    email and username on its own; the valid rows are created in one
+    transaction, with the passwords hashed in parallel.
+
+    Raises:
+        HTTPException (400/415): If the body cannot be read (see `read_import_rows`).
+        HTTPException (409): If a concurrent request took an email or username
+            during the import; nothing was imported.
+
+    Returns:
+        Per row (numbered from 1) the id of the created user or why it was
+        skipped, plus the counts and the throughput of the import.
+    """
+    started = time.perf_counter()
+    users_in, errors = validate_rows(rows, schemas.UserCreate)
+    results = {number: (None, error) for number, error in errors.items()}
+    if users_in:
+        try:
+            results.update(crud.import_users(db, users_in))
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="An email or username was taken during the import; nothing was imported, please retry.",
+            )
+    return import_result(results, time.perf_counter() - started)
+
+
 @router.get("/", response_model=List[schemas.User])
 def read_users_endpoint(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     skip: int = 0,
     limit: int = 100,
+    include_inactive: bool = False,
 ) -> Any:
     """
     Retrieve a list of users with pagination.
@@ -97,11 +156,12 @@ def read_users_endpoint(
         db: Database session dependency.
         skip: Number of users to skip (for pagination).
         limit: Maximum number of users to return.
+        include_inactive: Whether to include deleted (inactive) users.
 
     Returns:
         A list of user objects, conforming to `schemas.User`.
     """
-    users = crud.get_users(db, skip=skip, limit=limit)
+    users = crud.get_users(db, skip=skip, limit=limit, include_inactive=include_inactive)
     return users
 
 
@@ -110,16 +170,58 @@ def read_users_me(_db: Session = Depends(get_db), current_user: models.User = De
     return schemas.User.model_validate(current_user)
 
 
+def _read_users_batch(db: Session, ids: List[int]) -> Any:
+    ids = check_ids(ids)
+    return batch_result(ids, crud.get_users_by_ids(db, ids))
+
+
+@router.get("/batch", response_model=schemas.BatchResult[schemas.User])
+def read_users_batch_endpoint(
+    ids: str = Query(..., description="Comma-separated user ids, e.g. 1,2,3"),
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """
+    Get several users by their IDs with a single query.
+
+    Args:
+        ids: Comma-separated user IDs, at most `BATCH_GET_MAX_IDS` distinct ones.
+        db: Database session dependency.
+
+    Raises:
+        HTTPException (400): If no or too many IDs are given.
+        HTTPException (422): If an ID is not an integer.
+
+    Returns:
+        The users found, in request order, and the IDs that do not exist.
+    """
+    return _read_users_batch(db, parse_ids(ids))
+
+
+@router.post("/batch", response_model=schemas.BatchResult[schemas.User])
+def read_users_batch_post_endpoint(
+    body: schemas.BatchGetRequest,
+    db: Session = Depends(get_read_db),
+) -> Any:
+    """
+    Same as `GET /batch`, with the IDs in the request body for lists too long for a URL.
+    """
+    return _read_users_batch(db, body.ids)
+
+
 @router.get("/{user_id}", response_model=schemas.User)
 def read_user_by_id_endpoint(
     user_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """
     Get a specific user by their ID.
 
+    The response's ETag can be sent back as `If-Match` with a PATCH.
+
     Args:
         user_id: The ID of the user to retrieve.
+        response: The outgoing response, used to set the ETag header.
         db: Database session dependency.
 
     Raises:
@@ -131,6 +233,7 @@ def read_user_by_id_endpoint(
     user = crud.get_user(db, user_id=user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    response.headers["ETag"] = http_cache.version_etag(user.version)
     return user
 
 
@@ -181,6 +284,55 @@ def update_user_endpoint(
     return user
 
 
+@router.patch("/{user_id}", response_model=schemas.User)
+@route_group("auth")
+def patch_user_endpoint(
+    *,
+    db: Session = Depends(get_db),
+    user_id: int,
+    user_in: schemas.UserUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+) -> Any:
+    """
+    Partially update a user with a single `UPDATE ... RETURNING`.
+
+    The user is not read first: conflicting emails or usernames are detected by
+    the unique constraints. A new password is hashed by the CRUD operation.
+
+    Args:
+        db: Database session dependency.
+        user_id: The ID of the user to update.
+        user_in: Pydantic schema (`UserUpdate`) containing the fields to update.
+        response: The outgoing response, used to set the new ETag header.
+        if_match: Optional ETag of a previous read; the update only applies if
+                  the user has not changed since.
+
+    Raises:
+        HTTPException (404): If the user with the given ID does not exist.
+        HTTPException (412): If `If-Match` is given and the user has changed since.
+        HTTPException (400): If the new email or username is already taken by another user.
+
+    Returns:
+        The updated user object, conforming to `schemas.User`.
+    """
+    try:
+        user = crud.patch_user(db, user_id=user_id, user_in=user_in, versions=http_cache.if_match_versions(if_match))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Email or username already registered by another user.")
+    if user is None:
+        if crud.get_user(db, user_id=user_id) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="The user with this id does not exist in the system",
+            )
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail="User was modified")
+    response.headers["ETag"] = http_cache.version_etag(user.version)
+    return user
+
+
 @router.delete("/{user_id}", response_model=schemas.User)
 def delete_user_endpoint(
     *,
@@ -207,67 +359,109 @@ def delete_user_endpoint(
     return deleted_user
 
 
+def _issue_tokens(user_id: str, username: str, family: Optional[str] = None) -> dict:
+    """A new access token and refresh token; `family` continues a rotated refresh token's family."""
+    claims = {"sub": user_id, "username": username}
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims, family=family),
+        "token_type": "bearer",
+    }
+
+
+def _authenticate(db: Session, request: Request, user: Optional[models.User], password: str) -> dict:
+    """
+    Checks the password of a login and issues the tokens. A hash made under an
+    outdated hashing policy is replaced by one under the current policy.
+    """
+    valid, new_hash = verify_and_update_password(password, user.hashed_password) if user else (False, None)
+    if not valid or not user.active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers=rate_limit_headers(request),
+        )
+    if new_hash:
+        crud.rehash_password(db, user_id=user.id, old_hash=user.hashed_password, new_hash=new_hash)
+    return _issue_tokens(str(user.id), user.username)
+
+
 @router.post("/login", response_model=schemas.Token)
+@route_group("auth")
+@throttle_login
 def login_user_endpoint(
     *,
+    request: Request,
     db: Session = Depends(get_db),
     login_in: schemas.UserLogin,
 ):
     """
     Authorize user by username and password.
     Returns JWT token if authentication is successful.
+    Attempts are rate limited per username and client IP (429 with Retry-After).
     """
     user = crud.get_user_by_username(db, username=login_in.username)
-    if not user or not verify_password(login_in.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-        )
-    access_token = create_access_token({"sub": str(user.id), "username": user.username})
-    refresh_token = create_refresh_token({"sub": str(user.id), "username": user.username})
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    return _authenticate(db, request, user, login_in.password)
 
 
 @router.post("/token", response_model=schemas.Token)
+@route_group("auth")
+@throttle_login
 def login_token(
+    request: Request,
     db: Session = Depends(get_db),
     form_data: OAuth2PasswordRequestForm = Depends(),
 ):
     user = crud.get_user_by_username(db, username=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect username or password",
-        )
-    access_token = create_access_token({"sub": str(user.id), "username": user.username})
-    refresh_token = create_refresh_token({"sub": str(user.id), "username": user.username})
-    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+    return _authenticate(db, request, user, form_data.password)
 
-@router.post("/refresh-token", response_model=schemas.Token)
-def refresh_token_endpoint(refresh_token: str):
-    from jose import JWTError
+def _verify_refresh_token(refresh_token: str) -> dict:
+    invalid = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
     try:
         payload = verify_token(refresh_token, token_type="refresh")
-        user_id = payload.get("sub")
-        username = payload.get("username")
-        if not user_id or not username:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
-        access_token = create_access_token({"sub": user_id, "username": username})
-        new_refresh_token = create_refresh_token({"sub": user_id, "username": username})
-        return {"access_token": access_token, "refresh_token": new_refresh_token, "token_type": "bearer"}
-    except JWTError:
+    except JWTError as exc:
+        raise invalid from exc
+    # Tokens issued before rotation was introduced have no id and family; their users log in again
+    if not all(payload.get(claim) for claim in ("sub", "username", "jti", "fam")):
+        raise invalid
+    if revocation.is_revoked(int(payload["sub"]), payload.get("iat"), family=payload["fam"]):
+        raise invalid
+    return payload
+
+
+@router.post("/refresh-token", response_model=schemas.Token)
+def refresh_token_endpoint(refresh_token: str):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token.
+
+    Refresh tokens are single-use. Presenting one that was already used means
+    it leaked, so every token of its family (all tokens rotated from the same
+    login) is revoked, which signs out both the attacker and the user.
+    """
+    payload = _verify_refresh_token(refresh_token)
+    if not revocation.use_token(payload["jti"], payload["exp"]):
+        revoke_token_family(payload["fam"])
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+    return _issue_tokens(payload["sub"], payload["username"], family=payload["fam"])
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(refresh_token: str):
+    """Revokes the refresh token and every token rotated from the same login."""
+    payload = _verify_refresh_token(refresh_token)
+    revoke_token_family(payload["fam"])
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/by-team-member/{team_member_id}", response_model=List[schemas.User])
 def get_users_by_team_member_id(
     team_member_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
 ) -> Any:
     """
     Get all users assigned to a specific team member by team_member_id.
     """
-    users = db.query(models.User).filter(models.User.team_member_id == team_member_id).all()
+    users = db.query(models.User).filter(models.User.team_member_id == team_member_id, models.User.active).all()
     return users
 
 
@@ -277,6 +471,7 @@ class ChangePasswordRequest(BaseModel):
 
 
 @router.post("/change-password")
+@route_group("auth")
 def change_password(
     req: ChangePasswordRequest,
     db: Session = Depends(get_db),
@@ -284,11 +479,12 @@ def change_password(
 ) -> Any:
     """
     Change the password for the current user.
+
+    All tokens issued to the user so far are revoked; the response carries new
+    tokens for the current session.
     """
     if not verify_password(req.current_password, current_user.hashed_password):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
-    current_user.hashed_password = get_password_hash(req.new_password)
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return {"msg": "Password changed successfully"}
+    # Goes through the crud layer so the cached user row is invalidated and the tokens are revoked as well
+    crud.update_user(db=db, db_user=current_user, user_in={"password": req.new_password})
+    return {"msg": "Password changed successfully", **_issue_tokens(str(current_user.id), current_user.username)}
@@ -0,0 +1,149 @@
+"""
+Archival Job.
+
+Moves objectives that were deleted (inactive) or finished (achieved or
+cancelled) and have not changed for `ARCHIVE_AFTER_DAYS` days, together with
+all their progress updates, from the hot tables into `objectives_archive` and
+`progress_updates_archive`. Deleted progress updates of the remaining
+objectives are archived by the same age rule. Run it periodically, e.g. from
+cron:
+
+    python -m app.archive [--older-than-days N] [--batch-size N] [--dry-run]
+
+Each batch is copied and deleted in its own transaction, so the job can be
+interrupted at any time. An objective is only archived once it has no
+sub-objectives left in the hot table; since sub-objectives are archived first,
+whole finished hierarchies move over successive batches.
+
+Cached rows are invalidated through the application cache, which only
+reaches the API workers with the shared `redis` cache backend; with the
+per-process cache they expire after `CACHE_TTL_SECONDS`.
+
+On PostgreSQL the job also creates the upcoming yearly progress_updates
+partitions (see `app.db.partitioning`), so servers that run for longer than
+`PROGRESS_PARTITIONS_AHEAD_YEARS` without a restart do not fall back to the
+default partition.
+"""
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, exists, func, insert, literal, or_, select
+from sqlalchemy.orm import Session, aliased
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.crud.crud_objective import CACHE_NAMESPACE as OBJECTIVE_CACHE_NAMESPACE
+from app.db.partitioning import ensure_partitions
+from app.db.session import SessionLocal
+from app.models import Objective, ProgressUpdate, objectives_archive, progress_updates_archive
+from app.models.objective import ObjectiveStatus
+
+FINISHED_STATUSES = (ObjectiveStatus.ACHIEVED, ObjectiveStatus.CANCELLED)
+
+
+def _archivable_objectives(cutoff: datetime):
+    """Ids of the objectives to archive, leaves of the objective hierarchy only."""
+    child = aliased(Objective)
+    return select(Objective.id).where(
+        or_(~Objective.active, Objective.status.in_(FINISHED_STATUSES)),
+        func.coalesce(Objective.updated_at, Objective.created_at) < cutoff,
+        ~exists().where(child.parent_objective_id == Objective.id),
+    )
+
+
+def _archivable_progress_updates(cutoff: datetime):
+    return select(ProgressUpdate.id).where(
+        ~ProgressUpdate.active,
+        func.coalesce(ProgressUpdate.updated_at, ProgressUpdate.created_at) < cutoff,
+    )
+
+
+def _copy(db: Session, source, archive, where, archived_at: datetime) -> int:
+    columns = [column.name for column in source.columns]
+    rows = select(*source.columns, literal(archived_at, archive.c.archived_at.type)).where(where)
+    db.execute(insert(archive).from_select([*columns, "archived_at"], rows))
+    return db.execute(delete(source).where(where)).rowcount
+
+
+def archive_objectives(db: Session, ids: Sequence[int]) -> Dict[str, int]:
+    """Moves the objectives `ids` and their progress updates to the archive tables and commits."""
+    archived_at = datetime.now(timezone.utc)
+    updates = _copy(
+        db, ProgressUpdate.__table__, progress_updates_archive, ProgressUpdate.objective_id.in_(ids), archived_at
+    )
+    objectives = _copy(db, Objective.__table__, objectives_archive, Objective.id.in_(ids), archived_at)
+    db.commit()
+    for objective_id in ids:
+        cache.invalidate(OBJECTIVE_CACHE_NAMESPACE, objective_id)
+    return {"objectives": objectives, "progress_updates": updates}
+
+
+def archive_progress_updates(db: Session, ids: Sequence[int]) -> int:
+    """Moves the progress updates `ids` to the archive table and commits."""
+    archived_at = datetime.now(timezone.utc)
+    moved = _copy(db, ProgressUpdate.__table__, progress_updates_archive, ProgressUpdate.id.in_(ids), archived_at)
+    db.commit()
+    return moved
+
+
+def run(db: Session, cutoff: datetime, batch_size: int, dry_run: bool = False) -> Dict[str, int]:
+    """
+    Archives everything older than `cutoff` in batches of `batch_size` rows.
+
+    With `dry_run`, only counts what the first pass would archive.
+    """
+    totals = {"objectives": 0, "progress_updates": 0}
+    if dry_run:
+        objective_ids = _archivable_objectives(cutoff)
+        totals["objectives"] = db.execute(select(func.count()).select_from(objective_ids.subquery())).scalar()
+        updates = select(func.count()).select_from(ProgressUpdate).where(
+            or_(
+                ProgressUpdate.objective_id.in_(objective_ids),
+                ProgressUpdate.id.in_(_archivable_progress_updates(cutoff)),
+            )
+        )
+        totals["progress_updates"] = db.execute(updates).scalar()
+        return totals
+
+    while True:
+        ids: List[int] = list(db.execute(_archivable_objectives(cutoff).limit(batch_size)).scalars())
+        if not ids:
+            break
+        moved = archive_objectives(db, ids)
+        totals["objectives"] += moved["objectives"]
+        totals["progress_updates"] += moved["progress_updates"]
+    while True:
+        ids = list(db.execute(_archivable_progress_updates(cutoff).limit(batch_size)).scalars())
+        if not ids:
+            break
+        totals["progress_updates"] += archive_progress_updates(db, ids)
+    return totals
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.archive", description="Archive old objectives.")
+    parser.add_argument(
+        "--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS, help="Minimum age (ARCHIVE_AFTER_DAYS)."
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE, help="Rows per transaction (ARCHIVE_BATCH_SIZE)."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived.")
+    args = parser.parse_args(argv)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    with SessionLocal() as db:
+        totals = run(db, cutoff, max(args.batch_size, 1), dry_run=args.dry_run)
+        if not args.dry_run:
+            created = ensure_partitions(db.connection(), settings.PROGRESS_PARTITIONS_AHEAD_YEARS)
+            db.commit()
+            if created:
+                print(f"Created partitions: {', '.join(created)}")
+    verb = "Would archive" if args.dry_run else "Archived"
+    print(f"{verb} {totals['objectives']} objective(s) and {totals['progress_updates']} progress update(s) "
+          f"last changed before {cutoff:%Y-%m-%d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
 from .config import settings
-from .security import get_password_hash, verify_password
+from .security import get_password_hash, verify_and_update_password, verify_password
@@ -0,0 +1,54 @@
+"""
+Batch-Get Helpers.
+
+Shared by the `/<resource>/batch` endpoints, which read many rows by id in one
+request: `GET /objectives/batch?ids=1,2,3` for short lists and
+`POST /objectives/batch` with `{"ids": [...]}` for long ones. Ids are
+de-duplicated (first occurrence wins), capped at `BATCH_GET_MAX_IDS`, and the
+response lists the rows found in request order plus the ids that were not.
+"""
+from typing import Any, Dict, List, Sequence
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+
+def parse_ids(raw: str) -> List[int]:
+    """
+    Parses a comma-separated id list such as `1,2,3`.
+
+    Raises:
+        HTTPException: 422 if an element is not an integer.
+    """
+    try:
+        return [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="ids must be a comma-separated list of integers",
+        )
+
+
+def check_ids(ids: Sequence[int]) -> List[int]:
+    """
+    Returns `ids` without duplicates, keeping the first occurrence of each.
+
+    Raises:
+        HTTPException: 400 if no id or more than `BATCH_GET_MAX_IDS` distinct ids are given.
+    """
+    unique = list(dict.fromkeys(ids))
+    if not unique:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one id is required")
+    if len(unique) > settings.BATCH_GET_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_GET_MAX_IDS} ids per request",
+        )
+    return unique
+
+
+def batch_result(ids: Sequence[int], items: Sequence[Any]) -> Dict[str, Any]:
+    """Builds the `BatchResult` payload for `items` found out of the requested `ids`."""
+    found = {item.id for item in items}
+    return {"items": items, "missing": [i for i in ids if i not in found]}
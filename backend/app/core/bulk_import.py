@@ -0,0 +1,119 @@
+"""
+Bulk-Import Helpers.
+
+Shared by the `/<resource>/import` endpoints, which create many rows in one
+request and one transaction. The rows are sent as a JSON array of objects, as
+CSV (`text/csv` body, or a multipart upload in the `file` field) with a header
+row naming the fields, and are numbered from 1 in the order given. Each row
+is validated on its own, so one bad row is reported instead of failing the
+whole request with a 422. At most `BULK_IMPORT_MAX_ROWS` rows per request.
+"""
+import csv
+import io
+import json
+from typing import Any, Dict, List, Optional, Tuple, Type, TypeVar
+
+from fastapi import HTTPException, Request, status
+from pydantic import BaseModel, ValidationError
+
+from app.core.config import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+OPENAPI_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"type": "array", "items": {"type": "object"}}},
+            "text/csv": {"schema": {"type": "string"}},
+            "multipart/form-data": {
+                "schema": {"type": "object", "properties": {"file": {"type": "string", "format": "binary"}}}
+            },
+        },
+    }
+}
+"""`openapi_extra` documenting the import body, which the endpoints read themselves."""
+
+
+def _csv_rows(data: bytes) -> List[Dict[str, Any]]:
+    """Rows of a CSV document; empty cells are left out, so the fields take their defaults."""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="CSV must be UTF-8 encoded")
+    return [
+        {key.strip(): value.strip() for key, value in row.items() if key and value and value.strip()}
+        for row in csv.DictReader(io.StringIO(text))
+    ]
+
+
+async def read_import_rows(request: Request) -> List[Dict[str, Any]]:
+    """
+    FastAPI dependency reading the rows of an import request (JSON array, CSV
+    body or multipart CSV upload).
+
+    Raises:
+        HTTPException: 415 for other content types, 400 if the body cannot be
+            parsed, has no rows or more than `BULK_IMPORT_MAX_ROWS`.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type == "application/json":
+        try:
+            rows = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid JSON")
+        if not isinstance(rows, list):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Expected a JSON array of rows")
+    elif content_type == "text/csv":
+        rows = _csv_rows(await request.body())
+    elif content_type == "multipart/form-data":
+        upload = (await request.form()).get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload the CSV in the 'file' field")
+        rows = _csv_rows(await upload.read())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send a JSON array, a text/csv body or a multipart CSV upload",
+        )
+    if not rows:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one row is required")
+    if len(rows) > settings.BULK_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BULK_IMPORT_MAX_ROWS} rows per request",
+        )
+    return rows
+
+
+def validate_rows(rows: List[Any], schema: Type[M]) -> Tuple[Dict[int, M], Dict[int, str]]:
+    """
+    Validates each row against `schema`.
+
+    Returns:
+        The valid rows and the errors of the invalid ones, both keyed by row
+        number (from 1).
+    """
+    valid: Dict[int, M] = {}
+    errors: Dict[int, str] = {}
+    for number, row in enumerate(rows, 1):
+        try:
+            valid[number] = schema.model_validate(row)
+        except ValidationError as exc:
+            errors[number] = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+            )
+    return valid, errors
+
+
+def import_result(results: Dict[int, Tuple[Optional[int], Optional[str]]], seconds: float) -> Dict[str, Any]:
+    """Builds the `ImportResult` payload from `{row number: (created id, error)}`."""
+    rows = [{"row": number, "id": row_id, "error": error} for number, (row_id, error) in sorted(results.items())]
+    created = sum(1 for row in rows if row["error"] is None)
+    return {
+        "created": created,
+        "failed": len(rows) - created,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(created / seconds, 1) if seconds > 0 else None,
+        "rows": rows,
+    }
@@ -0,0 +1,461 @@
+"""
+Read-Through Cache for the CRUD Layer.
+
+This module provides a small cache abstraction with pluggable backends:
+
+- `LRUBackend`: a per-process, thread-safe LRU with TTLs (the default).
+- `RedisBackend`: any server speaking the Redis protocol, shared by all workers.
+  Requires the optional `redis` package; a compatible client (e.g. a local
+  stand-in such as fakeredis) can be injected for testing.
+- `NullBackend`: disables caching.
+
+Cached values are plain dictionaries of column values (see `row_to_dict`), never
+ORM instances, so they can be shared between sessions and serialized to Redis.
+`attach_row` turns such a dictionary back into a persistent ORM instance of the
+caller's session without emitting SQL.
+
+The `Cache` facade adds per-key stampede protection (only one thread loads a
+missing key, the others wait for its result), namespace generations for cheap
+invalidation of list pages, and hit/miss metrics.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import Date, DateTime, inspect
+from sqlalchemy import Enum as SAEnum
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import instance_state
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+"""Sentinel returned by backends for keys that are not cached."""
+
+
+class CacheBackend:
+    """Interface implemented by all cache backends."""
+
+    def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class NullBackend(CacheBackend):
+    """Backend that never stores anything."""
+
+    def get(self, key: str) -> Any:
+        return MISSING
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        pass
+
+    def delete(self, key: str) -> None:
+        pass
+
+    def incr(self, key: str) -> int:
+        return 0
+
+    def get_counter(self, key: str) -> int:
+        return 0
+
+    def clear(self) -> None:
+        pass
+
+
+class LRUBackend(CacheBackend):
+    """
+    In-process LRU cache with per-entry expiry.
+
+    Entries are evicted least-recently-used first once `max_entries` is reached.
+    Counters (namespace generations) are kept separately and never evicted.
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._counters.clear()
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Cannot cache value of type {type(value).__name__}")
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend for servers speaking the Redis protocol.
+
+    Values are stored as JSON; `attach_row` restores dates and enums from the
+    column types when rows are read back.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "fastnuxt:", client: Any = None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package to be installed.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Any:
+        raw = self.client.get(self.prefix + key)
+        if raw is None:
+            return MISSING
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self.client.set(self.prefix + key, json.dumps(value, default=_json_default), ex=ttl)
+
+    def delete(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(self.prefix + key))
+
+    def get_counter(self, key: str) -> int:
+        raw = self.client.get(self.prefix + key)
+        return int(raw) if raw is not None else 0
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+class _NamespaceStats:
+    __slots__ = ("hits", "misses", "loads", "coalesced", "invalidations")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "loads": self.loads,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class Cache:
+    """
+    Cache facade used by the crud modules.
+
+    Keys are grouped in namespaces (e.g. "objective"). Each namespace has a
+    generation counter which is bumped on every write; list pages include the
+    generation in their key, so one increment invalidates all of them.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = 60):
+        self.backend = backend
+        self.ttl = ttl
+        self._stats: Dict[str, _NamespaceStats] = {}
+        self._stats_lock = threading.Lock()
+        self._key_locks: Dict[str, list] = {}
+        self._key_locks_guard = threading.Lock()
+
+    def _ns_stats(self, namespace: str) -> _NamespaceStats:
+        stats = self._stats.get(namespace)
+        if stats is None:
+            with self._stats_lock:
+                stats = self._stats.setdefault(namespace, _NamespaceStats())
+        return stats
+
+    def _backend_call(self, func: Callable, *args, default: Any = MISSING) -> Any:
+        # A cache outage must never take the API down; fall back to the database.
+        try:
+            return func(*args)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Cache backend error: %s", exc)
+            return default
+
+    def generation(self, namespace: str) -> int:
+        return self._backend_call(self.backend.get_counter, f"{namespace}:gen", default=0)
+
+    def get(self, namespace: str, key: Any) -> Any:
+        """Returns the cached value or None, counting the lookup in the metrics."""
+        value = self._backend_call(self.backend.get, f"{namespace}:{key}")
+        stats = self._ns_stats(namespace)
+        if value is MISSING:
+            stats.misses += 1
+            return None
+        stats.hits += 1
+        return value
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: Any,
+        loader: Callable[[], Any],
+        ttl: Optional[int] = None,
+        populate: bool = True,
+    ) -> Any:
+        """
+        Returns the cached value for `key`, calling `loader` on a miss.
+
+        Concurrent misses for the same key are coalesced: the first caller runs
+        the loader while the others wait and reuse its result. `None` results
+        are not cached. A value is only stored if no write happened in the
+        namespace while it was being loaded, so a slow reader cannot put back
+        data that a concurrent writer has just invalidated.
+
+        With `populate=False` a miss is loaded but never stored (nor shared
+        with waiting callers, who load for themselves). Loaders reading from a
+        read replica use it: a lagging replica can return a row from before a
+        write whose invalidation already happened, which would otherwise be
+        cached and served to the primary's readers.
+        """
+        full_key = f"{namespace}:{key}"
+        stats = self._ns_stats(namespace)
+        value = self._backend_call(self.backend.get, full_key)
+        if value is not MISSING:
+            stats.hits += 1
+            return value
+        stats.misses += 1
+
+        with self._key_locks_guard:
+            entry = self._key_locks.setdefault(full_key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                value = self._backend_call(self.backend.get, full_key)
+                if value is not MISSING:
+                    stats.coalesced += 1
+                    return value
+                generation = self.generation(namespace)
+                value = loader()
+                stats.loads += 1
+                if populate and value is not None and self.generation(namespace) == generation:
+                    self._backend_call(self.backend.set, full_key, value, ttl or self.ttl, default=None)
+                return value
+        finally:
+            with self._key_locks_guard:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    self._key_locks.pop(full_key, None)
+
+    def get_many_or_load(
+        self,
+        namespace: str,
+        keys: Iterable[Any],
+        loader: Callable[[List[Any]], Dict[Any, Any]],
+        ttl: Optional[int] = None,
+        populate: bool = True,
+    ) -> Dict[Any, Any]:
+        """
+        Returns the values of all `keys` that are cached or can be loaded.
+
+        `loader` is called once with the keys that missed and returns a
+        dictionary of the values it found; keys it leaves out are reported as
+        absent and not cached. Unlike `get_or_load`, misses are not coalesced
+        with concurrent readers, but the same generation check guards the
+        stores; `populate` is as in `get_or_load`.
+        """
+        stats = self._ns_stats(namespace)
+        found: Dict[Any, Any] = {}
+        missing = []
+        for key in keys:
+            value = self._backend_call(self.backend.get, f"{namespace}:{key}")
+            if value is MISSING:
+                missing.append(key)
+            else:
+                found[key] = value
+        stats.hits += len(found)
+        stats.misses += len(missing)
+        if not missing:
+            return found
+
+        generation = self.generation(namespace)
+        loaded = loader(missing)
+        stats.loads += 1
+        if populate and self.generation(namespace) == generation:
+            for key, value in loaded.items():
+                if value is not None:
+                    self._backend_call(self.backend.set, f"{namespace}:{key}", value, ttl or self.ttl, default=None)
+        found.update(loaded)
+        return found
+
+    def invalidate(self, namespace: str, key: Any = None) -> None:
+        """
+        Drops `key` (if given) and bumps the namespace generation, which
+        invalidates every list page cached for the namespace.
+        """
+        if key is not None:
+            self._backend_call(self.backend.delete, f"{namespace}:{key}", default=None)
+        self._backend_call(self.backend.incr, f"{namespace}:gen", default=None)
+        self._ns_stats(namespace).invalidations += 1
+
+    def clear(self) -> None:
+        self._backend_call(self.backend.clear, default=None)
+
+    def stats(self) -> Dict[str, Any]:
+        namespaces = {name: s.as_dict() for name, s in sorted(self._stats.items())}
+        hits = sum(s.hits for s in self._stats.values())
+        lookups = hits + sum(s.misses for s in self._stats.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "ttl_seconds": self.ttl,
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+            "namespaces": namespaces,
+        }
+
+
+def build_cache() -> Cache:
+    """Creates the application cache from `settings.CACHE_BACKEND`."""
+    kind = settings.CACHE_BACKEND.lower()
+    if kind == "memory":
+        backend: CacheBackend = LRUBackend(max_entries=settings.CACHE_MAX_ENTRIES)
+    elif kind == "redis":
+        backend = RedisBackend(settings.CACHE_REDIS_URL)
+    elif kind == "none":
+        backend = NullBackend()
+    else:
+        raise ValueError(f"Unknown CACHE_BACKEND {settings.CACHE_BACKEND!r}")
+    return Cache(backend, ttl=settings.CACHE_TTL_SECONDS)
+
+
+cache = build_cache()
+"""Global cache instance used by the crud modules."""
+
+
+def row_to_dict(obj: Any) -> Optional[Dict[str, Any]]:
+    """Returns the column values of an ORM instance as a plain dictionary."""
+    if obj is None:
+        return None
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(obj).mapper.column_attrs}
+
+
+_converters: Dict[type, list] = {}
+
+
+def _column_converters(model: type) -> list:
+    """Returns `(key, converter)` pairs for a model's columns, computed once per model."""
+    converters = _converters.get(model)
+    if converters is None:
+        converters = []
+        for attr in inspect(model).mapper.column_attrs:
+            column_type = attr.expression.type
+            if isinstance(column_type, SAEnum) and column_type.enum_class is not None:
+                converter = column_type.enum_class
+            elif isinstance(column_type, DateTime):
+                converter = datetime.fromisoformat
+            elif isinstance(column_type, Date):
+                converter = date.fromisoformat
+            else:
+                converter = None
+            converters.append((attr.key, converter))
+        _converters[model] = converters
+    return converters
+
+
+def restore_row(model: type, data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Returns a copy of a cached column dictionary with Python types restored.
+
+    Values coming back from JSON (Redis) are plain strings; dates and enums are
+    converted back based on the column types.
+    """
+    row = {}
+    for key, converter in _column_converters(model):
+        value = data.get(key)
+        if converter is not None and isinstance(value, str):
+            value = converter(value)
+        row[key] = value
+    return row
+
+
+def attach_row(db: Session, model: type, data: Optional[Dict[str, Any]]) -> Any:
+    """
+    Turns a cached column dictionary back into a persistent instance of `db`.
+
+    No SQL is emitted. If the session already holds the identity, that instance
+    is returned instead. The instance is built the way the ORM loader builds
+    rows (attributes written straight into `__dict__`, identity key assigned),
+    which is several times cheaper than `Session.merge(load=False)`.
+    """
+    if data is None:
+        return None
+    mapper = inspect(model)
+    row = restore_row(model, data)
+    key = mapper.identity_key_from_primary_key([row[mapper.get_property_by_column(c).key] for c in mapper.primary_key])
+    existing = db.identity_map.get(key)
+    if existing is not None:
+        return existing
+    obj = mapper.class_manager.new_instance()
+    obj.__dict__.update(row)
+    instance_state(obj).key = key  # now "detached": clean, loaded, with an identity
+    db.add(obj)
+    return obj
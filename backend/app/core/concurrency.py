@@ -0,0 +1,169 @@
+"""
+Threadpool Partitioning for Sync Endpoints.
+
+Every sync (`def`) endpoint and dependency runs in AnyIO's worker threadpool,
+whose size is `THREADPOOL_SIZE` tokens per worker process. Left alone, slow
+route groups (bcrypt logins, LLM rewrites) can hold every token while cheap
+GETs queue behind them.
+
+This module splits the pool into route groups, each with its own
+`anyio.CapacityLimiter`:
+
+- `auth`: endpoints that hash or verify passwords (`THREADPOOL_AUTH_TOKENS`).
+- `rewrite`: the OpenAI-backed rewrite endpoint (`THREADPOOL_REWRITE_TOKENS`).
+- `default`: everything else, which gets the remaining tokens.
+
+A request acquires its group's token (asynchronously, without occupying a
+thread) before any of its sync code runs, so a group can never use more than
+its share of the pool, and the group capacities add up to the pool size so
+admitted requests do not queue inside the pool itself. The time spent waiting
+for a token is recorded per group and exposed at `/metrics/threadpool`.
+
+Endpoints opt into a group with the `route_group` decorator; routers opt into
+the limiting with `Depends(threadpool_slot)`.
+"""
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import anyio
+from anyio import to_thread
+from fastapi import Request
+
+from app.core.config import settings
+
+DEFAULT_GROUP = "default"
+
+
+def route_group(name: str) -> Callable:
+    """Assigns the decorated endpoint to the threadpool route group `name`."""
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.route_group = name
+        return endpoint
+    return decorator
+
+
+class RouteGroupLimiter:
+    """
+    Capacity limiter of one route group with queue-wait statistics.
+
+    Args:
+        name: The route group name.
+        capacity: Maximum number of the group's requests running at once.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.limiter = anyio.CapacityLimiter(capacity)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.waited = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def acquire(self, borrower: object) -> None:
+        try:
+            # Also raises while other requests queue, even if a token was just released to them
+            self.limiter.acquire_on_behalf_of_nowait(borrower)
+            waited = None
+        except anyio.WouldBlock:
+            started = time.perf_counter()
+            await self.limiter.acquire_on_behalf_of(borrower)
+            waited = time.perf_counter() - started
+        with self._lock:
+            self.requests += 1
+            if waited is not None:
+                self.waited += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def release(self, borrower: object) -> None:
+        self.limiter.release_on_behalf_of(borrower)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "in_use": self.limiter.borrowed_tokens,
+                "queued": self.limiter.statistics().tasks_waiting,
+                "requests": self.requests,
+                "waited": self.waited,
+                "wait_ms_total": round(self.wait_seconds_total * 1000, 3),
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.requests, 3) if self.requests else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+            }
+
+
+class ThreadpoolPartition:
+    """The threadpool size and the limiters of all route groups of this worker."""
+
+    def __init__(self):
+        self.total_tokens = settings.THREADPOOL_SIZE
+        self.groups: Dict[str, RouteGroupLimiter] = {}
+
+    def configure(
+        self, total_tokens: int, auth_tokens: int, rewrite_tokens: int
+    ) -> None:
+        """
+        Sizes AnyIO's default threadpool and (re)creates the group limiters.
+
+        Must be called from within the event loop (the lifespan handler does).
+
+        Raises:
+            ValueError: If the dedicated groups leave no token for `default`.
+        """
+        default_tokens = total_tokens - auth_tokens - rewrite_tokens
+        if min(auth_tokens, rewrite_tokens, default_tokens) < 1:
+            raise ValueError(
+                f"THREADPOOL_SIZE={total_tokens} must exceed THREADPOOL_AUTH_TOKENS={auth_tokens} + "
+                f"THREADPOOL_REWRITE_TOKENS={rewrite_tokens}, and each group needs at least one token"
+            )
+        to_thread.current_default_thread_limiter().total_tokens = total_tokens
+        self.total_tokens = total_tokens
+        self.groups = {
+            "auth": RouteGroupLimiter("auth", auth_tokens),
+            "rewrite": RouteGroupLimiter("rewrite", rewrite_tokens),
+            DEFAULT_GROUP: RouteGroupLimiter(DEFAULT_GROUP, default_tokens),
+        }
+
+    def group(self, name: Optional[str]) -> Optional[RouteGroupLimiter]:
+        return self.groups.get(name or DEFAULT_GROUP)
+
+    def stats(self) -> dict:
+        pool = None
+        try:
+            limiter = to_thread.current_default_thread_limiter()
+            pool = {
+                "total_tokens": limiter.total_tokens,
+                "in_use": limiter.borrowed_tokens,
+                "queued": limiter.statistics().tasks_waiting,
+            }
+        except RuntimeError:  # no running event loop
+            pass
+        return {"threadpool": pool, "groups": {name: group.stats() for name, group in self.groups.items()}}
+
+
+partition = ThreadpoolPartition()
+"""Global threadpool partition of this worker process; configured at startup."""
+
+
+async def threadpool_slot(request: Request):
+    """
+    FastAPI dependency holding a token of the endpoint's route group for the
+    duration of the request.
+
+    Async endpoints never enter the threadpool and are not limited.
+    """
+    endpoint = request.scope.get("endpoint")
+    group = partition.group(getattr(endpoint, "route_group", None))
+    if group is None or asyncio.iscoroutinefunction(endpoint):
+        yield
+        return
+    borrower = object()
+    await group.acquire(borrower)
+    try:
+        yield
+    finally:
+        group.release(borrower)
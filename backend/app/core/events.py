@@ -0,0 +1,262 @@
+"""
+Change Event Broker.
+
+The crud modules publish a `ChangeEvent` after every committed create, update or
+delete of objectives, progress updates and team members. Connected WebSocket and
+SSE clients subscribe with a filter and receive matching events, so the
+frontend no longer needs to poll the list endpoints.
+
+Two brokers are available (see `settings.EVENT_BROKER`):
+
+- `InProcessBroker`: fans events out to the subscribers of the current process.
+  Correct only when the API runs as a single worker.
+- `PostgresBroker`: publishes with `NOTIFY` and receives with `LISTEN` on a
+  dedicated connection, so every worker sees the events of every other worker.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Iterable, List, Optional, Set
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RESOURCES = ("objective", "progress_update", "team_member")
+"""Resources that publish change events."""
+
+
+@dataclass
+class ChangeEvent:
+    """A committed change to one row."""
+    resource: str
+    action: str  # "created", "updated" or "deleted"
+    id: int
+    objective_id: Optional[int] = None
+    timestamp: float = field(default_factory=time.time)
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, raw: str) -> "ChangeEvent":
+        return cls(**json.loads(raw))
+
+
+@dataclass
+class EventFilter:
+    """
+    Subscription filter. `None` means "no restriction" for each criterion.
+
+    Attributes:
+        resources: Only deliver events for these resources.
+        ids: Only deliver events for rows with these ids.
+        objective_ids: Only deliver events belonging to these objectives
+                       (the objective itself or its progress updates).
+    """
+    resources: Optional[Set[str]] = None
+    ids: Optional[Set[int]] = None
+    objective_ids: Optional[Set[int]] = None
+
+    def matches(self, event: ChangeEvent) -> bool:
+        if self.resources is not None and event.resource not in self.resources:
+            return False
+        if self.ids is not None and event.id not in self.ids:
+            return False
+        if self.objective_ids is not None and event.objective_id not in self.objective_ids:
+            return False
+        return True
+
+
+class Subscription:
+    """
+    A subscriber's bounded queue, bound to the event loop that consumes it.
+
+    Events are handed over with `call_soon_threadsafe` because they are published
+    from the threadpool threads that run the (sync) crud functions. When a slow
+    client lets its queue fill up, further events are dropped and `dropped` is
+    incremented; the client should then re-fetch the lists it displays.
+    """
+
+    def __init__(self, event_filter: EventFilter, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.filter = event_filter
+        self.loop = loop
+        self.queue: "asyncio.Queue[ChangeEvent]" = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def _put(self, event: ChangeEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def deliver(self, event: ChangeEvent) -> None:
+        if self.filter.matches(event):
+            try:
+                self.loop.call_soon_threadsafe(self._put, event)
+            except RuntimeError:  # the loop is already closed
+                pass
+
+    async def get(self) -> ChangeEvent:
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """Fans events out to the subscribers of this process."""
+
+    def __init__(self, queue_size: int = 1000):
+        self.queue_size = queue_size
+        self._subscriptions: List[Subscription] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+    def subscribe(self, event_filter: EventFilter) -> Subscription:
+        """Registers a subscriber; must be called from the consuming event loop."""
+        subscription = Subscription(event_filter, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions = self._subscriptions + [subscription]
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions = [s for s in self._subscriptions if s is not subscription]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    def _fan_out(self, event: ChangeEvent) -> None:
+        # The list is replaced, never mutated, so iterating without the lock is safe.
+        for subscription in self._subscriptions:
+            subscription.deliver(event)
+
+    def publish(self, event: ChangeEvent) -> None:
+        self._fan_out(event)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Broker using Postgres `LISTEN`/`NOTIFY`, for deployments with several workers.
+
+    `publish` only sends a `NOTIFY`; delivery to local subscribers happens when
+    the notification comes back on the listener connection, so every worker
+    (including the publishing one) sees each event exactly once.
+    """
+
+    def __init__(self, engine, channel: str, queue_size: int = 1000):
+        super().__init__(queue_size)
+        self.engine = engine
+        self.channel = channel
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._notify_conn = None
+        self._notify_lock = threading.Lock()
+
+    def _connect(self):
+        # Take a connection configured like the application's pool, but own it.
+        raw = self.engine.raw_connection()
+        raw.detach()
+        conn = raw.driver_connection
+        conn.autocommit = True
+        return conn
+
+    def start(self) -> None:
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._listen, name="event-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        with self._notify_lock:
+            if self._notify_conn is not None:
+                self._notify_conn.close()
+                self._notify_conn = None
+
+    def publish(self, event: ChangeEvent) -> None:
+        with self._notify_lock:
+            try:
+                if self._notify_conn is None or self._notify_conn.closed:
+                    self._notify_conn = self._connect()
+                with self._notify_conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, event.to_json()))
+            except Exception as exc:  # noqa: BLE001
+                # The write itself is committed; losing a notification only delays clients.
+                logger.warning("Could not publish change event: %s", exc)
+                self._notify_conn = None
+
+    def _listen(self) -> None:
+        backoff = 1.0
+        while not self._stopping.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                backoff = 1.0
+                while not self._stopping.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notification = conn.notifies.pop(0)
+                        try:
+                            self._fan_out(ChangeEvent.from_json(notification.payload))
+                        except (TypeError, ValueError) as exc:
+                            logger.warning("Ignoring malformed change event: %s", exc)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Change event listener disconnected: %s; retrying in %.0fs", exc, backoff)
+                self._stopping.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+
+def build_broker():
+    """Creates the event broker selected by `settings.EVENT_BROKER`."""
+    kind = settings.EVENT_BROKER.lower()
+    if kind == "memory":
+        return InProcessBroker(settings.EVENT_QUEUE_SIZE)
+    if kind == "postgres":
+        from app.db.session import engine
+
+        return PostgresBroker(engine, settings.EVENT_CHANNEL, settings.EVENT_QUEUE_SIZE)
+    raise ValueError(f"Unknown EVENT_BROKER {settings.EVENT_BROKER!r}")
+
+
+broker = build_broker()
+"""Global broker instance; the crud modules publish to it."""
+
+
+def publish(resource: str, action: str, id: int, objective_id: Optional[int] = None) -> None:
+    """Publishes a change event; called by the crud modules after a successful commit."""
+    broker.publish(ChangeEvent(resource=resource, action=action, id=id, objective_id=objective_id))
+
+
+def parse_filter(
+    resources: Optional[Iterable[str]] = None,
+    ids: Optional[Iterable[int]] = None,
+    objective_ids: Optional[Iterable[int]] = None,
+) -> EventFilter:
+    """Builds an `EventFilter`, rejecting unknown resource names with ValueError."""
+    resource_set = {r.strip() for r in resources if r.strip()} if resources else None
+    if resource_set:
+        unknown = resource_set.difference(RESOURCES)
+        if unknown:
+            raise ValueError(f"Unknown resources: {', '.join(sorted(unknown))}")
+    return EventFilter(
+        resources=resource_set or None,
+        ids=set(ids) if ids else None,
+        objective_ids=set(objective_ids) if objective_ids else None,
+    )
@@ -0,0 +1,133 @@
+"""
+HTTP Conditional Request Helpers.
+
+This module provides small helpers for ETag / Last-Modified validators and the
+evaluation of `If-None-Match` / `If-Modified-Since` request headers, so endpoints
+can answer polling clients with `304 Not Modified` before loading or serializing
+anything expensive.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+
+from fastapi import Response, status
+
+NO_CACHE = "private, no-cache"
+"""Cache-Control for dynamic resources: clients may store them but must revalidate."""
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Builds a strong ETag from the given validator parts (e.g. resource name, id
+    and last change timestamp).
+
+    Returns:
+        The quoted ETag value, ready to be used as a header.
+    """
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return f'"{digest[:20]}"'
+
+
+def version_etag(version: int) -> str:
+    """Builds the ETag of a row from its `version` column; see `if_match_versions`."""
+    return f'"v{version}"'
+
+
+def if_match_versions(if_match: Optional[str]) -> Optional[List[int]]:
+    """
+    Returns the row versions listed in an `If-Match` header.
+
+    None means the write is unconditional (no header, or `*`). ETags that are
+    not version ETags are dropped, so an empty list means the precondition
+    cannot hold. Weak version ETags (`W/"v3"`) count as their version: a
+    version ETag names the row version, not the bytes, and the compression
+    middleware weakens the ETag of every response it compresses.
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    versions = []
+    for candidate in if_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate.startswith('"v') and candidate.endswith('"') and candidate[2:-1].isdigit():
+            versions.append(int(candidate[2:-1]))
+    return versions
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; the database always stores UTC.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Formats a datetime as an RFC 7231 HTTP-date."""
+    return format_datetime(_as_utc(value).replace(microsecond=0), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluates an `If-None-Match` header against the current ETag using the
+    weak comparison function required by RFC 7232.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == current for candidate in if_none_match.split(","))
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: Optional[datetime]) -> bool:
+    """Returns True if the resource has not changed since the `If-Modified-Since` date."""
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since is None:
+        return False
+    return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+
+def is_not_modified(
+    etag: str,
+    if_none_match: Optional[str],
+    last_modified: Optional[datetime] = None,
+    if_modified_since: Optional[str] = None,
+) -> bool:
+    """
+    Decides whether a conditional GET can be answered with 304.
+
+    `If-Modified-Since` is only considered when the request carries no
+    `If-None-Match`, as mandated by RFC 7232 section 6.
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    return not_modified_since(if_modified_since, last_modified)
+
+
+def set_cache_headers(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = NO_CACHE,
+) -> None:
+    """Sets the validator and Cache-Control headers on an outgoing response."""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    if last_modified is not None:
+        response.headers["Last-Modified"] = http_date(last_modified)
+
+
+def not_modified_response(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = NO_CACHE,
+) -> Response:
+    """Builds an empty `304 Not Modified` response carrying the current validators."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag, last_modified, cache_control)
+    return response
@@ -0,0 +1,292 @@
+"""
+Token Bucket Rate Limiting.
+
+Each bucket holds up to `capacity` tokens and refills continuously at
+`capacity / period` tokens per second; a request takes one token from every
+bucket that applies to it and is rejected, without taking any, if one of them
+is empty. Buckets are keyed by strings such as `login:user:jane` or
+`login:ip:203.0.113.7`.
+
+Backends follow `RATE_LIMIT_BACKEND`:
+
+- `memory`: per-process buckets (bounded LRU). Every worker counts on its
+  own, so the effective limit is multiplied by `WEB_CONCURRENCY`.
+- `redis`: buckets shared by all workers on any server speaking the Redis
+  protocol (`RATE_LIMIT_REDIS_URL`), updated atomically by a Lua script.
+  Requires the optional `redis` package.
+- `none`: disables rate limiting.
+
+`login_rate_limit` applies the limits to the endpoints marked with
+`throttle_login`. It runs ahead of the threadpool slot, so a credential
+stuffing burst is turned away on the event loop, before the user lookup and
+before bcrypt, and never queues for the `auth` route group.
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response, status
+
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """
+    Parses a rate such as `"5/minute"` into `(capacity, period in seconds)`.
+
+    Raises:
+        ValueError: If the rate is malformed.
+    """
+    try:
+        count, period = rate.strip().split("/")
+        return int(count), PERIODS[period.strip().lower()]
+    except (KeyError, ValueError) as exc:
+        raise ValueError(f"Invalid rate {rate!r}; expected e.g. '5/minute' ({', '.join(PERIODS)})") from exc
+
+
+class Bucket(NamedTuple):
+    key: str
+    capacity: int
+    period: int
+
+    @property
+    def refill_per_second(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of taking a token, reported for the bucket closest to empty."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float = 0.0
+    """Seconds until the request would be allowed (0 if it was)."""
+    reset_after: float = 0.0
+    """Seconds until the bucket is full again."""
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(math.ceil(self.reset_after)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+def _result(allowed: bool, buckets: Sequence[Bucket], levels: List[float]) -> RateLimitResult:
+    """Builds the result from the bucket levels after the request (before it, if rejected)."""
+    index = min(range(len(buckets)), key=lambda i: levels[i] / buckets[i].capacity)
+    bucket, level = buckets[index], levels[index]
+    retry_after = 0.0
+    if not allowed:
+        retry_after = max((1 - levels[i]) / buckets[i].refill_per_second for i in range(len(buckets)) if levels[i] < 1)
+    return RateLimitResult(
+        allowed=allowed,
+        limit=bucket.capacity,
+        remaining=max(int(level), 0),
+        retry_after=retry_after,
+        reset_after=(bucket.capacity - level) / bucket.refill_per_second,
+    )
+
+
+class RateLimitBackend:
+    """Interface of the rate limit backends."""
+
+    def take(self, buckets: Sequence[Bucket]) -> RateLimitResult:
+        """Takes a token from each bucket if all have one; `buckets` must not be empty."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class NullRateLimitBackend(RateLimitBackend):
+    def take(self, buckets: Sequence[Bucket]) -> RateLimitResult:
+        return RateLimitResult(allowed=True, limit=buckets[0].capacity, remaining=buckets[0].capacity)
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Per-process buckets; the least recently used are dropped beyond `max_entries` (they count as full)."""
+
+    def __init__(self, max_entries: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, buckets: Sequence[Bucket]) -> RateLimitResult:
+        now = self.clock()
+        with self._lock:
+            levels = []
+            for bucket in buckets:
+                level, updated = self._buckets.get(bucket.key, (bucket.capacity, now))
+                levels.append(min(bucket.capacity, level + (now - updated) * bucket.refill_per_second))
+            allowed = all(level >= 1 for level in levels)
+            if allowed:
+                levels = [level - 1 for level in levels]
+                for bucket, level in zip(buckets, levels):
+                    self._buckets[bucket.key] = (level, now)
+                    self._buckets.move_to_end(bucket.key)
+                while len(self._buckets) > self.max_entries:
+                    self._buckets.popitem(last=False)
+        return _result(allowed, buckets, levels)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+# KEYS: bucket keys; ARGV: capacity and refill per second of each bucket, in order.
+# Returns {allowed, level of each bucket as a string}; buckets are only updated if all have a token.
+TAKE_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local levels = {}
+local allowed = 1
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'level', 'updated')
+    local level = capacity
+    if state[1] then
+        level = math.min(capacity, tonumber(state[1]) + (now - tonumber(state[2])) * rate)
+    end
+    levels[i] = level
+    if level < 1 then
+        allowed = 0
+    end
+end
+local result = {allowed}
+for i, key in ipairs(KEYS) do
+    if allowed == 1 then
+        levels[i] = levels[i] - 1
+        local capacity = tonumber(ARGV[2 * i - 1])
+        local rate = tonumber(ARGV[2 * i])
+        redis.call('HSET', key, 'level', tostring(levels[i]), 'updated', tostring(now))
+        redis.call('PEXPIRE', key, math.ceil((capacity - levels[i]) / rate * 1000) + 1000)
+    end
+    result[i + 1] = tostring(levels[i])
+end
+return result
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Buckets shared by all workers, stored as hashes that expire once full again.
+    A compatible client can be injected.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "fastnuxt:ratelimit:", client: Any = None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package to be installed.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_SCRIPT)
+
+    def take(self, buckets: Sequence[Bucket]) -> RateLimitResult:
+        args: List[float] = []
+        for bucket in buckets:
+            args += [bucket.capacity, bucket.refill_per_second]
+        allowed, *levels = self._take(keys=[self.prefix + bucket.key for bucket in buckets], args=args)
+        return _result(bool(int(allowed)), buckets, [float(level) for level in levels])
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def build_rate_limiter() -> RateLimitBackend:
+    """Creates the rate limit backend from `settings.RATE_LIMIT_BACKEND`."""
+    kind = settings.RATE_LIMIT_BACKEND.lower()
+    if kind == "memory":
+        return MemoryRateLimitBackend()
+    if kind == "redis":
+        return RedisRateLimitBackend(settings.RATE_LIMIT_REDIS_URL)
+    if kind == "none":
+        return NullRateLimitBackend()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND {settings.RATE_LIMIT_BACKEND!r}")
+
+
+rate_limiter = build_rate_limiter()
+"""Global rate limit backend of this worker process."""
+
+LOGIN_PER_USERNAME = parse_rate(settings.LOGIN_RATE_LIMIT_PER_USERNAME)
+LOGIN_PER_IP = parse_rate(settings.LOGIN_RATE_LIMIT_PER_IP)
+
+
+def throttle_login(endpoint: Callable) -> Callable:
+    """Marks the decorated endpoint as a login endpoint, limited by `login_rate_limit`."""
+    endpoint.throttle_login = True
+    return endpoint
+
+
+def client_ip(request: Request) -> str:
+    """The client address (behind a proxy, run uvicorn with `--forwarded-allow-ips` so this is the real client)."""
+    return request.client.host if request.client else "unknown"
+
+
+async def _submitted_username(request: Request) -> Optional[str]:
+    """The username of a JSON or form login request; FastAPI has already read and cached the body."""
+    try:
+        if request.headers.get("content-type", "").startswith("application/json"):
+            body = await request.json()
+            username = body.get("username") if isinstance(body, dict) else None
+        else:
+            username = (await request.form()).get("username")
+    except ValueError:
+        return None
+    return username.strip().lower() if isinstance(username, str) else None
+
+
+async def login_rate_limit(request: Request, response: Response):
+    """
+    FastAPI dependency limiting the login attempts per username
+    (`LOGIN_RATE_LIMIT_PER_USERNAME`) and per client IP
+    (`LOGIN_RATE_LIMIT_PER_IP`) on endpoints marked with `throttle_login`.
+
+    Every attempt counts, successful or not, since the outcome is only known
+    after bcrypt. Responses carry `X-RateLimit-*` headers for the bucket
+    closest to empty (endpoints add them to their own errors with
+    `rate_limit_headers`); rejected attempts get `429` with `Retry-After`.
+    """
+    if not getattr(request.scope.get("endpoint"), "throttle_login", False):
+        return
+    buckets = [Bucket(f"login:ip:{client_ip(request)}", *LOGIN_PER_IP)]
+    username = await _submitted_username(request)
+    if username:
+        buckets.append(Bucket(f"login:user:{username}", *LOGIN_PER_USERNAME))
+    result = rate_limiter.take(buckets)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers=result.headers(),
+        )
+    request.state.rate_limit = result
+    response.headers.update(result.headers())
+
+
+def rate_limit_headers(request: Request) -> Dict[str, str]:
+    """The `X-RateLimit-*` headers of the request's login attempt, for an `HTTPException`."""
+    result = getattr(request.state, "rate_limit", None)
+    return result.headers() if result is not None else {}
@@ -0,0 +1,232 @@
+"""
+Token Revocation Store.
+
+Keeps track of JWTs that must no longer be accepted before they expire:
+
+- used refresh tokens (by `jti`): refresh tokens are single-use and rotated, so
+  presenting one a second time means it was stolen, and its whole family is
+  revoked;
+- refresh token families (`fam`, shared by all tokens rotated from one login):
+  revoked on reuse and on logout;
+- per-user cutoffs: tokens of the user issued before the cutoff (`iat`) are
+  rejected, e.g. after a password change.
+
+Every entry expires when the tokens it concerns would have expired anyway, so
+the store stays small. Lookups are a dictionary access (`MemoryRevocationStore`)
+or a single round trip (`RedisRevocationStore`), never a database query; the
+access token check in `get_current_user` is one lookup.
+
+Backends follow `REVOCATION_BACKEND`:
+
+- `memory`: per process, written through to the `revoked_tokens` table and
+  loaded from it at startup, so revocations survive a restart. Revocations are
+  only seen by the worker that made them: with several workers a logged-out or
+  password-changed user's tokens stay valid on the others and refresh token
+  reuse goes undetected. It only works with a single process, and
+  `python -m app.serve` refuses to start more than one worker with it.
+- `redis`: any server speaking the Redis protocol (`REVOCATION_REDIS_URL`),
+  shared by all workers. Requires the optional `redis` package.
+"""
+import math
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.models.revoked_token import revoked_tokens
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+
+class RevocationStore:
+    """Interface of the revocation backends. Times are Unix timestamps."""
+
+    def use_token(self, jti: str, expires_at: float) -> bool:
+        """
+        Marks the refresh token `jti` as used.
+
+        Returns:
+            bool: True the first time, False if it had been used before (reuse).
+        """
+        raise NotImplementedError
+
+    def revoke_family(self, family: str, expires_at: float) -> None:
+        """Revokes all refresh tokens of `family`, for tokens expiring until `expires_at`."""
+        raise NotImplementedError
+
+    def revoke_user(self, user_id: int, issued_before: int, expires_at: float) -> None:
+        """Revokes the user's tokens issued before `issued_before`, until `expires_at`."""
+        raise NotImplementedError
+
+    def is_revoked(self, user_id: int, issued_at: Optional[int], family: Optional[str] = None) -> bool:
+        """Whether a token of `user_id` issued at `issued_at` (of `family`, if given) is revoked."""
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def load(self) -> int:
+        """Reads persisted entries at startup; returns how many were loaded. Shared backends have none."""
+        return 0
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    Per-process store; expired entries are purged every `purge_every` writes.
+
+    With an `engine`, every entry is also written to the `revoked_tokens` table
+    (in the same lock, so the table never lags behind memory) and `load` reads
+    them back after a restart.
+    """
+
+    def __init__(self, purge_every: int = 1000, engine: Optional[Engine] = None):
+        self._lock = threading.Lock()
+        self._used: Dict[str, float] = {}
+        self._families: Dict[str, float] = {}
+        self._users: Dict[int, tuple] = {}
+        self._writes = 0
+        self._purge_every = purge_every
+        self._engine = engine
+
+    def _purge(self, now: float) -> bool:
+        self._writes += 1
+        if self._writes % self._purge_every:
+            return False
+        for entries in (self._used, self._families):
+            for key in [key for key, expires_at in entries.items() if expires_at <= now]:
+                del entries[key]
+        for key in [key for key, (_, expires_at) in self._users.items() if expires_at <= now]:
+            del self._users[key]
+        return True
+
+    def _persist(
+        self, kind: str, key: Any, expires_at: float, issued_before: Optional[int] = None, purge: bool = False
+    ) -> None:
+        if self._engine is None:
+            return
+        with self._engine.begin() as conn:
+            conn.execute(delete(revoked_tokens).where(revoked_tokens.c.kind == kind, revoked_tokens.c.key == str(key)))
+            conn.execute(insert(revoked_tokens).values(
+                kind=kind, key=str(key), issued_before=issued_before, expires_at=expires_at
+            ))
+            if purge:
+                conn.execute(delete(revoked_tokens).where(revoked_tokens.c.expires_at <= time.time()))
+
+    def load(self) -> int:
+        if self._engine is None:
+            return 0
+        with self._engine.begin() as conn:
+            conn.execute(delete(revoked_tokens).where(revoked_tokens.c.expires_at <= time.time()))
+            rows = conn.execute(select(
+                revoked_tokens.c.kind, revoked_tokens.c.key, revoked_tokens.c.issued_before, revoked_tokens.c.expires_at
+            )).all()
+        with self._lock:
+            for kind, key, issued_before, expires_at in rows:
+                if kind == "jti":
+                    self._used[key] = max(expires_at, self._used.get(key, 0))
+                elif kind == "fam":
+                    self._families[key] = max(expires_at, self._families.get(key, 0))
+                elif kind == "user" and int(key) not in self._users:  # a newer in-memory cutoff wins
+                    self._users[int(key)] = (issued_before, expires_at)
+        return len(rows)
+
+    def use_token(self, jti: str, expires_at: float) -> bool:
+        now = time.time()
+        with self._lock:
+            previous = self._used.get(jti)
+            if previous is not None and previous > now:
+                return False
+            self._used[jti] = expires_at
+            self._persist("jti", jti, expires_at, purge=self._purge(now))
+            return True
+
+    def revoke_family(self, family: str, expires_at: float) -> None:
+        with self._lock:
+            self._families[family] = max(expires_at, self._families.get(family, 0))
+            self._persist("fam", family, self._families[family], purge=self._purge(time.time()))
+
+    def revoke_user(self, user_id: int, issued_before: int, expires_at: float) -> None:
+        with self._lock:
+            self._users[user_id] = (issued_before, expires_at)
+            self._persist("user", user_id, expires_at, issued_before, purge=self._purge(time.time()))
+
+    def is_revoked(self, user_id: int, issued_at: Optional[int], family: Optional[str] = None) -> bool:
+        now = time.time()
+        if family is not None and self._families.get(family, 0) > now:
+            return True
+        cutoff = self._users.get(user_id)
+        return cutoff is not None and cutoff[1] > now and (issued_at or 0) < cutoff[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._used.clear()
+            self._families.clear()
+            self._users.clear()
+            if self._engine is not None:
+                with self._engine.begin() as conn:
+                    conn.execute(delete(revoked_tokens))
+
+
+class RedisRevocationStore(RevocationStore):
+    """
+    Store for servers speaking the Redis protocol; entries are keys with the
+    remaining token lifetime as TTL. A compatible client can be injected.
+    """
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "fastnuxt:revoked:", client: Any = None):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("REVOCATION_BACKEND=redis requires the 'redis' package to be installed.")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    @staticmethod
+    def _ttl(expires_at: float) -> int:
+        return max(math.ceil(expires_at - time.time()), 1)
+
+    def use_token(self, jti: str, expires_at: float) -> bool:
+        # SET NX is atomic: of two concurrent refreshes with the same token, only one wins
+        return bool(self.client.set(f"{self.prefix}jti:{jti}", 1, nx=True, ex=self._ttl(expires_at)))
+
+    def revoke_family(self, family: str, expires_at: float) -> None:
+        self.client.set(f"{self.prefix}fam:{family}", 1, ex=self._ttl(expires_at))
+
+    def revoke_user(self, user_id: int, issued_before: int, expires_at: float) -> None:
+        self.client.set(f"{self.prefix}user:{user_id}", issued_before, ex=self._ttl(expires_at))
+
+    def is_revoked(self, user_id: int, issued_at: Optional[int], family: Optional[str] = None) -> bool:
+        if family is None:
+            cutoff = self.client.get(f"{self.prefix}user:{user_id}")
+            family_revoked = None
+        else:
+            cutoff, family_revoked = self.client.mget(f"{self.prefix}user:{user_id}", f"{self.prefix}fam:{family}")
+        if family_revoked is not None:
+            return True
+        return cutoff is not None and (issued_at or 0) < int(cutoff)
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+
+def build_revocation_store() -> RevocationStore:
+    """Creates the revocation store from `settings.REVOCATION_BACKEND`."""
+    kind = settings.REVOCATION_BACKEND.lower()
+    if kind == "memory":
+        from app.db.session import engine
+
+        return MemoryRevocationStore(engine=engine)
+    if kind == "redis":
+        return RedisRevocationStore(settings.REVOCATION_REDIS_URL)
+    raise ValueError(f"Unknown REVOCATION_BACKEND {settings.REVOCATION_BACKEND!r}")
+
+
+revocation = build_revocation_store()
+"""Global revocation store used by the authentication endpoints."""
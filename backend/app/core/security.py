@@ -2,23 +2,76 @@
 Password Hashing and Verification Utilities.
 
 This module provides functions for hashing new passwords and verifying existing
-passwords against their stored hashes using the Passlib library.
+passwords against their stored hashes using the Passlib library, and for
+creating and verifying the JWT access and refresh tokens (signed by the token
+service, `app.core.tokens`).
+
+Every token carries its issue time (`iat`), so all tokens of a user issued
+before a cutoff can be revoked (`revoke_user_tokens`). Refresh tokens also
+carry a unique id (`jti`) and the id of their family (`fam`): each use rotates
+them, and the revocation store (`app.core.revocation`) remembers used ids.
 """
-from passlib.context import CryptContext
+import time
+import uuid
 from datetime import datetime, timedelta
-from jose import jwt
+from functools import lru_cache
+from typing import Optional, Tuple
+from jose import JWTError
 from app.core.config import settings
+from app.core.revocation import revocation
+from app.core.tokens import get_token_service
+
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+"""Supported password hash schemes; hashes of all of them are verified, new ones use `PASSWORD_HASH_SCHEME`."""
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """
+    Returns the process-wide CryptContext, configured by the password hashing
+    settings: new hashes use `PASSWORD_HASH_SCHEME` (bcrypt with
+    `PASSWORD_BCRYPT_ROUNDS`, or argon2id with `PASSWORD_ARGON2_*`).
+
+    Passlib (and its bcrypt backend) is imported on first use rather than at
+    application import, so startup does not pay for it; only the login and
+    user-management routes do, once.
+    Hashes of the other scheme, or with other cost parameters (bcrypt rounds
+    above or below the setting, other argon2 costs), are reported by
+    `verify_and_update_password` as needing a rehash.
+
+    Raises:
+        ValueError: If `PASSWORD_HASH_SCHEME` is not supported.
+        RuntimeError: If it is argon2 and the `argon2-cffi` package is missing.
+    """
+    from passlib.context import CryptContext
+    from passlib.exc import MissingBackendError
+    from passlib.hash import argon2
+
+    scheme = settings.PASSWORD_HASH_SCHEME.lower()
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown PASSWORD_HASH_SCHEME {settings.PASSWORD_HASH_SCHEME!r}")
+    if scheme == "argon2":
+        try:
+            argon2.get_backend()
+        except MissingBackendError as exc:
+            raise RuntimeError("PASSWORD_HASH_SCHEME=argon2 requires the 'argon2-cffi' package") from exc
+
+    rounds = settings.PASSWORD_BCRYPT_ROUNDS
+    return CryptContext(
+        schemes=[scheme] + [other for other in PASSWORD_SCHEMES if other != scheme],
+        default=scheme,
+        deprecated="auto",
+        bcrypt__default_rounds=rounds,
+        bcrypt__min_rounds=rounds,
+        bcrypt__max_rounds=rounds,
+        argon2__type="ID",
+        argon2__time_cost=settings.PASSWORD_ARGON2_TIME_COST,
+        argon2__memory_cost=settings.PASSWORD_ARGON2_MEMORY_COST_KIB,
+        argon2__parallelism=settings.PASSWORD_ARGON2_PARALLELISM,
+    )
 
-# Initialize the CryptContext with bcrypt as the hashing scheme.
-# "deprecated="auto"" allows Passlib to handle deprecated schemes automatically.
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-"""
-Global instance of CryptContext, configured for bcrypt hashing.
-This context is used for all password hashing and verification operations.
-"""
 
-SECRET_KEY = settings.SECRET_KEY
-ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
@@ -34,7 +87,25 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True if the plain password matches the hashed password, False otherwise.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifies a password and, if it matches a hash made with an outdated scheme
+    or cost, hashes it again with the current ones, at the cost of one more
+    hash on that login.
+
+    Args:
+        plain_password: The plain text password to verify.
+        hashed_password: The stored hashed password to verify against.
+
+    Returns:
+        `(valid, new_hash)`: whether the password matches, and the hash to store
+        instead of `hashed_password` (None if it is up to date or the password
+        does not match).
+    """
+    return get_pwd_context().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -47,7 +118,7 @@ def get_password_hash(password: str) -> str:
     Returns:
         The hashed version of the password.
     """
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -56,28 +127,52 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({"exp": expire, "iat": int(time.time())})
+    encoded_jwt = get_token_service().encode(to_encode)
     return encoded_jwt
 
 
-def create_refresh_token(data: dict, expires_delta: timedelta = None):
+def create_refresh_token(data: dict, expires_delta: timedelta = None, family: Optional[str] = None):
+    """
+    Creates a single-use refresh token.
+
+    Args:
+        data: Claims to include (`sub`, `username`).
+        expires_delta: Lifetime; defaults to `REFRESH_TOKEN_EXPIRE_DAYS`.
+        family: Family of the token being rotated; a new family is started if omitted (login).
+    """
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire, "type": "refresh"})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    to_encode.update({
+        "exp": expire,
+        "iat": int(time.time()),
+        "type": "refresh",
+        "jti": uuid.uuid4().hex,
+        "fam": family or uuid.uuid4().hex,
+    })
+    encoded_jwt = get_token_service().encode(to_encode)
     return encoded_jwt
 
 
+def revoke_user_tokens(user_id: int) -> None:
+    """
+    Revokes every access and refresh token of the user issued before now, e.g.
+    after a password change. Tokens issued within the current second stay valid.
+    """
+    now = time.time()
+    revocation.revoke_user(user_id, int(now), now + REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+
+def revoke_token_family(family: str) -> None:
+    """Revokes all refresh tokens rotated from the same login (logout, reuse)."""
+    revocation.revoke_family(family, time.time() + REFRESH_TOKEN_EXPIRE_DAYS * 86400)
+
+
 def verify_token(token: str, token_type: str = "access"):
-    from jose import JWTError
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        if payload.get("type", "access") != token_type:
-            raise JWTError(f"Invalid token type: expected {token_type}")
-        return payload
-    except JWTError as e:
-        raise e
+    payload = get_token_service().decode(token)
+    if payload.get("type", "access") != token_type:
+        raise JWTError(f"Invalid token type: expected {token_type}")
+    return payload
@@ -0,0 +1,48 @@
+"""
+Startup Timing.
+
+Records how long each phase of application startup takes (module import,
+mapper configuration, pool warmup, ...) so slow deploys can be attributed to
+a specific step. The summary is printed once startup completes and the
+timings are exposed at `/metrics/startup`.
+"""
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+class StartupTimings:
+    """
+    Collects the duration of named startup phases in milliseconds.
+
+    Args:
+        started_at: `time.perf_counter()` value startup is measured from;
+                    defaults to the moment the instance is created.
+    """
+
+    def __init__(self, started_at: Optional[float] = None):
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.phases: Dict[str, float] = {}
+        self.total_ms: Optional[float] = None
+
+    def record(self, name: str, started_at: float, finished_at: Optional[float] = None) -> None:
+        finished_at = time.perf_counter() if finished_at is None else finished_at
+        self.phases[name] = round((finished_at - started_at) * 1000, 2)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times the enclosed block as phase `name`."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, started_at)
+
+    def finish(self) -> str:
+        """Stops the clock and returns a one-line summary of the phases."""
+        self.total_ms = round((time.perf_counter() - self.started_at) * 1000, 2)
+        breakdown = ", ".join(f"{name}={ms:.1f}ms" for name, ms in self.phases.items())
+        return f"{self.total_ms:.1f}ms ({breakdown})"
+
+    def as_dict(self) -> dict:
+        return {"total_ms": self.total_ms, "phases_ms": dict(self.phases)}
@@ -0,0 +1,332 @@
+"""
+JWT Token Service.
+
+Signs and verifies the application's JWTs with key objects that are prepared
+once, instead of resolving the key and algorithm through python-jose on every
+call. The compact JWS format is produced directly with `cryptography` (already
+required by python-jose's backend), which also provides EdDSA, which
+python-jose lacks.
+
+Supported algorithms (`ALGORITHM`):
+
+- `HS256`, `HS384` and `HS512`: HMAC with `SECRET_KEY`, as before. Every
+  service validating tokens needs the secret.
+- `ES256` (ECDSA P-256), `RS256` (RSA) and `EdDSA` (Ed25519): signed with the
+  PEM private key in `JWT_PRIVATE_KEY_FILE`. Downstream services validate
+  tokens with the public keys published at `/.well-known/jwks.json` and never
+  see the private key.
+
+Asymmetric tokens carry a key ID (`kid`, the RFC 7638 thumbprint of the public
+key). To rotate keys, add the current public key to `JWT_PUBLIC_KEY_FILES` and
+switch `JWT_PRIVATE_KEY_FILE` to the new key: tokens signed with the old key
+are still accepted (and the old key stays in the JWKS) until it is removed
+from the list, after the last token it signed has expired.
+
+Errors are raised as python-jose's `JWTError` (`ExpiredSignatureError` for
+expired tokens), so callers handle them as before.
+"""
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, padding, rsa
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature, encode_dss_signature
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.core.config import settings
+
+HMAC_ALGORITHMS = {"HS256": hashlib.sha256, "HS384": hashlib.sha384, "HS512": hashlib.sha512}
+ASYMMETRIC_ALGORITHMS = ("ES256", "RS256", "EdDSA")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _int_b64(value: int) -> str:
+    return _b64encode(value.to_bytes((value.bit_length() + 7) // 8 or 1, "big"))
+
+
+class SigningKey:
+    """
+    A prepared key for one algorithm.
+
+    `private_key` may be None for keys that only verify (rotated-out public keys).
+    """
+
+    alg = ""
+
+    def __init__(self, kid: Optional[str] = None):
+        self.kid = kid
+        header = {"alg": self.alg, "typ": "JWT"}
+        if kid:
+            header["kid"] = kid
+        # The encoded header is the same for every token signed with this key
+        self.encoded_header = _b64encode(json.dumps(header, separators=(",", ":")).encode())
+
+    @property
+    def can_sign(self) -> bool:
+        raise NotImplementedError
+
+    def sign(self, message: bytes) -> bytes:
+        raise NotImplementedError
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        raise NotImplementedError
+
+    def public_jwk(self) -> Optional[Dict[str, str]]:
+        """The public key as a JWK, or None for symmetric keys."""
+        return None
+
+
+class HMACKey(SigningKey):
+    """HMAC key for one of `HMAC_ALGORITHMS`."""
+
+    def __init__(self, secret: str, kid: Optional[str] = None, alg: str = "HS256"):
+        self.alg = alg
+        super().__init__(kid)
+        self._mac = hmac.new(secret.encode(), digestmod=HMAC_ALGORITHMS[alg])
+
+    @property
+    def can_sign(self) -> bool:
+        return True
+
+    def sign(self, message: bytes) -> bytes:
+        mac = self._mac.copy()  # keyed state is reused; only the message is hashed per token
+        mac.update(message)
+        return mac.digest()
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        return hmac.compare_digest(self.sign(message), signature)
+
+
+class AsymmetricKey(SigningKey):
+    """Base of the public-key algorithms; the `kid` defaults to the JWK thumbprint."""
+
+    def __init__(self, private_key: Any = None, public_key: Any = None, kid: Optional[str] = None):
+        self.private_key = private_key
+        self.public_key = public_key if public_key is not None else private_key.public_key()
+        super().__init__(kid or self.thumbprint())
+
+    @property
+    def can_sign(self) -> bool:
+        return self.private_key is not None
+
+    def _jwk_members(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def thumbprint(self) -> str:
+        """RFC 7638 thumbprint: SHA-256 of the required JWK members in lexicographic order."""
+        canonical = json.dumps(self._jwk_members(), separators=(",", ":"), sort_keys=True)
+        return _b64encode(hashlib.sha256(canonical.encode()).digest())
+
+    def public_jwk(self) -> Optional[Dict[str, str]]:
+        return {**self._jwk_members(), "kid": self.kid, "alg": self.alg, "use": "sig"}
+
+
+class ES256Key(AsymmetricKey):
+    alg = "ES256"
+
+    def sign(self, message: bytes) -> bytes:
+        # JWS wants the raw r || s pair, not the DER encoding cryptography produces
+        r, s = decode_dss_signature(self.private_key.sign(message, ec.ECDSA(hashes.SHA256())))
+        return r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        if len(signature) != 64:
+            return False
+        der = encode_dss_signature(int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big"))
+        try:
+            self.public_key.verify(der, message, ec.ECDSA(hashes.SHA256()))
+        except InvalidSignature:
+            return False
+        return True
+
+    def _jwk_members(self) -> Dict[str, str]:
+        numbers = self.public_key.public_numbers()
+        return {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": _b64encode(numbers.x.to_bytes(32, "big")),
+            "y": _b64encode(numbers.y.to_bytes(32, "big")),
+        }
+
+
+class RS256Key(AsymmetricKey):
+    alg = "RS256"
+
+    def sign(self, message: bytes) -> bytes:
+        return self.private_key.sign(message, padding.PKCS1v15(), hashes.SHA256())
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        try:
+            self.public_key.verify(signature, message, padding.PKCS1v15(), hashes.SHA256())
+        except InvalidSignature:
+            return False
+        return True
+
+    def _jwk_members(self) -> Dict[str, str]:
+        numbers = self.public_key.public_numbers()
+        return {"kty": "RSA", "n": _int_b64(numbers.n), "e": _int_b64(numbers.e)}
+
+
+class EdDSAKey(AsymmetricKey):
+    alg = "EdDSA"
+
+    def sign(self, message: bytes) -> bytes:
+        return self.private_key.sign(message)
+
+    def verify(self, message: bytes, signature: bytes) -> bool:
+        try:
+            self.public_key.verify(signature, message)
+        except InvalidSignature:
+            return False
+        return True
+
+    def _jwk_members(self) -> Dict[str, str]:
+        raw = self.public_key.public_bytes(serialization.Encoding.Raw, serialization.PublicFormat.Raw)
+        return {"kty": "OKP", "crv": "Ed25519", "x": _b64encode(raw)}
+
+
+def load_pem_key(pem: bytes) -> AsymmetricKey:
+    """
+    Prepares a PEM private or public key; the algorithm follows from the key type.
+
+    Raises:
+        ValueError: For unsupported key types (e.g. EC curves other than P-256).
+    """
+    if b"PRIVATE KEY" in pem:
+        private_key = serialization.load_pem_private_key(pem, password=None)
+        public_key = private_key.public_key()
+    else:
+        private_key = None
+        public_key = serialization.load_pem_public_key(pem)
+    if isinstance(public_key, ec.EllipticCurvePublicKey) and isinstance(public_key.curve, ec.SECP256R1):
+        return ES256Key(private_key, public_key)
+    if isinstance(public_key, rsa.RSAPublicKey):
+        return RS256Key(private_key, public_key)
+    if isinstance(public_key, ed25519.Ed25519PublicKey):
+        return EdDSAKey(private_key, public_key)
+    raise ValueError(f"Unsupported JWT key type {type(public_key).__name__}; use P-256, RSA or Ed25519")
+
+
+class TokenService:
+    """
+    Encodes and decodes JWTs with a signing key and any number of additional
+    verification keys (rotated-out keys), looked up by `kid`.
+
+    Args:
+        signing_key: The key new tokens are signed with.
+        verification_keys: Further keys whose tokens are still accepted.
+    """
+
+    def __init__(self, signing_key: SigningKey, verification_keys: Optional[List[SigningKey]] = None):
+        if not signing_key.can_sign:
+            raise ValueError("The signing key needs a private key")
+        self.signing_key = signing_key
+        self.keys: Dict[Optional[str], SigningKey] = {key.kid: key for key in (verification_keys or [])}
+        self.keys[signing_key.kid] = signing_key
+
+    @property
+    def algorithm(self) -> str:
+        return self.signing_key.alg
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        """Signs `claims`; datetime values (`exp`, `iat`, `nbf`) become Unix timestamps."""
+        payload = {
+            name: calendar.timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+            for name, value in claims.items()
+        }
+        signing_input = (
+            self.signing_key.encoded_header + "." + _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+        )
+        return signing_input + "." + _b64encode(self.signing_key.sign(signing_input.encode("ascii")))
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """
+        Verifies the signature and expiry of `token` and returns its claims.
+
+        The key is chosen by the header's `kid` (tokens without one, e.g. HS256
+        tokens, use the signing key) and must belong to the header's algorithm,
+        so a token cannot pick a weaker algorithm for a key.
+
+        Raises:
+            ExpiredSignatureError: If the token has expired.
+            JWTError: If the token is malformed, signed with an unknown key or tampered with.
+        """
+        try:
+            encoded_header, encoded_payload, encoded_signature = token.split(".")
+            header = json.loads(_b64decode(encoded_header))
+            signature = _b64decode(encoded_signature)
+        except (ValueError, TypeError) as exc:
+            raise JWTError("Malformed token") from exc
+        if not isinstance(header, dict):
+            raise JWTError("Malformed token header")
+        key = self.keys.get(header.get("kid"))
+        if key is None or header.get("alg") != key.alg:
+            raise JWTError("Unknown signing key or algorithm")
+        if not key.verify(f"{encoded_header}.{encoded_payload}".encode("ascii"), signature):
+            raise JWTError("Signature verification failed")
+        try:
+            claims = json.loads(_b64decode(encoded_payload))
+        except ValueError as exc:
+            raise JWTError("Malformed token payload") from exc
+        if not isinstance(claims, dict):
+            raise JWTError("Malformed token payload")
+        now = time.time()
+        exp = claims.get("exp")
+        if exp is not None:
+            if not isinstance(exp, (int, float)):
+                raise JWTError("Invalid exp claim")
+            if exp <= now:
+                raise ExpiredSignatureError("Signature has expired")
+        nbf = claims.get("nbf")
+        if isinstance(nbf, (int, float)) and nbf > now:
+            raise JWTError("The token is not yet valid (nbf)")
+        return claims
+
+    def jwks(self) -> Dict[str, List[Dict[str, str]]]:
+        """The public keys of all asymmetric keys, as a JWK Set."""
+        return {"keys": [jwk for jwk in (key.public_jwk() for key in self.keys.values()) if jwk is not None]}
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+
+@lru_cache(maxsize=None)
+def get_token_service() -> TokenService:
+    """
+    Returns the process-wide token service configured from the settings.
+
+    Raises:
+        ValueError: If `ALGORITHM` is unsupported or its private key is missing
+            or of another type.
+    """
+    algorithm = settings.ALGORITHM
+    if algorithm in HMAC_ALGORITHMS:
+        return TokenService(HMACKey(settings.SECRET_KEY, alg=algorithm))
+    if algorithm not in ASYMMETRIC_ALGORITHMS:
+        raise ValueError(
+            f"Unsupported ALGORITHM {algorithm!r}; use one of {', '.join([*HMAC_ALGORITHMS, *ASYMMETRIC_ALGORITHMS])}"
+        )
+    if not settings.JWT_PRIVATE_KEY_FILE:
+        raise ValueError(f"ALGORITHM={algorithm} requires JWT_PRIVATE_KEY_FILE")
+    signing_key = load_pem_key(_read(settings.JWT_PRIVATE_KEY_FILE))
+    if signing_key.alg != algorithm or not signing_key.can_sign:
+        raise ValueError(f"JWT_PRIVATE_KEY_FILE must hold a {algorithm} private key")
+    previous = [load_pem_key(_read(path.strip())) for path in settings.JWT_PUBLIC_KEY_FILES.split(",") if path.strip()]
+    return TokenService(signing_key, previous)
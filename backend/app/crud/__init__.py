@@ -1,33 +1,48 @@
 from .crud_user import (
     get_user,
+    get_users_by_ids,
     get_user_by_email,
     get_user_by_username,
     get_users,
     create_user,
+    import_users,
     update_user,
+    patch_user,
+    rehash_password,
     delete_user,
 )
 from .crud_team_member import (
     get_team_member,
+    get_team_members_by_ids,
     get_team_members,
+    get_team_member_rows,
+    get_team_members_fingerprint,
     create_team_member,
+    import_team_members,
     update_team_member,
+    patch_team_member,
     delete_team_member,
 )
 
 from .crud_objective import (
     get_objective,
+    get_objectives_by_ids,
+    get_objective_version,
     get_objectives,
+    get_objective_rows,
     create_objective,
     update_objective,
+    patch_objective,
     delete_objective,
 )
 
 from .crud_progress_update import (
     get_progress_update,
     get_progress_updates_by_objective,
+    aggregate_progress,
     create_progress_update,
     update_progress_update,
+    patch_progress_update,
     delete_progress_update,
 )
 
@@ -1,16 +1,148 @@
 """
 CRUD (Create, Read, Update, Delete) Operations for Objective Model.
 """
+from datetime import date, datetime
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Sequence, Union, List, Tuple
+from app.core import events
+from app.core.config import settings
+from app.core.cache import attach_row, cache, restore_row, row_to_dict
+from app.crud.patch import patch_row
+from app.db.session import from_replica
+from app.crud.rows import fetch_rows, rows_from_dicts, rows_to_dicts, select_rows
+from app.models import objective as objective_models
 from app.models.objective import Objective
-from app.schemas.objective import ObjectiveCreate, ObjectiveUpdate
+from app.models.team_member import TeamMember
+from app.schemas.objective import ObjectiveCreate, ObjectivePatch, ObjectiveUpdate
+
+CACHE_NAMESPACE = "objective"
 
 def get_objective(db: Session, objective_id: int) -> Optional[Objective]:
-    return db.query(Objective).filter(Objective.id == objective_id).first()
+    data = cache.get_or_load(
+        CACHE_NAMESPACE,
+        objective_id,
+        lambda: row_to_dict(db.query(Objective).filter(Objective.id == objective_id, Objective.active).first()),
+        populate=not from_replica(db),
+    )
+    return attach_row(db, Objective, data)
+
+def get_objective_version(db: Session, objective_id: int) -> Optional[Tuple[int, datetime]]:
+    """
+    Returns `(version, last change timestamp)` for an active objective without loading the row.
+
+    Used to evaluate conditional GETs before the full object is fetched; answered
+    from the cache when the objective is cached.
+    """
+    data = cache.get(CACHE_NAMESPACE, objective_id)
+    if data is not None:
+        row = restore_row(Objective, data)
+        return row["version"], row["updated_at"] or row["created_at"]
+    row = db.execute(
+        select(Objective.version, func.coalesce(Objective.updated_at, Objective.created_at)).where(
+            Objective.id == objective_id, Objective.active
+        )
+    ).first()
+    return tuple(row) if row else None
+
+def get_objectives_by_ids(db: Session, ids: List[int]) -> List[Objective]:
+    """
+    Returns the active objectives with the given ids in the order of `ids`, skipping
+    unknown ids; cached rows are reused and the rest is read with one query.
+    """
+    rows = cache.get_many_or_load(
+        CACHE_NAMESPACE,
+        ids,
+        lambda missing: {
+            obj.id: row_to_dict(obj) for obj in db.query(Objective).filter(Objective.id.in_(missing), Objective.active)
+        },
+        populate=not from_replica(db),
+    )
+    return [attach_row(db, Objective, rows[objective_id]) for objective_id in ids if objective_id in rows]
+
+def get_objectives(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False) -> List[Objective]:
+    query = db.query(Objective)
+    if not include_inactive:
+        query = query.filter(Objective.active)
+    rows = cache.get_or_load(
+        CACHE_NAMESPACE,
+        f"page:{cache.generation(CACHE_NAMESPACE)}:{skip}:{limit}:{int(include_inactive)}",
+        lambda: [row_to_dict(obj) for obj in query.offset(skip).limit(limit).all()],
+        populate=not from_replica(db),
+    )
+    return [attach_row(db, Objective, row) for row in rows]
+
+def get_objective_rows(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False) -> List[Any]:
+    """
+    Read-only variant of `get_objectives` returning `ObjectiveRow` tuples (see
+    app/crud/rows.py) instead of ORM instances, for the list endpoint. Shares
+    its page cache entries with `get_objectives`.
+    """
+    statement = select_rows(Objective)
+    if not include_inactive:
+        statement = statement.where(Objective.active)
+    rows = cache.get_or_load(
+        CACHE_NAMESPACE,
+        f"page:{cache.generation(CACHE_NAMESPACE)}:{skip}:{limit}:{int(include_inactive)}",
+        lambda: rows_to_dicts(fetch_rows(db, Objective, statement.offset(skip).limit(limit))),
+        populate=not from_replica(db),
+    )
+    return rows_from_dicts(Objective, rows)
 
-def get_objectives(db: Session, skip: int = 0, limit: int = 100) -> List[Objective]:
-    return db.query(Objective).offset(skip).limit(limit).all()
+STATS_FACETS = {
+    "status": objective_models.ObjectiveStatus,
+    "level": objective_models.ObjectiveLevel,
+    "priority": objective_models.ObjectivePriority,
+    "strategic_perspective": objective_models.ObjectiveStrategicPerspective,
+    "confidentiality": objective_models.ObjectiveConfidentiality,
+}
+"""Objective columns counted per value by `get_objective_stats`, with their enums."""
+
+def get_objective_stats(
+    db: Session, owner_id: Optional[int] = None, start: Optional[date] = None, end: Optional[date] = None
+) -> Dict[str, Any]:
+    """
+    Counts the active objectives per value of each facet in `STATS_FACETS`, in one
+    query with a `count(*) FILTER (WHERE ...)` column per value.
+
+    `owner_id` limits the counts to objectives owned by that team member or anyone
+    reporting to them (directly or not, via `supervisor_id`); `start`/`end` to
+    objectives whose start_date..target_completion_date period overlaps the window.
+    Objectives without a value for a facet only count towards `total`.
+
+    Results are cached for `OBJECTIVE_STATS_CACHE_TTL_SECONDS` and dropped by
+    objective writes; reporting-line changes show up when the entry expires.
+    """
+    def load() -> Dict[str, Any]:
+        columns = [func.count().label("total")]
+        for facet, enum_class in STATS_FACETS.items():
+            column = getattr(Objective, facet)
+            columns += [func.count().filter(column == value).label(f"{facet}:{value.value}") for value in enum_class]
+        query = select(*columns).where(Objective.active)
+        if owner_id is not None:
+            subtree = select(TeamMember.id).where(TeamMember.id == owner_id).cte("subtree", recursive=True)
+            # UNION (not UNION ALL) ends the recursion should the reporting lines contain a cycle
+            subtree = subtree.union(
+                select(TeamMember.id).where(TeamMember.supervisor_id == subtree.c.id, TeamMember.active)
+            )
+            query = query.where(Objective.owner_id.in_(select(subtree.c.id)))
+        if start is not None:
+            query = query.where(Objective.target_completion_date >= start)
+        if end is not None:
+            query = query.where(Objective.start_date <= end)
+        row = db.execute(query).mappings().one()
+        stats: Dict[str, Any] = {"total": row["total"]}
+        for facet, enum_class in STATS_FACETS.items():
+            stats[facet] = {value.value: row[f"{facet}:{value.value}"] for value in enum_class}
+        return stats
+
+    return cache.get_or_load(
+        CACHE_NAMESPACE,
+        f"stats:{cache.generation(CACHE_NAMESPACE)}:{owner_id}:{start}:{end}",
+        load,
+        ttl=settings.OBJECTIVE_STATS_CACHE_TTL_SECONDS,
+        populate=not from_replica(db),
+    )
 
 def create_objective(db: Session, *, obj_in: ObjectiveCreate) -> Objective:
     db_obj = Objective(
@@ -35,6 +167,8 @@ def create_objective(db: Session, *, obj_in: ObjectiveCreate) -> Objective:
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    cache.invalidate(CACHE_NAMESPACE, db_obj.id)
+    events.publish("objective", "created", db_obj.id, objective_id=db_obj.id)
     return db_obj
 
 def update_objective(db: Session, *, db_obj: Objective, obj_in: Union[ObjectiveUpdate, Dict[str, Any]]) -> Objective:
@@ -49,11 +183,35 @@ def update_objective(db: Session, *, db_obj: Objective, obj_in: Union[ObjectiveU
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    cache.invalidate(CACHE_NAMESPACE, db_obj.id)
+    events.publish("objective", "updated", db_obj.id, objective_id=db_obj.id)
+    return db_obj
+
+def patch_objective(
+    db: Session, *, objective_id: int, obj_in: ObjectivePatch, versions: Optional[Sequence[int]] = None
+) -> Optional[Objective]:
+    """
+    Applies the fields set in `obj_in` with a single UPDATE ... RETURNING.
+
+    Returns None if the objective does not exist or, when `versions` is given,
+    its version is not one of them.
+    """
+    update_data = obj_in.model_dump(exclude_unset=True)
+    if "tags" in update_data and update_data["tags"] is not None:
+        update_data["tags"] = ','.join(update_data["tags"])
+    db_obj = patch_row(db, Objective, objective_id, update_data, versions)
+    if db_obj is not None and update_data:
+        cache.invalidate(CACHE_NAMESPACE, objective_id)
+        events.publish("objective", "updated", objective_id, objective_id=objective_id)
     return db_obj
 
 def delete_objective(db: Session, *, objective_id: int) -> Optional[Objective]:
-    obj = db.query(Objective).get(objective_id)
+    """
+    Soft-deletes an active objective (clears `active`); the archival job moves
+    it out of the table later. Returns None if there is no such objective.
+    """
+    obj = patch_row(db, Objective, objective_id, {"active": False})
     if obj:
-        db.delete(obj)
-        db.commit()
+        cache.invalidate(CACHE_NAMESPACE, objective_id)
+        events.publish("objective", "deleted", objective_id, objective_id=objective_id)
     return obj
@@ -1,16 +1,109 @@
 """
 CRUD operations for ProgressUpdate model.
 """
+from datetime import date
+from sqlalchemy import Date, Integer, String, cast, func, literal, literal_column, select
 from sqlalchemy.orm import Session
-from typing import Any, Dict, Optional, Union, List
+from typing import Any, Dict, Optional, Sequence, Union, List
+from app.core import events
+from app.crud.patch import patch_row
 from app.models.progress_update import ProgressUpdate
-from app.schemas.progress_update import ProgressUpdateCreate, ProgressUpdateUpdate
+from app.schemas.progress_update import ProgressInterval, ProgressUpdateCreate, ProgressUpdateUpdate
 
 def get_progress_update(db: Session, progress_update_id: int) -> Optional[ProgressUpdate]:
-    return db.query(ProgressUpdate).filter(ProgressUpdate.id == progress_update_id).first()
+    return db.query(ProgressUpdate).filter(ProgressUpdate.id == progress_update_id, ProgressUpdate.active).first()
 
-def get_progress_updates_by_objective(db: Session, objective_id: int, skip: int = 0, limit: int = 100) -> List[ProgressUpdate]:
-    return db.query(ProgressUpdate).filter(ProgressUpdate.objective_id == objective_id).offset(skip).limit(limit).all()
+def get_progress_updates_by_objective(
+    db: Session,
+    objective_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[ProgressUpdate]:
+    """
+    Active progress updates of an objective; `start`/`end` bound progress_date
+    inclusively, which on PostgreSQL limits the scan to those years' partitions.
+    """
+    query = db.query(ProgressUpdate).filter(ProgressUpdate.objective_id == objective_id, ProgressUpdate.active)
+    if start is not None:
+        query = query.filter(ProgressUpdate.progress_date >= start)
+    if end is not None:
+        query = query.filter(ProgressUpdate.progress_date <= end)
+    return query.offset(skip).limit(limit).all()
+
+def _bucket_start(dialect: str, interval: ProgressInterval):
+    """SQL expression truncating `progress_date` to the start of its bucket."""
+    column = ProgressUpdate.progress_date
+    if dialect == "postgresql":
+        # Inlined (it's an enum value) so the expression renders identically in every clause
+        return cast(func.date_trunc(literal_column(f"'{interval.value}'"), column), Date)
+    # SQLite has no date_trunc; compute the start of the bucket with date() modifiers.
+    if interval == ProgressInterval.DAY:
+        return func.date(column)
+    if interval == ProgressInterval.WEEK:
+        # %w is 0 for Sunday; weeks start on Monday like date_trunc('week')
+        days_back = (cast(func.strftime("%w", column), Integer) + 6) % 7
+        return func.date(column, literal("-") + cast(days_back, String) + literal(" days"))
+    if interval == ProgressInterval.MONTH:
+        return func.date(column, "start of month")
+    months_back = (cast(func.strftime("%m", column), Integer) - 1) % 3
+    return func.date(column, "start of month", literal("-") + cast(months_back, String) + literal(" months"))
+
+def aggregate_progress(
+    db: Session,
+    objective_ids: List[int],
+    interval: ProgressInterval,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Buckets the progress updates of `objective_ids` by `interval` in one query.
+
+    Each bucket holds the number of updates with a progress value and the last
+    (by progress_date, then id), average, minimum and maximum progress. Updates
+    without a progress value are ignored; `start`/`end` bound progress_date
+    inclusively.
+
+    Returns:
+        `{objective_id: [bucket, ...]}` in bucket order; objectives without
+        updates in the range are missing.
+    """
+    bucket = _bucket_start(db.get_bind().dialect.name, interval)
+    ranked = select(
+        ProgressUpdate.objective_id,
+        bucket.label("bucket"),
+        ProgressUpdate.progress,
+        func.first_value(ProgressUpdate.progress).over(
+            partition_by=(ProgressUpdate.objective_id, bucket),
+            order_by=(ProgressUpdate.progress_date.desc(), ProgressUpdate.id.desc()),
+        ).label("last"),
+    ).where(
+        ProgressUpdate.objective_id.in_(objective_ids), ProgressUpdate.active, ProgressUpdate.progress.is_not(None)
+    )
+    if start is not None:
+        ranked = ranked.where(ProgressUpdate.progress_date >= start)
+    if end is not None:
+        ranked = ranked.where(ProgressUpdate.progress_date <= end)
+    ranked = ranked.subquery()
+    rows = db.execute(
+        select(
+            ranked.c.objective_id,
+            ranked.c.bucket,
+            func.count().label("updates"),
+            func.max(ranked.c.last).label("last"),  # constant within the bucket
+            func.avg(ranked.c.progress).label("avg"),
+            func.min(ranked.c.progress).label("min"),
+            func.max(ranked.c.progress).label("max"),
+        )
+        .group_by(ranked.c.objective_id, ranked.c.bucket)
+        .order_by(ranked.c.objective_id, ranked.c.bucket)
+    )
+    series: Dict[int, List[Dict[str, Any]]] = {}
+    for row in rows:
+        data = row._asdict()
+        series.setdefault(data.pop("objective_id"), []).append(data)
+    return series
 
 def create_progress_update(db: Session, *, obj_in: ProgressUpdateCreate) -> ProgressUpdate:
     db_obj = ProgressUpdate(
@@ -23,6 +116,7 @@ def create_progress_update(db: Session, *, obj_in: ProgressUpdateCreate) -> Prog
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    events.publish("progress_update", "created", db_obj.id, objective_id=db_obj.objective_id)
     return db_obj
 
 def update_progress_update(db: Session, *, db_obj: ProgressUpdate, obj_in: Union[ProgressUpdateUpdate, Dict[str, Any]]) -> ProgressUpdate:
@@ -35,11 +129,27 @@ def update_progress_update(db: Session, *, db_obj: ProgressUpdate, obj_in: Union
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
+    events.publish("progress_update", "updated", db_obj.id, objective_id=db_obj.objective_id)
+    return db_obj
+
+def patch_progress_update(
+    db: Session, *, progress_update_id: int, obj_in: ProgressUpdateUpdate, versions: Optional[Sequence[int]] = None
+) -> Optional[ProgressUpdate]:
+    """
+    Applies the fields set in `obj_in` with a single UPDATE ... RETURNING.
+
+    Returns None if the progress update does not exist or, when `versions` is
+    given, its version is not one of them.
+    """
+    update_data = obj_in.model_dump(exclude_unset=True)
+    db_obj = patch_row(db, ProgressUpdate, progress_update_id, update_data, versions)
+    if db_obj is not None and update_data:
+        events.publish("progress_update", "updated", db_obj.id, objective_id=db_obj.objective_id)
     return db_obj
 
 def delete_progress_update(db: Session, *, progress_update_id: int) -> Optional[ProgressUpdate]:
-    obj = db.query(ProgressUpdate).get(progress_update_id)
+    """Soft-deletes an active progress update (clears `active`); None if there is none."""
+    obj = patch_row(db, ProgressUpdate, progress_update_id, {"active": False})
     if obj:
-        db.delete(obj)
-        db.commit()
+        events.publish("progress_update", "deleted", progress_update_id, objective_id=obj.objective_id)
     return obj
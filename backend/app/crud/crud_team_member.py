@@ -1,15 +1,100 @@
+from datetime import datetime
+from sqlalchemy import func, insert, select
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from app.core import events
+from app.core.cache import attach_row, cache, row_to_dict
+from app.crud.patch import patch_row
+from app.db.session import from_replica
+from app.crud.rows import fetch_rows, rows_from_dicts, rows_to_dicts, select_rows
 from app.models.team_member import TeamMember
-from app.schemas.team_member import TeamMemberCreate, TeamMemberUpdate
+from app.schemas.team_member import TeamMemberCreate, TeamMemberImport, TeamMemberPatch, TeamMemberUpdate
+
+
+CACHE_NAMESPACE = "team_member"
 
 
 def get_team_member(db: Session, member_id: int) -> Optional[TeamMember]:
-    return db.query(TeamMember).get(member_id)
+    data = cache.get_or_load(
+        CACHE_NAMESPACE,
+        member_id,
+        lambda: row_to_dict(db.query(TeamMember).filter(TeamMember.id == member_id, TeamMember.active).first()),
+        populate=not from_replica(db),
+    )
+    return attach_row(db, TeamMember, data)
+
+
+def get_team_members_by_ids(db: Session, ids: List[int]) -> List[TeamMember]:
+    """
+    Returns the active team members with the given ids in the order of `ids`, skipping
+    unknown ids; cached rows are reused and the rest is read with one query.
+    """
+    rows = cache.get_many_or_load(
+        CACHE_NAMESPACE,
+        ids,
+        lambda missing: {
+            member.id: row_to_dict(member)
+            for member in db.query(TeamMember).filter(TeamMember.id.in_(missing), TeamMember.active)
+        },
+        populate=not from_replica(db),
+    )
+    return [attach_row(db, TeamMember, rows[member_id]) for member_id in ids if member_id in rows]
+
+
+def get_team_members(
+    db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False
+) -> List[TeamMember]:
+    query = db.query(TeamMember)
+    if not include_inactive:
+        query = query.filter(TeamMember.active)
+    rows = cache.get_or_load(
+        CACHE_NAMESPACE,
+        f"page:{cache.generation(CACHE_NAMESPACE)}:{skip}:{limit}:{int(include_inactive)}",
+        lambda: [row_to_dict(member) for member in query.offset(skip).limit(limit).all()],
+        populate=not from_replica(db),
+    )
+    return [attach_row(db, TeamMember, row) for row in rows]
+
 
+def get_team_member_rows(
+    db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False
+) -> List[Any]:
+    """
+    Read-only variant of `get_team_members` returning `TeamMemberRow` tuples
+    (see app/crud/rows.py) instead of ORM instances, for the list endpoint.
+    Shares its page cache entries with `get_team_members`.
+    """
+    statement = select_rows(TeamMember)
+    if not include_inactive:
+        statement = statement.where(TeamMember.active)
+    rows = cache.get_or_load(
+        CACHE_NAMESPACE,
+        f"page:{cache.generation(CACHE_NAMESPACE)}:{skip}:{limit}:{int(include_inactive)}",
+        lambda: rows_to_dicts(fetch_rows(db, TeamMember, statement.offset(skip).limit(limit))),
+        populate=not from_replica(db),
+    )
+    return rows_from_dicts(TeamMember, rows)
 
-def get_team_members(db: Session, skip: int = 0, limit: int = 100) -> List[TeamMember]:
-    return db.query(TeamMember).offset(skip).limit(limit).all()
+
+def get_team_members_fingerprint(db: Session) -> Tuple[int, Optional[int], Optional[datetime], Optional[int]]:
+    """
+    Returns `(row count, max id, latest change, sum of versions)` for the
+    team_members table.
+
+    Any insert, update or (soft) delete changes at least one of these values, so
+    they make a cheap validator for list responses. The timestamps alone are
+    not enough: two updates within the same clock tick (a second on SQLite)
+    leave the latest change unchanged, but every update increments a version.
+    """
+    row = db.execute(
+        select(
+            func.count(TeamMember.id),
+            func.max(TeamMember.id),
+            func.max(func.coalesce(TeamMember.updated_at, TeamMember.created_at)),
+            func.sum(TeamMember.version),
+        )
+    ).one()
+    return tuple(row)
 
 
 def create_team_member(db: Session, *, member_in: TeamMemberCreate) -> TeamMember:
@@ -17,9 +102,142 @@ def create_team_member(db: Session, *, member_in: TeamMemberCreate) -> TeamMembe
     db.add(db_member)
     db.commit()
     db.refresh(db_member)
+    cache.invalidate(CACHE_NAMESPACE, db_member.id)
+    events.publish("team_member", "created", db_member.id)
     return db_member
 
 
+def _supervisor_levels(
+    members_in: Dict[int, TeamMemberImport], rows_by_email: Dict[str, int]
+) -> Tuple[List[List[int]], Dict[int, str]]:
+    """
+    Orders the rows whose supervisor is another row of the import
+    topologically (Kahn's algorithm): level 0 holds the rows whose supervisor
+    already exists (or who have none), level n the rows supervised by a row of
+    level n - 1. Rows that are never reached are part of, or report into, a
+    supervisor cycle.
+
+    Returns:
+        The row numbers per level, and the errors of the rows in or below a cycle.
+    """
+    reports: Dict[int, List[int]] = {}
+    supervisor_row: Dict[int, int] = {}
+    for number, member_in in members_in.items():
+        parent = rows_by_email.get(member_in.supervisor_email) if member_in.supervisor_email else None
+        if parent is not None:
+            supervisor_row[number] = parent
+            reports.setdefault(parent, []).append(number)
+    levels = [[number for number in members_in if number not in supervisor_row]]
+    while True:
+        level = [child for parent in levels[-1] for child in reports.get(parent, ())]
+        if not level:
+            break
+        levels.append(level)
+
+    placed = {number for level in levels for number in level}
+    errors: Dict[int, str] = {}
+    for number in members_in:
+        if number in placed:
+            continue
+        path = [number]
+        while supervisor_row[path[-1]] not in path:
+            path.append(supervisor_row[path[-1]])
+        cycle = path[path.index(supervisor_row[path[-1]]):]
+        if number in cycle:
+            chain = cycle[cycle.index(number):] + cycle[:cycle.index(number)] + [number]
+            errors[number] = "Supervisor cycle: " + " -> ".join(members_in[row].email for row in chain)
+        else:
+            errors[number] = f"Supervisor {members_in[number].supervisor_email} is part of a supervisor cycle"
+    return levels, errors
+
+
+def import_team_members(
+    db: Session, members_in: Dict[int, TeamMemberImport]
+) -> Dict[int, Tuple[Optional[int], Optional[str]]]:
+    """
+    Creates a whole organisation in one transaction.
+
+    Supervisors are referenced by id or by email, of an existing team member or
+    of another row. The emails of the batch are checked and the referenced
+    supervisors resolved with one query, the rows supervised by other rows are
+    ordered topologically, and each level of the hierarchy is inserted with one
+    multi-row INSERT ... RETURNING, whose ids fill in the `supervisor_id` of
+    the next level.
+
+    Rows are skipped and reported if their email is taken (by an existing team
+    member or an earlier row), their supervisor does not exist, was skipped
+    itself, or the supervisor references form a cycle.
+
+    Args:
+        db: The SQLAlchemy database session.
+        members_in: The team members to create, keyed by row number.
+
+    Returns:
+        `{row number: (id, None)}` for created team members, `(None, error)` for skipped rows.
+    """
+    emails = {member_in.email for member_in in members_in.values()}
+    emails |= {member_in.supervisor_email for member_in in members_in.values() if member_in.supervisor_email}
+    supervisor_ids = {member_in.supervisor_id for member_in in members_in.values() if member_in.supervisor_id}
+    existing: Dict[str, Tuple[int, bool]] = {}
+    existing_ids = set()
+    for member_id, email, active in db.execute(
+        select(TeamMember.id, TeamMember.email, TeamMember.active).where(
+            TeamMember.email.in_(emails) | TeamMember.id.in_(supervisor_ids)
+        )
+    ):
+        existing[email] = (member_id, active)
+        if active:
+            existing_ids.add(member_id)
+
+    results: Dict[int, Tuple[Optional[int], Optional[str]]] = {}
+    rows_by_email: Dict[str, int] = {}
+    candidates: Dict[int, TeamMemberImport] = {}
+    for number, member_in in members_in.items():
+        if member_in.email in existing or member_in.email in rows_by_email:
+            results[number] = (None, "A team member with this email already exists.")
+        else:
+            rows_by_email[member_in.email] = number
+            candidates[number] = member_in
+
+    levels, errors = _supervisor_levels(candidates, rows_by_email)
+    results.update((number, (None, error)) for number, error in errors.items())
+    created: Dict[int, int] = {}
+    for level in levels:
+        rows, numbers = [], []
+        for number in level:
+            member_in = candidates[number]
+            email = member_in.supervisor_email
+            supervisor_id = member_in.supervisor_id
+            error = None
+            if supervisor_id is not None and email is not None:
+                error = "Give either supervisor_id or supervisor_email, not both."
+            elif supervisor_id is not None and supervisor_id not in existing_ids:
+                error = f"Supervisor {supervisor_id} does not exist."
+            elif email in rows_by_email:
+                supervisor_id = created.get(rows_by_email[email])
+                if supervisor_id is None:
+                    error = f"Supervisor {email} was not imported."
+            elif email is not None:
+                supervisor_id, active = existing.get(email, (None, False))
+                if not active:
+                    error = f"Supervisor {email} does not exist."
+            if error:
+                results[number] = (None, error)
+                continue
+            rows.append({**member_in.model_dump(exclude={"supervisor_email"}), "supervisor_id": supervisor_id})
+            numbers.append(number)
+        if rows:
+            ids = db.scalars(insert(TeamMember).returning(TeamMember.id, sort_by_parameter_order=True), rows).all()
+            created.update(zip(numbers, ids))
+    db.commit()
+    if created:
+        cache.invalidate(CACHE_NAMESPACE)
+    for number, member_id in created.items():
+        results[number] = (member_id, None)
+        events.publish("team_member", "created", member_id)
+    return results
+
+
 def update_team_member(db: Session, *, db_member: TeamMember, member_in: TeamMemberUpdate) -> TeamMember:
     update_data = member_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
@@ -27,12 +245,32 @@ def update_team_member(db: Session, *, db_member: TeamMember, member_in: TeamMem
     db.add(db_member)
     db.commit()
     db.refresh(db_member)
+    cache.invalidate(CACHE_NAMESPACE, db_member.id)
+    events.publish("team_member", "updated", db_member.id)
+    return db_member
+
+
+def patch_team_member(
+    db: Session, *, member_id: int, member_in: TeamMemberPatch, versions: Optional[Sequence[int]] = None
+) -> Optional[TeamMember]:
+    """
+    Applies the fields set in `member_in` with a single UPDATE ... RETURNING.
+
+    Returns None if the team member does not exist or, when `versions` is
+    given, its version is not one of them.
+    """
+    update_data = member_in.model_dump(exclude_unset=True)
+    db_member = patch_row(db, TeamMember, member_id, update_data, versions)
+    if db_member is not None and update_data:
+        cache.invalidate(CACHE_NAMESPACE, member_id)
+        events.publish("team_member", "updated", member_id)
     return db_member
 
 
 def delete_team_member(db: Session, *, member_id: int) -> Optional[TeamMember]:
-    member = db.query(TeamMember).get(member_id)
+    """Soft-deletes an active team member (clears `active`); None if there is none."""
+    member = patch_row(db, TeamMember, member_id, {"active": False})
     if member:
-        db.delete(member)
-        db.commit()
+        cache.invalidate(CACHE_NAMESPACE, member_id)
+        events.publish("team_member", "deleted", member_id)
     return member
@@ -5,32 +5,77 @@ This module provides a set of functions to interact with the `User` data
 in the database. These functions encapsulate the SQLAlchemy query logic
 for common user-related database operations.
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert, or_, select, update
 from sqlalchemy.orm import Session
-from typing import Any, Dict, Optional, Union, List
-
-from app.core.security import get_password_hash  # For hashing passwords
+from typing import Any, Dict, Optional, Sequence, Tuple, Union, List
+
+from app.core.cache import attach_row, cache, row_to_dict  # Read-through cache for id lookups and pages
+from app.core.config import settings
+from app.core.security import get_password_hash, revoke_user_tokens  # Password hashing, session revocation
+from app.crud.patch import patch_row  # Single-statement partial updates
+from app.db.session import from_replica  # Replica reads are not cached
+from app.models.team_member import TeamMember
 from app.models.user import User  # The SQLAlchemy ORM User model
 from app.schemas.user import UserCreate, UserUpdate  # Pydantic schemas for user creation and updates
 
+CACHE_NAMESPACE = "user"
+
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
     """
-    Retrieves a user from the database by their ID.
+    Retrieves an active user from the database by their ID.
+
+    The lookup goes through the application cache; on a hit no SQL is emitted.
 
     Args:
         db: The SQLAlchemy database session.
         user_id: The ID of the user to retrieve.
 
     Returns:
-        The User object if found, otherwise None.
+        The User object if found and active, otherwise None.
+    """
+    data = cache.get_or_load(
+        CACHE_NAMESPACE,
+        user_id,
+        lambda: row_to_dict(db.query(User).filter(User.id == user_id, User.active).first()),
+        populate=not from_replica(db),
+    )
+    return attach_row(db, User, data)
+
+
+def get_users_by_ids(db: Session, ids: List[int]) -> List[User]:
     """
-    return db.query(User).filter(User.id == user_id).first()
+    Retrieves several active users by their IDs.
+
+    Cached users are taken from the application cache; the others are read with
+    a single `WHERE id IN (...)` query.
+
+    Args:
+        db: The SQLAlchemy database session.
+        ids: The IDs of the users to retrieve, without duplicates.
+
+    Returns:
+        The User objects found, in the order of `ids`.
+    """
+    rows = cache.get_many_or_load(
+        CACHE_NAMESPACE,
+        ids,
+        lambda missing: {
+            user.id: row_to_dict(user) for user in db.query(User).filter(User.id.in_(missing), User.active)
+        },
+        populate=not from_replica(db),
+    )
+    return [attach_row(db, User, rows[user_id]) for user_id in ids if user_id in rows]
 
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
     """
     Retrieves a user from the database by their email address.
 
+    Inactive users are included, since the address stays taken.
+
     Args:
         db: The SQLAlchemy database session.
         email: The email address of the user to retrieve.
@@ -45,6 +90,9 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """
     Retrieves a user from the database by their username.
 
+    Inactive users are included, since the username stays taken; callers that
+    authenticate must check `active`.
+
     Args:
         db: The SQLAlchemy database session.
         username: The username of the user to retrieve.
@@ -55,7 +103,7 @@ def get_user_by_username(db: Session, username: str) -> Optional[User]:
     return db.query(User).filter(User.username == username).first()
 
 
-def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
+def get_users(db: Session, skip: int = 0, limit: int = 100, include_inactive: bool = False) -> List[User]:
     """
     Retrieves a list of users from the database with pagination.
 
@@ -63,11 +111,21 @@ def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         db: The SQLAlchemy database session.
         skip: The number of users to skip (for pagination).
         limit: The maximum number of users to return (for pagination).
+        include_inactive: Whether to include inactive (soft-deleted) users.
 
     Returns:
         A list of User objects.
     """
-    return db.query(User).offset(skip).limit(limit).all()
+    query = db.query(User)
+    if not include_inactive:
+        query = query.filter(User.active)
+    rows = cache.get_or_load(
+        CACHE_NAMESPACE,
+        f"page:{cache.generation(CACHE_NAMESPACE)}:{skip}:{limit}:{int(include_inactive)}",
+        lambda: [row_to_dict(user) for user in query.offset(skip).limit(limit).all()],
+        populate=not from_replica(db),
+    )
+    return [attach_row(db, User, row) for row in rows]
 
 
 def create_user(db: Session, *, user_in: UserCreate) -> User:
@@ -98,17 +156,92 @@ def create_user(db: Session, *, user_in: UserCreate) -> User:
     db.add(db_user)
     db.commit()
     db.refresh(db_user)  # Refresh to get DB-generated fields like id, created_at
+    cache.invalidate(CACHE_NAMESPACE, db_user.id)
     return db_user
 
 
+def import_users(db: Session, users_in: Dict[int, UserCreate]) -> Dict[int, Tuple[Optional[int], Optional[str]]]:
+    """
+    Creates many users in one transaction.
+
+    Instead of the two uniqueness SELECTs, one hash and one commit per user of
+    `create_user`, the emails and usernames of the whole batch are checked
+    with one query, the referenced team members with another, the passwords
+    are hashed on `BULK_IMPORT_HASH_WORKERS` threads (bcrypt and argon2
+    release the GIL, so they run on all cores) and the rows are inserted with
+    one multi-row INSERT ... RETURNING.
+
+    Rows reusing an email or username (of an existing user or of an earlier
+    row) or referencing a missing team member are skipped and reported.
+
+    Args:
+        db: The SQLAlchemy database session.
+        users_in: The users to create, keyed by row number.
+
+    Raises:
+        sqlalchemy.exc.IntegrityError: If a concurrent write took an email or
+            username in the meantime; nothing is imported then.
+
+    Returns:
+        `{row number: (id, None)}` for created users, `(None, error)` for skipped rows.
+    """
+    emails = {user_in.email for user_in in users_in.values()}
+    usernames = {user_in.username for user_in in users_in.values()}
+    taken_emails, taken_usernames = set(), set()
+    for email, username in db.execute(
+        select(User.email, User.username).where(or_(User.email.in_(emails), User.username.in_(usernames)))
+    ):
+        taken_emails.add(email)
+        taken_usernames.add(username)
+    team_member_ids = {user_in.team_member_id for user_in in users_in.values()} - {None}
+    known_team_members = set(
+        db.scalars(select(TeamMember.id).where(TeamMember.id.in_(team_member_ids), TeamMember.active))
+    ) if team_member_ids else set()
+
+    results: Dict[int, Tuple[Optional[int], Optional[str]]] = {}
+    accepted: List[int] = []
+    for number, user_in in users_in.items():
+        if user_in.email in taken_emails:
+            results[number] = (None, "The user with this email already exists in the system.")
+        elif user_in.username in taken_usernames:
+            results[number] = (None, "The user with this username already exists in the system.")
+        elif user_in.team_member_id is not None and user_in.team_member_id not in known_team_members:
+            results[number] = (None, f"Team member {user_in.team_member_id} does not exist.")
+        else:
+            taken_emails.add(user_in.email)
+            taken_usernames.add(user_in.username)
+            accepted.append(number)
+    if not accepted:
+        return results
+
+    workers = settings.BULK_IMPORT_HASH_WORKERS or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=min(workers, len(accepted)), thread_name_prefix="import-hash") as pool:
+        hashes = list(pool.map(get_password_hash, [users_in[number].password for number in accepted]))
+
+    rows = [
+        {
+            **users_in[number].model_dump(exclude={"password"}),
+            "active": users_in[number].active if users_in[number].active is not None else True,
+            "hashed_password": hashed_password,
+        }
+        for number, hashed_password in zip(accepted, hashes)
+    ]
+    ids = db.scalars(insert(User).returning(User.id, sort_by_parameter_order=True), rows).all()
+    db.commit()
+    cache.invalidate(CACHE_NAMESPACE)
+    results.update((number, (user_id, None)) for number, user_id in zip(accepted, ids))
+    return results
+
+
 def update_user(
     db: Session, *, db_user: User, user_in: Union[UserUpdate, Dict[str, Any]]
 ) -> User:
     """
     Updates an existing user in the database.
 
-    If a new password is provided in `user_in`, it will be hashed.
-    Only fields present in `user_in` will be updated.
+    If a new password is provided in `user_in`, it will be hashed, and the
+    user's existing tokens are revoked. Only fields present in `user_in` will
+    be updated.
 
     Args:
         db: The SQLAlchemy database session.
@@ -126,7 +259,8 @@ def update_user(
         update_data = user_in.model_dump(exclude_unset=True)  # Pydantic V2
         # update_data = user_in.dict(exclude_unset=True) # Pydantic V1
 
-    if "password" in update_data and update_data["password"]:
+    password_changed = bool(update_data.get("password"))
+    if password_changed:
         # If a new password is provided, hash it
         hashed_password = get_password_hash(update_data["password"])
         del update_data["password"]  # Remove plain password from update_data
@@ -139,22 +273,86 @@ def update_user(
     db.add(db_user)  # Add the updated object to the session (marks it as dirty)
     db.commit()  # Commit the changes to the database
     db.refresh(db_user)  # Refresh to get any DB-updated fields (e.g., updated_at)
+    cache.invalidate(CACHE_NAMESPACE, db_user.id)  # Drop the cached row and any cached pages
+    if password_changed:
+        revoke_user_tokens(db_user.id)  # Sign out the user's other sessions
+    return db_user
+
+
+def patch_user(
+    db: Session, *, user_id: int, user_in: UserUpdate, versions: Optional[Sequence[int]] = None
+) -> Optional[User]:
+    """
+    Applies a partial update to a user with a single UPDATE ... RETURNING.
+
+    Unlike `update_user`, the user is not read first. A new password is hashed
+    and revokes the user's tokens as in `update_user`; uniqueness of email and username is left to the
+    database constraints.
+
+    Args:
+        db: The SQLAlchemy database session.
+        user_id: The ID of the user to update.
+        user_in: The fields to update; unset fields are left unchanged.
+        versions: If given, the update only applies while the user's version is one of these.
+
+    Raises:
+        sqlalchemy.exc.IntegrityError: If the email or username is already taken.
+
+    Returns:
+        The updated User object, or None if the user does not exist or its
+        version did not match.
+    """
+    update_data = user_in.model_dump(exclude_unset=True)
+    if "password" in update_data:
+        password = update_data.pop("password")
+        if password:
+            update_data["hashed_password"] = get_password_hash(password)
+    db_user = patch_row(db, User, user_id, update_data, versions)
+    if db_user is not None and update_data:
+        cache.invalidate(CACHE_NAMESPACE, user_id)
+        if "hashed_password" in update_data:
+            revoke_user_tokens(user_id)
     return db_user
 
 
+def rehash_password(db: Session, *, user_id: int, old_hash: str, new_hash: str) -> bool:
+    """
+    Replaces a user's password hash with one of the same password under the
+    current hashing policy (see `verify_and_update_password`).
+
+    The user's `version` is left alone and no tokens are revoked, since the
+    password itself did not change. The hash is only replaced while it is still
+    `old_hash`, so a concurrent password change wins.
+
+    Returns:
+        True if the hash was replaced.
+    """
+    updated = db.execute(
+        update(User).where(User.id == user_id, User.hashed_password == old_hash).values(hashed_password=new_hash)
+    ).rowcount
+    db.commit()
+    if updated:
+        cache.invalidate(CACHE_NAMESPACE, user_id)
+    return bool(updated)
+
+
 def delete_user(db: Session, *, user_id: int) -> Optional[User]:
     """
-    Deletes a user from the database by their ID.
+    Soft-deletes a user by their ID.
+
+    The row is kept with `active` cleared, so the user can no longer log in or
+    be read, while the username and email stay reserved. Their refresh tokens
+    are revoked.
 
     Args:
         db: The SQLAlchemy database session.
         user_id: The ID of the user to delete.
 
     Returns:
-        The User object that was deleted, or None if no user was found with that ID.
+        The User object that was deleted, or None if no active user was found with that ID.
     """
-    user = db.query(User).get(user_id)  # .get() is a shortcut for filtering by primary key
+    user = patch_row(db, User, user_id, {"active": False})
     if user:
-        db.delete(user)
-        db.commit()
+        cache.invalidate(CACHE_NAMESPACE, user_id)
+        revoke_user_tokens(user_id)
     return user
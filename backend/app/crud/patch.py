@@ -0,0 +1,56 @@
+"""
+Single-Statement Partial Updates.
+
+`patch_row` applies a partial update with one `UPDATE ... WHERE id = :id
+RETURNING *` instead of the SELECT / UPDATE / SELECT of the ORM update path,
+optionally guarded by the row version (`If-Match`). Soft deletes are patches
+of the `active` flag. A patch without values writes nothing.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.cache import attach_row
+
+
+def patch_row(
+    db: Session,
+    model: type,
+    row_id: int,
+    values: Dict[str, Any],
+    versions: Optional[Sequence[int]] = None,
+) -> Optional[Any]:
+    """
+    Updates the columns in `values` of one row and commits.
+
+    Only active rows are updated. The row's `version` is incremented and
+    `updated_at` set by the same statement. If `versions` is given, the row is
+    only updated while its version is one of them. Empty `values` change
+    nothing: the row is only read (with the same conditions), so its version
+    stays the same.
+
+    Returns:
+        The updated row as a persistent instance of `db` (built from the
+        returned columns, without another SELECT), or None if no active row
+        has the id or, with `versions`, the row has a different version.
+    """
+    table = model.__table__
+    if not values:
+        query = select(table).where(table.c.id == row_id, table.c.active)
+        if versions is not None:
+            query = query.where(table.c.version.in_(versions))
+        row = db.execute(query).mappings().first()
+        return attach_row(db, model, {column.key: row[column] for column in table.c}) if row else None
+    stmt = update(table).where(table.c.id == row_id, table.c.active).values(**values, version=table.c.version + 1)
+    if versions is not None:
+        stmt = stmt.where(table.c.version.in_(versions))
+    if db.get_bind().dialect.update_returning:
+        row = db.execute(stmt.returning(*table.c)).mappings().first()
+    else:  # no UPDATE ... RETURNING (e.g. MySQL): read the row back
+        updated = db.execute(stmt).rowcount
+        row = updated and db.execute(select(table).where(table.c.id == row_id)).mappings().first()
+    db.commit()
+    if not row:
+        return None
+    return attach_row(db, model, {column.key: row[column] for column in table.c})
@@ -0,0 +1,60 @@
+"""
+Lightweight Read Rows.
+
+List endpoints only serialize the rows they read and throw them away. Loading
+them as ORM instances pays for an `InstanceState` (`_sa_instance_state`) and a
+`__dict__` per row, the identity map and change tracking, none of which a read
+uses. The read path here selects the model's columns instead of the entity and
+returns each result row as an immutable named tuple generated from the model
+(`ObjectiveRow`, `TeamMemberRow`, ...): one tuple per row, no per-row state,
+nothing added to the session. The rows have the model's attribute names, so
+the response schemas validate them with `from_attributes` unchanged, and
+FastAPI passes them through as they are (unlike dataclasses, which it copies
+into dictionaries first).
+
+Rows are read-only snapshots without relationships; use the ORM functions for
+anything that writes or navigates relationships. Page caches hold the same
+column dictionaries as the ORM path (`row_to_dict`), so both share entries.
+"""
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import Select
+
+from app.core.cache import restore_row
+
+_row_types: Dict[type, type] = {}
+
+
+def row_type(model: type) -> type:
+    """Returns the named tuple type of `model`'s columns (created once per model)."""
+    row_cls = _row_types.get(model)
+    if row_cls is None:
+        keys = [attr.key for attr in inspect(model).mapper.column_attrs]
+        row_cls = namedtuple(f"{model.__name__}Row", keys, module=__name__)
+        _row_types[model] = row_cls
+    return row_cls
+
+
+def select_rows(model: type) -> Select:
+    """A SELECT of `model`'s columns in the order of its row type, to filter and page like a query."""
+    return select(*(getattr(model, key) for key in row_type(model)._fields))
+
+
+def fetch_rows(db: Session, model: type, statement: Select) -> List[Any]:
+    """Executes a `select_rows(model)` statement and returns its rows."""
+    make = row_type(model)._make
+    return [make(row) for row in db.execute(statement)]
+
+
+def rows_to_dicts(rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Column dictionaries of rows, in the format `row_to_dict` caches."""
+    return [row._asdict() for row in rows]
+
+
+def rows_from_dicts(model: type, data: Optional[Sequence[Dict[str, Any]]]) -> List[Any]:
+    """Rows of `model` from cached column dictionaries (restoring dates and enums)."""
+    row_cls = row_type(model)
+    return [row_cls(**restore_row(model, item)) for item in data or ()]
@@ -3,16 +3,26 @@ SQLAlchemy Declarative Base Class.
 
 This module defines the base class for all SQLAlchemy ORM models in the application.
 It includes common columns that will be inherited by all models, such as an 'id'
-primary key, 'active' status, and 'created_at'/'updated_at' timestamps.
+primary key, 'active' status, 'created_at'/'updated_at' timestamps and a 'version'
+counter for optimistic concurrency control.
 """
 
 from datetime import datetime  # <--- Add this import
 from sqlalchemy.ext.declarative import as_declarative, declared_attr
-from sqlalchemy import Integer, Boolean, DateTime
+from sqlalchemy import Integer, Boolean, DateTime, event, text
 from sqlalchemy.sql import func  # Import func
 from sqlalchemy.orm import Mapped, mapped_column  # Add Mapped and mapped_column
 
 
+ACTIVE_ROWS_ONLY = {"postgresql_where": text("active"), "sqlite_where": text("active = 1")}
+"""
+Keyword arguments making an `Index` partial, covering only active rows.
+
+Queries use such an index when they filter on the model's `active` column,
+which SQLAlchemy renders as `active` (PostgreSQL) or `active = 1` (SQLite).
+"""
+
+
 @as_declarative()
 class Base:
     """
@@ -20,9 +30,11 @@ class Base:
 
     Provides automated table name generation and common columns:
     - `id`: An integer primary key, indexed for fast lookups.
-    - `active`: A boolean indicating if the record is active, defaults to True.
+    - `active`: A boolean indicating if the record is active (not soft-deleted), defaults to True.
     - `created_at`: A datetime field automatically set to the current time on creation.
     - `updated_at`: A datetime field automatically set to the current time on update.
+    - `version`: A counter incremented by every UPDATE, used as the ETag of a row
+      and checked by conditional (`If-Match`) writes.
 
     The `__tablename__` is automatically generated as the lowercase version of the
     class name.
@@ -43,7 +55,12 @@ class Base:
     """Surrogate primary key for all tables, indexed for efficiency."""
 
     active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
-    """Boolean flag to indicate if the record is active. Defaults to True."""
+    """
+    Boolean flag to indicate if the record is active. Defaults to True.
+
+    Deleting a record through the API clears the flag (soft delete); reads only
+    return active records unless asked otherwise.
+    """
 
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
@@ -54,3 +71,18 @@ class Base:
         DateTime(timezone=True), onupdate=func.now(), nullable=True
     )
     """Timestamp indicating when the record was last updated. Updated by the database server on modification."""
+
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default="1", nullable=False)
+    """Row version, starting at 1 and incremented in the database by every UPDATE."""
+
+
+@event.listens_for(Base, "before_update", propagate=True)
+def _increment_version(mapper, connection, target) -> None:
+    """
+    Increments `version` in the UPDATE statement of every ORM flush.
+
+    The increment happens in SQL (`version = version + 1`) rather than via the
+    mapper's `version_id_col`, so full updates stay last-writer-wins instead of
+    failing on rows read from a cache, while conditional writes see them.
+    """
+    target.version = mapper.local_table.c.version + 1
@@ -0,0 +1,256 @@
+"""
+Lock-Aware Migration Helpers.
+
+Operations for Alembic revisions that touch the large tables (objectives,
+progress_updates) while the API keeps writing to them. `alembic/env.py` runs
+each revision in its own transaction with `lock_timeout` and
+`statement_timeout` set, so a DDL statement stuck behind a long transaction
+fails fast instead of queueing every write behind its lock request.
+
+- `create_index_concurrently()` / `drop_index_concurrently()`: build or drop an
+  index without blocking writes (PostgreSQL `CONCURRENTLY`, outside the
+  revision's transaction). Partitioned tables get the index built on each
+  partition and attached to an index on the parent.
+- `backfill()`: updates a column in id ranges of `MIGRATION_BACKFILL_BATCH_SIZE`
+  rows, each batch committed on its own, and logs the progress.
+
+With `alembic -x dry_run=true upgrade head` nothing is committed: env.py
+reports the locks each revision takes, and these helpers only log what they
+would do. Other databases fall back to the plain operations.
+
+Usage in a revision:
+
+    from app.db.migrations import backfill, create_index_concurrently
+
+    def upgrade() -> None:
+        op.add_column('objectives', sa.Column('score', sa.Float(), nullable=True))
+        backfill('objectives', 'score = 0', where='score IS NULL')
+        create_index_concurrently('ix_objectives_score', 'objectives', ['score'])
+"""
+import logging
+import time
+from typing import List, Optional, Sequence
+
+from alembic import op
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db import partitioning
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+MAX_IDENTIFIER_LENGTH = 63
+"""PostgreSQL truncates longer identifiers."""
+
+
+def is_dry_run() -> bool:
+    """Whether the migrations run with `-x dry_run=true`."""
+    return bool(op.get_context().opts.get("dry_run"))
+
+
+def _is_postgresql() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _estimated_rows(table_name: str) -> Optional[int]:
+    """The planner's row estimate of a table; None in `--sql` mode or off PostgreSQL."""
+    context = op.get_context()
+    if context.as_sql or not _is_postgresql():
+        return None
+    estimate = op.get_bind().execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table_name}
+    ).scalar()
+    return max(estimate, 0) if estimate is not None else None
+
+
+def _partitions(table_name: str) -> List[str]:
+    """Partitions of a partitioned table; empty for plain tables and in `--sql` mode."""
+    if op.get_context().as_sql or not partitioning.is_partitioned(op.get_bind(), table_name):
+        return []
+    return partitioning.existing_partitions(op.get_bind(), table_name)
+
+
+def _without_timeouts(statements: Sequence[str]) -> None:
+    """
+    Runs `statements` with `lock_timeout` and `statement_timeout` lifted: a
+    concurrent build waits for older transactions without blocking anyone, and
+    aborting it would leave an INVALID index behind.
+    """
+    op.execute("SET lock_timeout = 0")
+    op.execute("SET statement_timeout = 0")
+    try:
+        for statement in statements:
+            op.execute(statement)
+    finally:
+        opts = op.get_context().opts
+        op.execute(f"SET lock_timeout = '{opts.get('lock_timeout', '0')}'")
+        op.execute(f"SET statement_timeout = '{opts.get('statement_timeout', '0')}'")
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str],
+    unique: bool = False,
+    include: Sequence[str] = (),
+    where: Optional[str] = None,
+) -> None:
+    """
+    Creates an index without blocking writes to the table.
+
+    On PostgreSQL the index is built with `CREATE INDEX CONCURRENTLY` in an
+    autocommit block, after dropping a leftover INVALID index of an earlier,
+    interrupted attempt. A partitioned table cannot be indexed concurrently:
+    the index is created on the parent alone (`ON ONLY`, instant), built
+    concurrently on each partition and the partition indexes are attached.
+
+    Args:
+        index_name: Name of the index.
+        table_name: Table to index.
+        columns: Indexed columns (or SQL expressions).
+        unique: Create a unique index.
+        include: Non-key columns stored in the index (`INCLUDE`).
+        where: SQL predicate of a partial index.
+    """
+    if not _is_postgresql():
+        op.create_index(index_name, table_name, list(columns), unique=unique)
+        return
+
+    def ddl(name: str, table: str, concurrently: bool, only: bool = False) -> str:
+        return (
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {'CONCURRENTLY ' if concurrently else ''}"
+            f"IF NOT EXISTS {name} ON {'ONLY ' if only else ''}{table} ({', '.join(columns)})"
+            + (f" INCLUDE ({', '.join(include)})" if include else "")
+            + (f" WHERE {where}" if where else "")
+        )
+
+    partitions = _partitions(table_name)
+    if is_dry_run():
+        rows = _estimated_rows(table_name)
+        logger.info(
+            "dry run: would build %s concurrently on %s (~%s rows%s); takes SHARE UPDATE EXCLUSIVE, writes continue",
+            index_name, table_name, rows if rows is not None else "?",
+            f", {len(partitions)} partitions" if partitions else "",
+        )
+        return
+
+    with op.get_context().autocommit_block():
+        if not partitions:
+            statements = [ddl(index_name, table_name, concurrently=True)]
+            if not _is_valid(index_name):
+                statements.insert(0, f"DROP INDEX CONCURRENTLY {index_name}")
+            _without_timeouts(statements)
+            return
+        op.execute(ddl(index_name, table_name, concurrently=False, only=True))
+        for partition in partitions:
+            suffix = partition[len(table_name) + 1:] if partition.startswith(table_name + "_") else partition
+            partition_index = f"{index_name}_{suffix}"[:MAX_IDENTIFIER_LENGTH]
+            _without_timeouts([ddl(partition_index, partition, concurrently=True)])
+            if not _is_attached(partition_index):
+                op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+
+
+def _is_valid(index_name: str) -> bool:
+    """False if `index_name` exists but is INVALID (an interrupted concurrent build)."""
+    if op.get_context().as_sql:
+        return True
+    valid = op.get_bind().execute(
+        text("SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:index)"), {"index": index_name}
+    ).scalar()
+    return valid is not False
+
+
+def _is_attached(index_name: str) -> bool:
+    if op.get_context().as_sql:
+        return False
+    return bool(op.get_bind().execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:index))"), {"index": index_name}
+    ).scalar())
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """
+    Drops an index without blocking reads or writes (PostgreSQL, plain tables).
+
+    Indexes of partitioned tables cannot be dropped concurrently; they are
+    dropped normally, which briefly locks the table.
+    """
+    if not _is_postgresql():
+        op.drop_index(index_name, table_name=table_name)
+        return
+    if is_dry_run():
+        logger.info("dry run: would drop %s on %s", index_name, table_name)
+        return
+    if _partitions(table_name):
+        op.drop_index(index_name, table_name=table_name, if_exists=True)
+        return
+    with op.get_context().autocommit_block():
+        _without_timeouts([f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"])
+
+
+def backfill(
+    table_name: str,
+    assignments: str,
+    where: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    pause_seconds: float = 0.0,
+) -> int:
+    """
+    Runs `UPDATE table SET assignments [WHERE where]` in id ranges of
+    `batch_size` rows, committing each batch, so no batch holds its row locks
+    for long and replicas can keep up.
+
+    The revision's transaction is committed first (autocommit block); an
+    interrupted backfill can simply be run again if `where` excludes rows that
+    are already done. In `--sql` mode a single UPDATE is emitted.
+
+    Args:
+        table_name: Table to update; must have an integer `id`.
+        assignments: SQL of the SET clause, e.g. `"score = 0"`.
+        where: Optional SQL predicate selecting the rows to update.
+        batch_size: Ids per batch (default: `MIGRATION_BACKFILL_BATCH_SIZE`).
+        pause_seconds: Sleep between batches.
+
+    Returns:
+        int: The number of updated rows (0 in dry-run and `--sql` mode).
+    """
+    batch_size = max(batch_size or settings.MIGRATION_BACKFILL_BATCH_SIZE, 1)
+    condition = f" AND ({where})" if where else ""
+    context = op.get_context()
+    if context.as_sql:
+        op.execute(f"UPDATE {table_name} SET {assignments}" + (f" WHERE {where}" if where else ""))
+        return 0
+
+    connection = op.get_bind()
+    low, high = connection.execute(text(f"SELECT min(id), max(id) FROM {table_name}")).one()
+    if low is None:
+        return 0
+    batches = (high - low) // batch_size + 1
+    if is_dry_run():
+        pending = connection.execute(
+            text(f"SELECT count(*) FROM {table_name}" + (f" WHERE {where}" if where else ""))
+        ).scalar()
+        logger.info(
+            "dry run: would update %s rows of %s in %s batches of %s ids; each batch locks only its rows",
+            pending, table_name, batches, batch_size,
+        )
+        return 0
+
+    updated = 0
+    started = time.monotonic()
+    with context.autocommit_block():
+        for batch, start in enumerate(range(low, high + 1, batch_size), 1):
+            result = op.get_bind().execute(
+                text(f"UPDATE {table_name} SET {assignments} WHERE id >= :start AND id < :stop{condition}"),
+                {"start": start, "stop": start + batch_size},
+            )
+            updated += max(result.rowcount, 0)
+            if batch % 10 == 0 or batch == batches:
+                elapsed = time.monotonic() - started
+                logger.info(
+                    "backfill %s: batch %s/%s, %s rows updated, %.1fs elapsed",
+                    table_name, batch, batches, updated, elapsed,
+                )
+            if pause_seconds:
+                time.sleep(pause_seconds)
+    return updated
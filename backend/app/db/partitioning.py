@@ -0,0 +1,177 @@
+"""
+Range Partitioning of progress_updates (PostgreSQL).
+
+On PostgreSQL the `progress_updates` table is declaratively partitioned by
+`RANGE (progress_date)`, one partition per calendar year
+(`progress_updates_y2025` holds 2025-01-01 up to, excluding, 2026-01-01) plus
+`progress_updates_default` for dates no yearly partition covers. Queries that
+bound `progress_date` (the aggregation, the by-objective lists with
+`start`/`end`) only scan the partitions of that range.
+
+PostgreSQL requires the primary key of a partitioned table to contain the
+partition key, so there it is `(id, progress_date)`; ids still come from the
+table's sequence and stay unique. The ORM model keeps `id` as its primary key,
+and `Base.metadata.create_all()` (SQLite, development) creates the plain,
+unpartitioned table, for which everything here is a no-op.
+
+- `convert_statements()` / `revert_statements()`: the DDL turning the plain
+  table into the partitioned one and back, used by the Alembic migration.
+- `ensure_partitions()`: creates the yearly partitions of the current and the
+  next `PROGRESS_PARTITIONS_AHEAD_YEARS` years; run at startup.
+"""
+from datetime import date
+from typing import Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+TABLE = "progress_updates"
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+_LOCK_KEY = f"{TABLE} partitions"
+"""Advisory lock serializing partition maintenance across workers."""
+
+_INDEXES = [
+    f"CREATE INDEX ix_{TABLE}_id ON {TABLE} (id)",
+    f"CREATE INDEX ix_{TABLE}_objective_id_progress_date ON {TABLE} (objective_id, progress_date) "
+    "INCLUDE (progress, id, active)",
+]
+
+
+def partition_name(year: int) -> str:
+    """Name of the partition holding the progress updates of `year`."""
+    return f"{TABLE}_y{year}"
+
+
+def _swap_statements(old: str, partitioned: bool) -> List[str]:
+    """
+    Renames the table to `old`, recreates it with the same columns (partitioned
+    or not) and copies the rows over. The column defaults, including the
+    `nextval()` of the id sequence, carry over with `LIKE`.
+    """
+    primary_key = "(id, progress_date)" if partitioned else "(id)"
+    return [
+        f"LOCK TABLE {TABLE} IN ACCESS EXCLUSIVE MODE",
+        f"ALTER TABLE {TABLE} RENAME TO {old}",
+        f"ALTER TABLE {old} RENAME CONSTRAINT {TABLE}_pkey TO {old}_pkey",
+        f"DROP INDEX ix_{TABLE}_id",
+        f"DROP INDEX ix_{TABLE}_objective_id_progress_date",
+        # Otherwise dropping the old table would drop the sequence with it
+        f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY NONE",
+        f"CREATE TABLE {TABLE} (LIKE {old} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        + (" PARTITION BY RANGE (progress_date)" if partitioned else ""),
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY {primary_key}",
+        f"ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_objective_id_fkey "
+        "FOREIGN KEY (objective_id) REFERENCES objectives (id)",
+    ]
+
+
+def convert_statements(years_ahead: int = 1) -> List[str]:
+    """
+    DDL converting the plain `progress_updates` table into the partitioned one.
+
+    Creates yearly partitions from the year of the oldest update up to
+    `years_ahead` years after the current one, and the default partition. The
+    table is locked while the rows are copied, so run it in a maintenance
+    window on large tables.
+    """
+    old = f"{TABLE}_unpartitioned"
+    return _swap_statements(old, partitioned=True) + [
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {TABLE} DEFAULT",
+        # Plain SQL (no round trip to read the oldest year) so `alembic upgrade --sql` renders it too
+        f"""DO $$
+DECLARE
+    y integer;
+BEGIN
+    FOR y IN SELECT generate_series(
+        coalesce(min(extract(year FROM progress_date))::integer, extract(year FROM current_date)::integer),
+        extract(year FROM current_date)::integer + {int(years_ahead)}
+    ) FROM {old} LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF {TABLE} FOR VALUES FROM (%L) TO (%L)',
+            '{TABLE}_y' || y, make_date(y, 1, 1), make_date(y + 1, 1, 1)
+        );
+    END LOOP;
+END $$""",
+        f"INSERT INTO {TABLE} SELECT * FROM {old}",
+        f"DROP TABLE {old}",
+        f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id",
+    ] + _INDEXES
+
+
+def revert_statements() -> List[str]:
+    """DDL turning the partitioned `progress_updates` table back into a plain one."""
+    old = f"{TABLE}_partitioned"
+    return _swap_statements(old, partitioned=False) + [
+        f"INSERT INTO {TABLE} SELECT * FROM {old}",
+        f"DROP TABLE {old}",  # drops the partitions with it
+        f"ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id",
+    ] + _INDEXES
+
+
+def is_partitioned(conn: Connection, table: str = TABLE) -> bool:
+    """Whether `table` is a partitioned table (always False off PostgreSQL)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    relkind = conn.execute(
+        text("SELECT relkind FROM pg_class WHERE oid = to_regclass(:table)"), {"table": table}
+    ).scalar()
+    return relkind == "p"
+
+
+def existing_partitions(conn: Connection, table: str = TABLE) -> List[str]:
+    """Names of the partitions of `table`."""
+    return list(conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = to_regclass(:table) ORDER BY child.relname"
+        ),
+        {"table": table},
+    ).scalars())
+
+
+def ensure_partitions(conn: Connection, years_ahead: int, years: Optional[Iterable[int]] = None) -> List[str]:
+    """
+    Creates the missing yearly partitions of the current year and the
+    `years_ahead` following ones (or of `years`, if given).
+
+    Updates of a new partition's year that already landed in the default
+    partition are moved into it before it is attached, since PostgreSQL refuses
+    to attach a range the default partition has rows for. Concurrent callers
+    (one per worker at startup) are serialized with an advisory lock. The
+    caller commits.
+
+    Returns:
+        List[str]: The names of the created partitions; empty if the table is
+        not partitioned (SQLite, migration not applied).
+    """
+    if not is_partitioned(conn):
+        return []
+    if years is None:
+        current = date.today().year
+        years = range(current, current + years_ahead + 1)
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _LOCK_KEY})
+    existing = set(existing_partitions(conn))
+    created = []
+    for year in sorted(set(years)):
+        name = partition_name(year)
+        if name in existing:
+            continue
+        bounds = {"lo": date(year, 1, 1), "hi": date(year + 1, 1, 1)}
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(
+            text(
+                f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+                "WHERE progress_date >= :lo AND progress_date < :hi RETURNING *) "
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ),
+            bounds,
+        )
+        # Creates the partitioned indexes, primary key and foreign key on the new partition
+        conn.execute(text(
+            f"ALTER TABLE {TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{bounds['lo'].isoformat()}') TO ('{bounds['hi'].isoformat()}')"
+        ))
+        created.append(name)
+    return created
@@ -2,16 +2,41 @@
 Database Session Management.
 
 This module sets up the SQLAlchemy database engine and session handling.
-It provides a dependency (`get_db`) for FastAPI endpoints to obtain a database session.
+It provides a dependency (`get_db`) for FastAPI endpoints to obtain a database session,
+and `get_read_db` for read-only endpoints, which is served by a read replica
+when `SQLALCHEMY_REPLICA_URLS` is set. Replica sessions are marked (see
+`from_replica`) so their reads don't fill the shared cache.
 """
+import itertools
+import threading
+import time
+from typing import Dict, List
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
-# For SQLite, connect_args is needed to enable foreign key support by default
-# and to allow the same connection to be used across different threads in FastAPI.
+
+def engine_args_for(url: str) -> dict:
+    """Returns the `create_engine` keyword arguments for the database at `url`."""
+    # For SQLite, connect_args is needed to enable foreign key support by default
+    # and to allow the same connection to be used across different threads in FastAPI.
+    if "sqlite" in url:
+        return {"connect_args": {"check_same_thread": False}}
+    # Every worker process has its own pool, so the database sees up to
+    # WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+    }
+
+
 db_url = settings.database_url
-engine_args = {"connect_args": {"check_same_thread": False}} if "sqlite" in db_url else {}
+engine_args = engine_args_for(db_url)
 
 engine = create_engine(
     db_url,
@@ -20,7 +45,8 @@ engine = create_engine(
 """
 SQLAlchemy database engine.
 Configured using the `SQLALCHEMY_DATABASE_URL` from application settings.
-Includes specific arguments for SQLite if it's the selected database.
+Includes specific arguments for SQLite if it's the selected database, and the
+`DB_POOL_*` sizing for every other database.
 """
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -29,6 +55,130 @@ Factory for creating SQLAlchemy database sessions.
 Sessions are configured to not autocommit or autoflush, and are bound to the engine.
 """
 
+
+def warm_up_pool(connections: int) -> int:
+    """
+    Opens up to `connections` pooled connections and returns them to the pool.
+
+    Called at startup so the first requests after a deploy find ready
+    connections instead of paying for the connect/handshake themselves. The
+    count is capped at the pool size, since surplus overflow connections would
+    be closed again on checkin.
+
+    Returns:
+        int: The number of connections that were opened.
+    """
+    size = getattr(engine.pool, "size", None)
+    if callable(size):
+        connections = min(connections, size())
+    opened = []
+    try:
+        for _ in range(max(connections, 0)):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+    return len(opened)
+
+
+class ReplicaRouter:
+    """
+    Picks the engine for read-only sessions.
+
+    Replicas are used round-robin. A replica whose connection attempt fails is
+    taken out of rotation for `retry_seconds`, after which the next read tries
+    it again; when no replica is available reads fall back to the primary.
+
+    Args:
+        primary: The primary engine (used for writes and as fallback).
+        replicas: One engine per read replica.
+        retry_seconds: How long a failed replica stays out of rotation.
+    """
+
+    def __init__(self, primary: Engine, replicas: List[Engine], retry_seconds: float = 10.0):
+        self.primary = primary
+        self.replicas = replicas
+        self.retry_seconds = retry_seconds
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self._down_until: Dict[int, float] = {}
+        self.reads = {"primary": 0, "replica": 0}
+        self.failures = 0
+
+    def _candidates(self) -> List[int]:
+        if not self.replicas:
+            return []
+        start = next(self._next) % len(self.replicas)
+        now = time.monotonic()
+        order = [(start + i) % len(self.replicas) for i in range(len(self.replicas))]
+        with self._lock:
+            return [i for i in order if self._down_until.get(i, 0.0) <= now]
+
+    def connect(self) -> Connection:
+        """
+        Returns a connection to a healthy replica, or to the primary if there is none.
+
+        Connecting eagerly here (instead of on the session's first query) is what
+        lets a failing replica be skipped before the endpoint runs.
+        """
+        for index in self._candidates():
+            try:
+                connection = self.replicas[index].connect()
+            except DBAPIError as e:
+                with self._lock:
+                    self._down_until[index] = time.monotonic() + self.retry_seconds
+                    self.failures += 1
+                print(f"Read replica {self.replicas[index].url!r} unavailable, retrying in {self.retry_seconds}s: {e}")
+                continue
+            with self._lock:
+                self._down_until.pop(index, None)
+                self.reads["replica"] += 1
+            return connection
+        with self._lock:
+            self.reads["primary"] += 1
+        return self.primary.connect()
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                "replicas": [
+                    {
+                        "url": self.replicas[i].url.render_as_string(hide_password=True),
+                        "healthy": self._down_until.get(i, 0.0) <= now,
+                    }
+                    for i in range(len(self.replicas))
+                ],
+                "reads": dict(self.reads),
+                "failures": self.failures,
+            }
+
+
+replica_urls = [url.strip() for url in settings.SQLALCHEMY_REPLICA_URLS.split(",") if url.strip()]
+read_router = ReplicaRouter(
+    engine,
+    # pool_pre_ping replaces connections a restarted replica has dropped instead of failing the request
+    [create_engine(url, pool_pre_ping=True, **engine_args_for(url)) for url in replica_urls],
+    retry_seconds=settings.DB_REPLICA_RETRY_SECONDS,
+)
+"""
+Routes read-only sessions to the replicas listed in `SQLALCHEMY_REPLICA_URLS`
+(round-robin, skipping unhealthy ones) or to the primary when there are none.
+"""
+
+
+def from_replica(db: Session) -> bool:
+    """
+    Whether `db` reads from a read replica.
+
+    The crud getters load cache misses of such sessions without storing them
+    (`populate=False`): a replica may still return a row from before a write
+    whose invalidation already happened, and the cache is shared with the
+    primary sessions that must read their writes (authentication, `If-Match`).
+    """
+    return bool(db.info.get("replica"))
+
+
 # Dependency to get DB session
 
 
@@ -48,3 +198,27 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """
+    FastAPI dependency to get a database session for read-only endpoints.
+
+    The session is bound to a read replica when one is configured and healthy,
+    otherwise to the primary. Replicas may lag behind the primary, so endpoints
+    that write, or that must see a write made earlier in the same request, use
+    `get_db` instead.
+
+    Yields:
+        sqlalchemy.orm.Session: The database session.
+    """
+    if not read_router.replicas:
+        yield from get_db()
+        return
+    connection = read_router.connect()
+    db = SessionLocal(bind=connection, info={"replica": connection.engine is not read_router.primary})
+    try:
+        yield db
+    finally:
+        db.close()
+        connection.close()
@@ -2,16 +2,34 @@
 Main FastAPI Application.
 
 This module initializes the FastAPI application, includes API routers,
-and defines startup and shutdown event handlers. It serves as the
-primary entry point for the ASGI server (e.g., Uvicorn).
+and defines the lifespan handler that runs on startup and shutdown. It serves
+as the primary entry point for the ASGI server (e.g., Uvicorn).
 """
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware  # Import CORSMiddleware
 from app.api import api_router  # Main API router
-from app.db.session import engine  # SQLAlchemy engine
+from app import IMPORT_STARTED
+from app.db.session import engine, warm_up_pool  # SQLAlchemy engine
+from app.db.partitioning import ensure_partitions
 from app.db.base_class import Base  # SQLAlchemy declarative base for table creation
-from sqlalchemy.orm import DeclarativeMeta
+from app.core.config import settings
+from app.core.concurrency import partition  # Threadpool split into route groups
+from app.core.events import broker  # Change feed broker (WebSocket/SSE)
+from app.core.rate_limit import rate_limiter
+from app.core.revocation import revocation
+from app.core.security import verify_token
+from app.core.startup import StartupTimings
+from app.core.tokens import get_token_service
+from app.middleware import (
+    AdaptiveConcurrencyLimit,
+    AdmissionControlMiddleware,
+    CompressionMiddleware,
+    parse_quotas,
+)
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import DeclarativeMeta, configure_mappers
 
 Base: DeclarativeMeta
 
@@ -30,6 +48,62 @@ def create_db_and_tables():
     Base.metadata.create_all(bind=engine)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application lifespan handler.
+
+    Everything before the `yield` runs once before the first request is
+    served, everything after it on shutdown. Startup does the work the first
+    requests after a deploy would otherwise pay for: it sizes the threadpool
+    and its route group limiters, configures the ORM mappers, prepares the JWT
+    keys, opens `DB_POOL_WARMUP` pooled connections, loads the persisted token
+    revocations, creates the upcoming yearly progress_updates partitions
+    (PostgreSQL) and starts the change feed broker.
+    The duration of each phase is printed and exposed at `/api/v1/metrics/startup`.
+
+    The `create_db_and_tables()` call is commented out, as Alembic is preferred.
+    """
+    timings = app.state.startup_timings
+    # create_db_and_tables() # Example: creates tables on startup if not using Alembic
+    # Sync endpoints and dependencies run in this worker's threadpool.
+    partition.configure(
+        settings.THREADPOOL_SIZE, settings.THREADPOOL_AUTH_TOKENS, settings.THREADPOOL_REWRITE_TOKENS
+    )
+    with timings.phase("configure_mappers"):
+        configure_mappers()
+    with timings.phase("token_keys"):
+        get_token_service()  # Loads and prepares the JWT keys; a misconfiguration fails the startup
+    with timings.phase("pool_warmup"):
+        try:
+            warm_up_pool(settings.DB_POOL_WARMUP)
+        except SQLAlchemyError as e:
+            # The database may come up after the API; requests will connect lazily.
+            print(f"Connection pool warmup failed: {e}")
+    with timings.phase("revocations"):
+        # Not optional like the warmup: starting without them would accept revoked tokens again.
+        revocation.load()
+    if engine.dialect.name == "postgresql":
+        with timings.phase("partitions"):
+            try:
+                with engine.begin() as conn:
+                    created = ensure_partitions(conn, settings.PROGRESS_PARTITIONS_AHEAD_YEARS)
+                if created:
+                    print(f"Created partitions: {', '.join(created)}")
+            except SQLAlchemyError as e:
+                print(f"Partition maintenance failed: {e}")
+    with timings.phase("event_broker"):
+        broker.start()  # Starts the LISTEN thread when EVENT_BROKER=postgres
+    print(f"Application startup complete in {timings.finish()}")
+
+    yield
+
+    broker.stop()
+    print("Application shutdown.")
+    # Clean up resources, e.g., close DB connection pools
+    engine.dispose()
+
+
 app = FastAPI(
     title="AIPH Backend API",
     description="""
@@ -54,6 +128,7 @@ app = FastAPI(
     """,
     version="1.0.0",
     openapi_url="/api/v1/openapi.json",
+    lifespan=lifespan,
 )
 """
 The main FastAPI application instance.
@@ -70,6 +145,38 @@ origins = [
     "http://localhost:5173",  # Common Vite dev port
 ]
 
+# Compress large responses (gzip, plus brotli/zstd when installed); see app/middleware/compression.py
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        encodings=settings.COMPRESSION_ENCODINGS.split(","),
+        gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+        zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+    )
+
+# Per-client quotas and load shedding ahead of routing; see app/middleware/admission.py.
+# Inside CORS so that 429/503 responses stay readable by the frontend.
+app.state.admission_limit = (
+    AdaptiveConcurrencyLimit(
+        target_seconds=settings.ADMISSION_LATENCY_TARGET_MS / 1000,
+        minimum=settings.ADMISSION_MIN_CONCURRENCY,
+        maximum=settings.ADMISSION_MAX_CONCURRENCY,
+    )
+    if settings.ADMISSION_CONCURRENCY_ENABLED
+    else None
+)
+app.add_middleware(
+    AdmissionControlMiddleware,
+    rate_limiter=rate_limiter,
+    quotas=parse_quotas(settings.CLIENT_RATE_LIMITS),
+    concurrency=app.state.admission_limit,
+    exempt_paths=["/api/v1/events", "/api/v1/metrics", "/api/v1/openapi.json", "/docs", "/.well-known"],
+    retry_after_seconds=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    verify_token=verify_token,
+)
+
 # Add CORS middleware to the application
 app.add_middleware(
     CORSMiddleware,
@@ -80,38 +187,13 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-def on_startup():
-    """
-    Application startup event handler.
-
-    This function is executed when the FastAPI application starts up.
-    It can be used to initialize resources, such as database connections,
-    or perform other setup tasks. Currently, it prints a startup message.
-    The `create_db_and_tables()` call is commented out, as Alembic is preferred.
-    """
-    # You might want to remove this for production and use Alembic exclusively
-    # create_db_and_tables() # Example: creates tables on startup if not using Alembic
-    print("Application startup complete.")
-    # You could also initialize DB connection pools or other resources here
-
-
-@app.on_event("shutdown")
-def on_shutdown():
-    """
-    Application shutdown event handler.
-
-    This function is executed when the FastAPI application is shutting down.
-    It can be used to clean up resources, such as closing database connections.
-    Currently, it prints a shutdown message.
-    """
-    print("Application shutdown.")
-    # Clean up resources, e.g., close DB connection pools
-
-
 # Include the main API router with a version prefix
 app.include_router(api_router, prefix="/api/v1")
 
+# Importing this module (settings, models, routers) is the first startup phase.
+app.state.startup_timings = StartupTimings(started_at=IMPORT_STARTED)
+app.state.startup_timings.record("import", IMPORT_STARTED)
+
 
 @app.get("/")
 async def root():
@@ -126,6 +208,17 @@ async def root():
     return {"message": "Welcome to the FastAPI Nuxt Backend!"}
 
 
+@app.get("/.well-known/jwks.json")
+async def jwks(response: Response):
+    """
+    Public keys for validating the API's tokens (RFC 7517), for services that
+    accept them without calling the API. Empty with HS256, whose secret is never
+    published. Includes rotated-out keys whose tokens are still accepted.
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_token_service().jwks()
+
+
 # If you want to run this directly using `python app/main.py` (though uvicorn is preferred for development and production)
 # if __name__ == "__main__":
 #     import uvicorn
@@ -0,0 +1,2 @@
+from .admission import AdaptiveConcurrencyLimit, AdmissionControlMiddleware, parse_quotas
+from .compression import CompressionMiddleware
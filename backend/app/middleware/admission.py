@@ -0,0 +1,267 @@
+"""
+Admission Control Middleware.
+
+A pure ASGI middleware that decides, before any routing, dependency or
+threadpool work, whether a request is served:
+
+- Per-client quotas by route group: each client gets a token bucket per route
+  group (`auth`, `rewrite`, `default`, see app/core/concurrency.py), e.g.
+  `default=600/minute`. Clients are identified by the subject of their bearer
+  token when it is valid (many users behind one NAT don't share a quota) and
+  by their IP otherwise. Tokens are only trusted after their signature and
+  expiry have been verified: requests with made-up, tampered or expired tokens
+  are charged to the IP, so inventing a token per request gets no new quota.
+  Buckets live in the rate limit backend (app/core/rate_limit.py),
+  so with `RATE_LIMIT_BACKEND=redis` the quotas hold across workers. Requests
+  over quota get `429` with `Retry-After`; all limited responses carry
+  `X-RateLimit-*` headers.
+- A global adaptive concurrency limit: the number of requests in flight in
+  this worker is capped, and the cap follows the latency (AIMD). Whenever the
+  p90 time to first byte of a window exceeds the target, the cap shrinks
+  multiplicatively; while latency is fine and the cap is in use it grows again.
+  Requests beyond the cap are shed at once with `503` and `Retry-After`, so an
+  overload costs the rejected requests a few microseconds instead of slowing
+  every route into timeouts.
+
+Paths in `exempt_paths` (change feed streams, metrics) bypass both, so
+long-lived connections don't hold concurrency and the server stays observable
+while it sheds.
+"""
+import json
+import math
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from jose import JWTError
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.concurrency import DEFAULT_GROUP
+from app.core.rate_limit import Bucket, RateLimitBackend, parse_rate
+
+
+def parse_quotas(quotas: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Parses `"default=600/minute,auth=60/minute"` into `{group: (capacity, period)}`.
+
+    Raises:
+        ValueError: If an entry is malformed.
+    """
+    parsed = {}
+    for entry in filter(None, (part.strip() for part in quotas.split(","))):
+        group, sep, rate = entry.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid quota {entry!r}; expected e.g. 'default=600/minute'")
+        parsed[group.strip()] = parse_rate(rate)
+    return parsed
+
+
+def _add_headers(message: Message, headers: Dict[str, str]) -> None:
+    """Adds `headers` to a response start message, keeping those the endpoint set (e.g. the login limits)."""
+    response_headers = MutableHeaders(scope=message)
+    for name, value in headers.items():
+        response_headers.setdefault(name, value)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Additive-increase/multiplicative-decrease concurrency limit driven by latency.
+
+    Latencies are collected per window of `window_seconds` (and at least
+    `min_samples` requests). At the end of a window the limit is multiplied by
+    `backoff` if its p90 exceeded `target_seconds`, or raised by
+    `sqrt(limit)` if the latency was fine and the requests in flight reached
+    half the limit (an idle server gives no evidence that more would be fine).
+
+    Only used from the event loop thread, so it needs no lock.
+    """
+
+    def __init__(
+        self,
+        target_seconds: float,
+        minimum: int,
+        maximum: int,
+        window_seconds: float = 1.0,
+        min_samples: int = 20,
+        backoff: float = 0.9,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.target_seconds = target_seconds
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.backoff = backoff
+        self.clock = clock
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self.last_p90: Optional[float] = None
+        self._samples: List[float] = []
+        self._window_started = clock()
+        self._window_peak = 0
+
+    def try_acquire(self) -> bool:
+        """Admits a request if the limit allows; the caller must `release()` it."""
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            return False
+        self.in_flight += 1
+        self.admitted += 1
+        self._window_peak = max(self._window_peak, self.in_flight)
+        return True
+
+    def release(self, latency: Optional[float]) -> None:
+        """Ends an admitted request; `latency` is None if it produced no response."""
+        self.in_flight -= 1
+        if latency is not None:
+            self._samples.append(latency)
+        now = self.clock()
+        if len(self._samples) >= self.min_samples and now - self._window_started >= self.window_seconds:
+            self._adjust()
+            self._samples = []
+            self._window_started = now
+            self._window_peak = self.in_flight
+
+    def _adjust(self) -> None:
+        samples = sorted(self._samples)
+        self.last_p90 = samples[min(int(len(samples) * 0.9), len(samples) - 1)]
+        if self.last_p90 > self.target_seconds:
+            self.limit = max(self.minimum, self.limit * self.backoff)
+        elif self._window_peak * 2 >= self.limit:
+            self.limit = min(self.maximum, self.limit + math.sqrt(self.limit))
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "target_ms": round(self.target_seconds * 1000, 3),
+            "last_p90_ms": round(self.last_p90 * 1000, 3) if self.last_p90 is not None else None,
+        }
+
+
+class AdmissionControlMiddleware:
+    """
+    Applies the per-client quotas and the adaptive concurrency limit to HTTP
+    requests (see the module docstring).
+
+    Args:
+        app: The wrapped ASGI application.
+        rate_limiter: Backend holding the quota buckets.
+        quotas: Quota per route group, `{group: (capacity, period)}`; groups
+            without an entry are not limited, empty disables the quotas.
+        concurrency: The adaptive limit, or None to disable it.
+        exempt_paths: Path prefixes bypassing admission control.
+        retry_after_seconds: `Retry-After` of shed requests.
+        verify_token: Verifies a bearer token (signature and expiry) and
+            returns its claims, raising `JWTError` if it is invalid. Without
+            it every client is identified by its IP.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        rate_limiter: RateLimitBackend,
+        quotas: Dict[str, Tuple[int, int]],
+        concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+        exempt_paths: Sequence[str] = (),
+        retry_after_seconds: int = 1,
+        verify_token: Optional[Callable[[str], Dict[str, Any]]] = None,
+    ) -> None:
+        self.app = app
+        self.rate_limiter = rate_limiter
+        self.quotas = quotas
+        self.concurrency = concurrency
+        self.exempt_paths = tuple(exempt_paths)
+        self.retry_after_seconds = retry_after_seconds
+        self.verify_token = verify_token
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {}
+        if self.quotas:
+            group = self._route_group(scope)
+            quota = self.quotas.get(group)
+            if quota is not None:
+                result = self.rate_limiter.take([Bucket(f"client:{group}:{self._client(scope)}", *quota)])
+                headers = result.headers()
+                if not result.allowed:
+                    await self._reject(send, 429, "Rate limit exceeded, try again later", headers)
+                    return
+
+        if self.concurrency is None:
+            await self.app(scope, receive, self._with_headers(send, headers))
+            return
+        if not self.concurrency.try_acquire():
+            await self._reject(
+                send, 503, "Server overloaded, try again later", {"Retry-After": str(self.retry_after_seconds)}
+            )
+            return
+
+        started = time.monotonic()
+        latency = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal latency
+            if message["type"] == "http.response.start":
+                latency = time.monotonic() - started
+                _add_headers(message, headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.concurrency.release(latency)
+
+    @staticmethod
+    def _with_headers(send: Send, headers: Dict[str, str]) -> Send:
+        if not headers:
+            return send
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                _add_headers(message, headers)
+            await send(message)
+        return send_wrapper
+
+    @staticmethod
+    def _route_group(scope: Scope) -> str:
+        """The route group of the endpoint the request will be routed to (`default` if none)."""
+        router = getattr(scope.get("app"), "router", None)
+        for route in getattr(router, "routes", ()):
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(child_scope.get("endpoint"), "route_group", None) or DEFAULT_GROUP
+        return DEFAULT_GROUP
+
+    def _client(self, scope: Scope) -> str:
+        """Subject of a valid bearer token, or the client IP (also for invalid or expired tokens)."""
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if self.verify_token is not None and scheme.lower() == "bearer" and token:
+            try:
+                subject = self.verify_token(token).get("sub")
+            except JWTError:
+                subject = None
+            if subject is not None:
+                return f"user:{subject}"
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    @staticmethod
+    async def _reject(send: Send, status_code: int, detail: str, headers: Dict[str, str]) -> None:
+        body = json.dumps({"detail": detail}).encode()
+        raw_headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        raw_headers += [(name.lower().encode(), value.encode()) for name, value in headers.items()]
+        await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
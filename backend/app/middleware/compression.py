@@ -0,0 +1,256 @@
+"""
+Response Compression Middleware.
+
+A pure ASGI middleware that compresses response bodies with the best encoding
+the client accepts (brotli, zstd or gzip, in the configured preference order).
+
+- Complete bodies smaller than `minimum_size` are sent uncompressed.
+- Responses that already carry a `Content-Encoding`, event streams and media
+  types that are compressed by nature (images, archives, ...) are left alone.
+- Streaming responses (`StreamingResponse`, several `http.response.body`
+  messages) are compressed incrementally and flushed after every chunk, so the
+  client still receives data as it is produced.
+
+brotli and zstd need the optional `brotli` and `zstandard` packages; encodings
+whose package is missing are skipped.
+"""
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+EXCLUDED_MEDIA_TYPES: Tuple[str, ...] = (
+    "text/event-stream",
+    "image/",
+    "video/",
+    "audio/",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/octet-stream",
+    "application/pdf",
+    "font/woff",
+)
+"""Content types that are never compressed (already compressed or latency sensitive)."""
+
+
+class _Gzip:
+    def __init__(self, level: int):
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    def __init__(self, quality: int):
+        self._obj = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.process(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _Zstd:
+    def __init__(self, level: int):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """Returns the content codings supported in this environment."""
+    encodings = ["gzip"]
+    if brotli is not None:
+        encodings.append("br")
+    if zstandard is not None:
+        encodings.append("zstd")
+    return tuple(encodings)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Parses an `Accept-Encoding` header into a `{coding: q-value}` mapping."""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing responses according to `Accept-Encoding`.
+
+    Args:
+        app: The wrapped ASGI application.
+        minimum_size: Complete bodies below this many bytes are not compressed.
+        encodings: Encodings to offer, in server preference order.
+        gzip_level, brotli_quality, zstd_level: Compression levels per encoding.
+        excluded_media_types: Content-type prefixes that are never compressed.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        encodings: Iterable[str] = ("br", "zstd", "gzip"),
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+        excluded_media_types: Tuple[str, ...] = EXCLUDED_MEDIA_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        supported = available_encodings()
+        self.encodings = tuple(e for e in (e.strip().lower() for e in encodings) if e in supported)
+        self.levels = {"gzip": gzip_level, "br": brotli_quality, "zstd": zstd_level}
+        self.excluded_media_types = excluded_media_types
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Picks the first server-preferred encoding the client accepts with q > 0."""
+        if not accept_encoding:
+            return None
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        for encoding in self.encodings:
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return None
+
+    def make_compressor(self, encoding: str):
+        level = self.levels[encoding]
+        if encoding == "br":
+            return _Brotli(level)
+        if encoding == "zstd":
+            return _Zstd(level)
+        return _Gzip(level)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+
+
+class _CompressionResponder:
+    """Per-request state: buffers the start message until the first body chunk decides the strategy."""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    def _should_skip(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return True
+        if self.start_message["status"] in (204, 304) or self.start_message["status"] < 200:
+            return True
+        content_type = headers.get("content-type", "").lower()
+        return content_type.startswith(self.middleware.excluded_media_types)
+
+    def _start_compressed(self) -> MutableHeaders:
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # The compressed bytes differ from the identity representation.
+            headers["ETag"] = "W/" + etag
+        return headers
+
+    async def send_wrapper(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = self._should_skip(headers)
+            if self.passthrough:
+                await self.send(message)
+            return
+        if message_type != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            if not more_body:
+                # Complete body in a single message.
+                if len(body) < self.middleware.minimum_size:
+                    headers = MutableHeaders(raw=self.start_message["headers"])
+                    headers.add_vary_header("Accept-Encoding")
+                    await self.send(self.start_message)
+                    await self.send(message)
+                    return
+                compressor = self.middleware.make_compressor(self.encoding)
+                compressed = compressor.compress(body) + compressor.finish()
+                headers = self._start_compressed()
+                headers["Content-Length"] = str(len(compressed))
+                await self.send(self.start_message)
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            # Streaming response: the total size is unknown, compress chunk by chunk.
+            self.compressor = self.middleware.make_compressor(self.encoding)
+            headers = self._start_compressed()
+            del headers["Content-Length"]
+            await self.send(self.start_message)
+
+        if more_body:
+            chunk = self.compressor.compress(body) + self.compressor.flush()
+            if chunk:
+                await self.send({"type": "http.response.body", "body": chunk, "more_body": True})
+        else:
+            chunk = self.compressor.compress(body) + self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": chunk})
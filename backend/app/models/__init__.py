@@ -2,5 +2,7 @@ from .user import User
 from .team_member import TeamMember
 from .objective import Objective
 from .progress_update import ProgressUpdate
+from .archive import objectives_archive, progress_updates_archive
+from .revoked_token import revoked_tokens
 # If you add other models, import them here as well
 # e.g., from .item import Item
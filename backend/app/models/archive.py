@@ -0,0 +1,26 @@
+"""
+Archive Tables.
+
+The archival job (`python -m app.archive`) moves old inactive or finished
+objectives and their progress updates out of the hot tables into these. Each
+archive table has the columns of its source table, without foreign keys so
+archived rows never block changes to live ones, plus `archived_at`.
+"""
+from sqlalchemy import Column, DateTime, Index, Table
+
+from app.db.base_class import Base
+from app.models.objective import Objective
+from app.models.progress_update import ProgressUpdate
+
+
+def _archive_table(source: Table, name: str) -> Table:
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, autoincrement=False, nullable=column.nullable)
+        for column in source.columns
+    ]
+    return Table(name, Base.metadata, *columns, Column("archived_at", DateTime(timezone=True), nullable=False))
+
+
+objectives_archive = _archive_table(Objective.__table__, "objectives_archive")
+progress_updates_archive = _archive_table(ProgressUpdate.__table__, "progress_updates_archive")
+Index("ix_progress_updates_archive_objective_id", progress_updates_archive.c.objective_id)
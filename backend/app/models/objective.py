@@ -3,9 +3,9 @@ Objective ORM Model.
 
 This module defines the SQLAlchemy ORM model for a 'Objective'.
 """
-from sqlalchemy import String, Text, Integer, ForeignKey, Enum, Date, DateTime
+from sqlalchemy import String, Text, Integer, ForeignKey, Enum, Date, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base_class import Base
+from app.db.base_class import ACTIVE_ROWS_ONLY, Base
 import enum
 
 class ObjectiveLevel(enum.Enum):
@@ -47,12 +47,18 @@ class ObjectiveReviewCadence(enum.Enum):
 
 class Objective(Base):
     __tablename__ = "objectives"
+    __table_args__ = (
+        # Active objectives of an owner (team member pages), optionally counted/filtered by status.
+        Index("ix_objectives_owner_id_status", "owner_id", "status", **ACTIVE_ROWS_ONLY),
+    )
 
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
     level: Mapped[ObjectiveLevel] = mapped_column(Enum(ObjectiveLevel), nullable=True)
     owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("team_members.id"), nullable=False)
-    parent_objective_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("objectives.id"), nullable=True)
+    parent_objective_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("objectives.id"), nullable=True, index=True
+    )
     status: Mapped[ObjectiveStatus] = mapped_column(Enum(ObjectiveStatus), nullable=False)
     priority: Mapped[ObjectivePriority | None] = mapped_column(Enum(ObjectivePriority), nullable=True)
     start_date: Mapped[Date] = mapped_column(Date, nullable=False)
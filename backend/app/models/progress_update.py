@@ -1,15 +1,28 @@
 """
 ProgressUpdate ORM Model.
 """
-from sqlalchemy import Integer, Text, Date, Float, ForeignKey
+from sqlalchemy import Integer, Text, Date, Float, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.db.base_class import Base
 
 class ProgressUpdate(Base):
+    # On PostgreSQL the table is partitioned by RANGE (progress_date) with the primary key
+    # (id, progress_date); see app/db/partitioning.py. Bound progress_date to prune partitions.
     __tablename__ = "progress_updates"
+    __table_args__ = (
+        # Updates of an objective in date order (lists, aggregation); also serves objective_id lookups.
+        # On PostgreSQL the included columns let the aggregation run as an index-only scan.
+        # Not partial: it also serves the foreign-key checks when objectives are archived.
+        Index(
+            "ix_progress_updates_objective_id_progress_date",
+            "objective_id",
+            "progress_date",
+            postgresql_include=["progress", "id", "active"],
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
-    objective_id: Mapped[int] = mapped_column(Integer, ForeignKey("objectives.id"), nullable=False, index=True)
+    objective_id: Mapped[int] = mapped_column(Integer, ForeignKey("objectives.id"), nullable=False)
     progress_date: Mapped[Date] = mapped_column(Date, nullable=False)
     comment: Mapped[str] = mapped_column(Text, nullable=False)
     progress: Mapped[float | None] = mapped_column(Float, nullable=True)
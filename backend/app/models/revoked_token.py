@@ -0,0 +1,22 @@
+"""
+Revoked Tokens Table.
+
+Write-through copy of the in-process revocation store
+(`REVOCATION_BACKEND=memory`, see app/core/revocation.py), so used refresh
+tokens, revoked families and per-user cutoffs survive a restart. One row per
+entry, keyed by its kind (`jti`, `fam` or `user`) and key; rows past
+`expires_at` (a Unix timestamp) are deleted when the store is loaded.
+"""
+from sqlalchemy import Column, Float, Index, Integer, String, Table
+
+from app.db.base_class import Base
+
+revoked_tokens = Table(
+    "revoked_tokens",
+    Base.metadata,
+    Column("kind", String(8), primary_key=True),
+    Column("key", String(64), primary_key=True),
+    Column("issued_before", Integer, nullable=True),  # per-user cutoffs only
+    Column("expires_at", Float, nullable=False),
+)
+Index("ix_revoked_tokens_expires_at", revoked_tokens.c.expires_at)
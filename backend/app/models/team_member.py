@@ -3,13 +3,17 @@ TeamMember ORM Model.
 
 This module defines the SQLAlchemy ORM model for a 'TeamMember'.
 """
-from sqlalchemy import String, Text, Integer, ForeignKey
+from sqlalchemy import String, Text, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from app.db.base_class import Base
+from app.db.base_class import ACTIVE_ROWS_ONLY, Base
 
 
 class TeamMember(Base):
     __tablename__ = "team_members"
+    __table_args__ = (
+        # Active team members by supervisor.
+        Index("ix_team_members_supervisor_id", "supervisor_id", **ACTIVE_ROWS_ONLY),
+    )
 
     first_name: Mapped[str] = mapped_column(String(100), nullable=False)
     last_name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -4,9 +4,9 @@ User ORM Model.
 This module defines the SQLAlchemy ORM model for a 'User'.
 It inherits common fields from the `Base` class and defines user-specific attributes.
 """
-from sqlalchemy import String, Text, Integer, ForeignKey
+from sqlalchemy import String, Text, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column  # For SQLAlchemy 2.0 style type hints
-from app.db.base_class import Base
+from app.db.base_class import ACTIVE_ROWS_ONLY, Base
 
 
 class User(Base):
@@ -23,9 +23,11 @@ class User(Base):
         last_name (Mapped[str | None]): The user's last name (optional).
         hashed_password (Mapped[str]): The user's password, stored in a hashed format.
         note (Mapped[str | None]): An optional note or description for the user.
-        team_member_id (Mapped[int | None]): The ID of the associated team member (optional).
+        team_member_id (Mapped[int | None]): The ID of the associated team member (optional). Indexed (active users
+            only) for lookups by team member.
     """
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_team_member_id", "team_member_id", **ACTIVE_ROWS_ONLY),)
 
     username: Mapped[str] = mapped_column(String(100), unique=True, index=True, nullable=False)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
@@ -1,5 +1,8 @@
 from .user import User, UserCreate, UserUpdate, UserInDB, UserBase, UserInDBBase, UserLogin, Token
-from .team_member import TeamMember, TeamMemberCreate, TeamMemberUpdate, TeamMemberInDB, TeamMemberBase, TeamMemberInDBBase
-from .objective import Objective, ObjectiveCreate, ObjectiveUpdate, ObjectiveInDB, ObjectiveBase, ObjectiveInDBBase
+from .team_member import TeamMember, TeamMemberCreate, TeamMemberImport, TeamMemberUpdate, TeamMemberPatch, TeamMemberInDB, TeamMemberBase, TeamMemberInDBBase
+from .objective import Objective, ObjectiveCreate, ObjectiveUpdate, ObjectivePatch, ObjectiveInDB, ObjectiveBase, ObjectiveInDBBase, ObjectiveStats
 from .progress_update import ProgressUpdate, ProgressUpdateCreate, ProgressUpdateUpdate, ProgressUpdateInDB, ProgressUpdateBase, ProgressUpdateInDBBase
+from .progress_update import ProgressInterval, ProgressBucket, ProgressSeries
 from .rewrite_text import RewriteTextRequest, RewriteTextResponse
+from .batch import BatchGetRequest, BatchResult
+from .bulk_import import ImportRow, ImportResult
@@ -0,0 +1,12 @@
+from typing import Generic, List, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+class BatchGetRequest(BaseModel):
+    ids: List[int]
+
+class BatchResult(BaseModel, Generic[T]):
+    items: List[T]  # found rows, in the order of the requested ids
+    missing: List[int]  # requested ids that do not exist
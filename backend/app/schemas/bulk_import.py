@@ -0,0 +1,15 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+class ImportRow(BaseModel):
+    row: int  # 1-based position of the row in the request
+    id: Optional[int] = None  # id of the created row
+    error: Optional[str] = None  # why the row was not imported
+
+class ImportResult(BaseModel):
+    created: int
+    failed: int
+    seconds: float  # server-side duration of the import
+    rows_per_second: Optional[float] = None  # created rows per second
+    rows: List[ImportRow]  # one result per row, in request order
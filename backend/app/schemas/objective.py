@@ -1,8 +1,10 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from datetime import date, datetime
 from enum import Enum
 
+from app.schemas.patch import PartialUpdate
+
 class ObjectiveLevel(str, Enum):
     ORGANIZATIONAL = "ORGANIZATIONAL"
     DEPARTMENTAL = "DEPARTMENTAL"
@@ -70,9 +72,32 @@ class ObjectiveCreate(ObjectiveBase):
 class ObjectiveUpdate(ObjectiveBase):
     last_updated_date: datetime
 
+class ObjectivePatch(PartialUpdate):
+    """Partial update: only the fields sent are changed."""
+    not_nullable = ("title", "description", "owner_id", "status", "start_date", "target_completion_date")
+
+    title: Optional[str] = None
+    description: Optional[str] = None
+    level: Optional[ObjectiveLevel] = None
+    owner_id: Optional[int] = None
+    parent_objective_id: Optional[int] = None
+    status: Optional[ObjectiveStatus] = None
+    priority: Optional[ObjectivePriority] = None
+    start_date: Optional[date] = None
+    target_completion_date: Optional[date] = None
+    actual_completion_date: Optional[date] = None
+    last_updated_date: Optional[datetime] = None
+    alignment_statement: Optional[str] = None
+    tags: Optional[List[str]] = None
+    confidentiality: Optional[ObjectiveConfidentiality] = None
+    strategic_perspective: Optional[ObjectiveStrategicPerspective] = None
+    review_cadence: Optional[ObjectiveReviewCadence] = None
+    last_review_date: Optional[date] = None
+
 class ObjectiveInDBBase(ObjectiveBase):
     id: int
     last_updated_date: datetime
+    version: int
 
     class Config:
         from_attributes = True
@@ -82,3 +107,12 @@ class Objective(ObjectiveInDBBase):
 
 class ObjectiveInDB(ObjectiveInDBBase):
     pass
+
+class ObjectiveStats(BaseModel):
+    """Active objective counts, in total and per value of each facet."""
+    total: int
+    status: Dict[ObjectiveStatus, int]
+    level: Dict[ObjectiveLevel, int]
+    priority: Dict[ObjectivePriority, int]
+    strategic_perspective: Dict[ObjectiveStrategicPerspective, int]
+    confidentiality: Dict[ObjectiveConfidentiality, int]
@@ -0,0 +1,26 @@
+"""
+Partial Update Bodies.
+
+All fields of a PATCH body are optional, so a client only sends what changes:
+a field left out keeps its value, a field sent as null clears it. Columns that
+are NOT NULL cannot be cleared, so `PartialUpdate` rejects null for the fields
+listed in `not_nullable` with a 422 instead of letting the UPDATE fail.
+"""
+from typing import Any, ClassVar, Tuple
+
+from pydantic import BaseModel, ValidationInfo, field_validator
+
+
+class PartialUpdate(BaseModel):
+    """Base of partial update bodies; see the module docstring."""
+
+    not_nullable: ClassVar[Tuple[str, ...]] = ()
+    """Fields of NOT NULL columns, which may be left out but not sent as null."""
+
+    @field_validator("*")
+    @classmethod
+    def _reject_null(cls, value: Any, info: ValidationInfo) -> Any:
+        # Only runs for fields that were sent; defaults are not validated.
+        if value is None and info.field_name in cls.not_nullable:
+            raise ValueError("may be left out but not set to null")
+        return value
@@ -1,6 +1,9 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
+from enum import Enum
+
+from app.schemas.patch import PartialUpdate
 
 class ProgressUpdateBase(BaseModel):
     objective_id: int
@@ -11,7 +14,9 @@ class ProgressUpdateBase(BaseModel):
 class ProgressUpdateCreate(ProgressUpdateBase):
     pass
 
-class ProgressUpdateUpdate(BaseModel):
+class ProgressUpdateUpdate(PartialUpdate):
+    not_nullable = ("progress_date", "comment")
+
     progress_date: Optional[date] = None
     comment: Optional[str] = None
     progress: Optional[float] = None
@@ -20,6 +25,7 @@ class ProgressUpdateInDBBase(ProgressUpdateBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
     class Config:
         from_attributes = True
@@ -29,3 +35,22 @@ class ProgressUpdate(ProgressUpdateInDBBase):
 
 class ProgressUpdateInDB(ProgressUpdateInDBBase):
     pass
+
+class ProgressInterval(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+    QUARTER = "quarter"
+
+class ProgressBucket(BaseModel):
+    bucket: date  # first day of the day/week (Monday)/month/quarter
+    updates: int
+    last: float  # progress of the latest update in the bucket
+    avg: float
+    min: float
+    max: float
+
+class ProgressSeries(BaseModel):
+    objective_id: int
+    interval: ProgressInterval
+    buckets: List[ProgressBucket]
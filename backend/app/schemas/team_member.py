@@ -2,6 +2,8 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 
+from app.schemas.patch import PartialUpdate
+
 
 class TeamMemberBase(BaseModel):
     first_name: str
@@ -17,14 +19,36 @@ class TeamMemberCreate(TeamMemberBase):
     pass
 
 
+class TeamMemberImport(TeamMemberBase):
+    """
+    A row of a team member import. The supervisor may be given by email instead
+    of id, also as the email of another row of the same import.
+    """
+    supervisor_email: Optional[EmailStr] = None
+
+
 class TeamMemberUpdate(TeamMemberBase):
     pass
 
 
+class TeamMemberPatch(PartialUpdate):
+    """Partial update: only the fields sent are changed."""
+    not_nullable = ("first_name", "last_name", "email")
+
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    position: Optional[str] = None
+    notes: Optional[str] = None
+    supervisor_id: Optional[int] = None
+
+
 class TeamMemberInDBBase(TeamMemberBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
     class Config:
         from_attributes = True
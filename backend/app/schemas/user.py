@@ -9,6 +9,8 @@ from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
 
+from app.schemas.patch import PartialUpdate
+
 # Shared properties
 
 
@@ -47,7 +49,7 @@ class UserCreate(UserBase):
 
 
 # Properties to receive via API on update
-class UserUpdate(UserBase):
+class UserUpdate(UserBase, PartialUpdate):
     """
     Pydantic model for data that can be provided when updating an existing user.
     All fields are optional, allowing partial updates. Inherits from `UserBase`.
@@ -61,6 +63,8 @@ class UserUpdate(UserBase):
     email: Optional[EmailStr] = None  # Allow email update
     username: Optional[str] = None  # Allow username update
 
+    not_nullable = ("email", "username", "active")
+
 
 # Properties shared by models stored in DB
 class UserInDBBase(UserBase):
@@ -73,10 +77,12 @@ class UserInDBBase(UserBase):
         id (int): The unique identifier for the user.
         created_at (datetime): Timestamp of when the user was created.
         updated_at (Optional[datetime]): Timestamp of when the user was last updated.
+        version (int): Row version, incremented by every update; the user's ETag.
     """
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    version: int
 
     class Config:
         """
@@ -0,0 +1,208 @@
+"""
+Production Server.
+
+Runs the API with several uvicorn worker processes behind one listening socket:
+
+    python -m app.serve [--workers N] [--host HOST] [--port PORT]
+
+Defaults come from `Settings` (`SERVER_HOST`, `SERVER_PORT`, `WEB_CONCURRENCY`).
+Each worker is a separate process with its own threadpool (`THREADPOOL_SIZE`)
+and database pool (`DB_POOL_SIZE` + `DB_MAX_OVERFLOW`), so CPU-bound work such
+as bcrypt and JSON serialization scales across cores. uvloop and httptools are
+used when they are installed; otherwise uvicorn falls back to asyncio and h11.
+
+Workers share no memory, so state that must be seen by every worker needs a
+shared backend. With `REVOCATION_BACKEND=memory` a token revoked by logout or a
+password change would stay valid on the other workers, so the server refuses
+to start more than one worker with it (unless `--allow-memory-revocation` is
+given, e.g. for benchmarks without logins). The other per-process backends
+(`CACHE_BACKEND`, `EVENT_BROKER`, `RATE_LIMIT_BACKEND` set to `memory`) only
+get a warning: caches go stale until their TTL, change feeds miss the writes
+of other workers and rate limits apply per worker. `WEB_CONCURRENCY=0` starts
+one worker per CPU core only once none of them is `memory`, and one otherwise.
+
+The supervisor process understands these signals:
+
+- `SIGHUP`: rolling reload. Workers are replaced one at a time, start before
+  stop: a new worker (importing the code and `.env` afresh) is started next to
+  the old one, and only once it has finished its startup and accepts
+  connections on the shared socket is the old worker stopped. The old worker
+  stops accepting connections and gets `GRACEFUL_TIMEOUT_SECONDS` to finish
+  in-flight requests, so even a single worker reloads without downtime. If a
+  new worker fails to start within `WORKER_START_TIMEOUT_SECONDS`, it is
+  stopped, the old one keeps serving and the reload is abandoned.
+- `SIGTTIN` / `SIGTTOU`: add / remove one worker.
+- `SIGINT` / `SIGTERM`: graceful shutdown of all workers.
+"""
+import argparse
+import functools
+import importlib.util
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+from uvicorn.supervisors.multiprocess import Process
+
+from app.core.config import settings
+
+
+SHARED_STATE_BACKENDS = {
+    "REVOCATION_BACKEND": "tokens revoked on one worker stay valid on the others",
+    "CACHE_BACKEND": "writes leave stale entries in the other workers' caches until CACHE_TTL_SECONDS",
+    "EVENT_BROKER": "change feed clients only see the writes of the worker they are connected to",
+    "RATE_LIMIT_BACKEND": "login rate limits and client quotas apply per worker",
+}
+"""Settings selecting where state is kept that all workers must see, and what goes wrong per process."""
+
+
+def per_process_backends() -> List[str]:
+    """The `SHARED_STATE_BACKENDS` settings that keep their state in the process (`memory`)."""
+    return [name for name in SHARED_STATE_BACKENDS if getattr(settings, name).lower() == "memory"]
+
+
+def default_workers() -> int:
+    """
+    Returns `WEB_CONCURRENCY`, or when it is 0 the number of CPU cores, or 1
+    while a backend is still per process.
+    """
+    if settings.WEB_CONCURRENCY > 0:
+        return settings.WEB_CONCURRENCY
+    if per_process_backends():
+        return 1
+    return os.cpu_count() or 1
+
+
+def check_workers(workers: int, allow_memory_revocation: bool = False) -> List[str]:
+    """
+    Checks that the backends suit `workers` worker processes.
+
+    Raises:
+        ValueError: If several workers would use the memory revocation store
+            (and `allow_memory_revocation` is not set).
+
+    Returns:
+        Warnings about the other per-process backends (with several workers).
+    """
+    backends = per_process_backends() if workers > 1 else []
+    if "REVOCATION_BACKEND" in backends and not allow_memory_revocation:
+        raise ValueError(
+            f"{workers} workers with REVOCATION_BACKEND=memory: {SHARED_STATE_BACKENDS['REVOCATION_BACKEND']}. "
+            "Set REVOCATION_BACKEND=redis or run a single worker (WEB_CONCURRENCY=1)."
+        )
+    return [f"{name}=memory with {workers} workers: {SHARED_STATE_BACKENDS[name]}." for name in backends]
+
+
+WORKER_START_TIMEOUT_SECONDS = 60
+"""How long a reload waits for a new worker to accept connections before giving up."""
+
+logger = logging.getLogger("uvicorn.error")
+
+
+class _Worker(uvicorn.Server):
+    """uvicorn server that sets `ready` once its startup has completed and it accepts connections."""
+
+    def __init__(self, config: uvicorn.Config, ready=None):
+        super().__init__(config)
+        self.ready = ready
+
+    async def startup(self, sockets=None) -> None:
+        await super().startup(sockets=sockets)
+        if self.started and self.ready is not None:
+            self.ready.set()
+
+
+def _run_worker(config: uvicorn.Config, ready, sockets=None) -> None:
+    _Worker(config, ready).run(sockets=sockets)
+
+
+class RollingSupervisor(Multiprocess):
+    """
+    uvicorn's process supervisor with a start-before-stop `SIGHUP` reload.
+
+    uvicorn's own reload stops each worker before starting its replacement,
+    which with a single worker leaves nobody accepting connections.
+    """
+
+    def __init__(self, config: uvicorn.Config, sockets: list, start_timeout: float = WORKER_START_TIMEOUT_SECONDS):
+        super().__init__(config, target=functools.partial(_run_worker, config, None), sockets=sockets)
+        self.start_timeout = start_timeout
+
+    def restart_all(self) -> None:
+        for idx, old in enumerate(list(self.processes)):
+            ready = multiprocessing.get_context("spawn").Event()
+            new = Process(self.config, functools.partial(_run_worker, self.config, ready), self.sockets)
+            new.start()
+            if not self._wait_ready(new, ready):
+                logger.error("New worker [%s] failed to start, keeping the old workers", new.pid)
+                new.terminate()
+                new.join()
+                return
+            old.terminate()
+            old.join()
+            self.processes[idx] = new
+
+    def _wait_ready(self, process: Process, ready) -> bool:
+        """Waits until `process` is ready; False if it exits or the start timeout passes first."""
+        deadline = time.monotonic() + self.start_timeout
+        while not ready.wait(0.2):
+            if not process.process.is_alive() or time.monotonic() > deadline:
+                return False
+        return True
+
+
+def build_config(workers: int, host: str, port: int) -> uvicorn.Config:
+    return uvicorn.Config(
+        "app.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
+        proxy_headers=True,
+        timeout_keep_alive=settings.KEEPALIVE_TIMEOUT_SECONDS,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT_SECONDS,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description="Run the API in production mode.")
+    parser.add_argument("--workers", type=int, default=default_workers(), help="Worker processes (WEB_CONCURRENCY).")
+    parser.add_argument("--host", default=settings.SERVER_HOST, help="Bind address (SERVER_HOST).")
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT, help="Bind port (SERVER_PORT).")
+    parser.add_argument(
+        "--allow-memory-revocation",
+        action="store_true",
+        help="Start several workers even with REVOCATION_BACKEND=memory; revocations then only apply per worker.",
+    )
+    args = parser.parse_args(argv)
+
+    workers = max(args.workers, 1)
+    try:
+        warnings = check_workers(workers, args.allow_memory_revocation)
+    except ValueError as exc:
+        parser.error(str(exc))
+    for warning in warnings:
+        print(f"WARNING: {warning}", file=sys.stderr)
+
+    config = build_config(workers, args.host, args.port)
+    print(
+        f"Starting {config.workers} worker(s) on {args.host}:{args.port} "
+        f"(loop={config.loop}, http={config.http}, threadpool={settings.THREADPOOL_SIZE}, "
+        f"db pool={settings.DB_POOL_SIZE}+{settings.DB_MAX_OVERFLOW} per worker)"
+    )
+    # Always run under the process supervisor, even with a single worker, so
+    # that SIGHUP reloads and SIGTTIN/SIGTTOU scaling are available.
+    sock = config.bind_socket()
+    try:
+        RollingSupervisor(config, sockets=[sock]).run()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
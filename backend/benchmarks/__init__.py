@@ -0,0 +1,12 @@
+"""
+Micro-benchmarks for backend hot paths.
+
+Run from the `backend/` directory:
+
+    python -m benchmarks                      # run everything and print a table
+    python -m benchmarks --save baseline.json # record a baseline
+    python -m benchmarks --compare baseline.json --threshold 0.20
+
+When `--compare` is given the command exits with status 1 if any benchmark got
+slower than the baseline by more than the threshold, so it can gate a PR.
+"""
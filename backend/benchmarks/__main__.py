@@ -0,0 +1,43 @@
+"""
+Command line entry point: `python -m benchmarks`.
+"""
+import argparse
+import sys
+
+from benchmarks import harness
+from benchmarks import compression, micro, passwords, rows, tokens  # noqa: F401  (registers the benchmarks)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Run backend micro-benchmarks.")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this string.")
+    parser.add_argument("--rounds", type=int, default=7, help="Timed rounds per benchmark (default: 7).")
+    parser.add_argument("--round-seconds", type=float, default=0.05, help="Target duration of one round.")
+    parser.add_argument("--save", metavar="PATH", help="Write the results to a JSON baseline file.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare the results against a JSON baseline file.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.20,
+        help="Allowed slowdown of the median before failing, as a fraction (default: 0.20).",
+    )
+    args = parser.parse_args(argv)
+
+    results = harness.run_all(args.filter, rounds=args.rounds, round_seconds=args.round_seconds)
+    print(harness.format_table(results, baseline_path=args.compare))
+
+    if args.save:
+        harness.save_results(args.save, results)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        regressions = harness.compare_results(args.compare, results, args.threshold)
+        if regressions:
+            print(f"\nRegressions above {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions above {args.threshold:.0%}.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Response compression benchmarks.
+
+Registers per-encoding timing benchmarks for typical objective list pages and,
+when run directly (`python -m benchmarks.compression`), prints a table of CPU
+time versus bytes saved for every encoding and level.
+"""
+from typing import List
+
+from pydantic import TypeAdapter
+
+from benchmarks.harness import benchmark, time_callable
+from benchmarks.micro import _objective_dict
+
+from app import schemas
+from app.middleware.compression import CompressionMiddleware, available_encodings
+
+PAGE_SIZES = (20, 100, 1000)
+LEVELS = {"gzip": (1, 6, 9), "br": (1, 4, 11), "zstd": (1, 3, 19)}
+DEFAULT_LEVELS = {"gzip": 6, "br": 4, "zstd": 3}  # the COMPRESSION_* defaults in Settings
+
+
+def objective_page(size: int) -> bytes:
+    """Serializes a page of `size` objectives exactly like the list endpoint does."""
+    adapter = TypeAdapter(List[schemas.Objective])
+    return adapter.dump_json(adapter.validate_python([_objective_dict(i) for i in range(size)]))
+
+
+def _compress_once(encoding: str, level: int, body: bytes) -> bytes:
+    middleware = CompressionMiddleware(
+        None, encodings=[encoding], gzip_level=level, brotli_quality=level, zstd_level=level
+    )
+    compressor = middleware.make_compressor(encoding)
+    return compressor.compress(body) + compressor.finish()
+
+
+def _register(encoding: str, level: int, size: int) -> None:
+    @benchmark(f"compression.{encoding}-{level}.objectives_{size}")
+    def setup():
+        body = objective_page(size)
+        return lambda: _compress_once(encoding, level, body)
+
+
+# Only the default levels are tracked for regressions; `report()` covers the rest.
+for _encoding in available_encodings():
+    _register(_encoding, DEFAULT_LEVELS[_encoding], 100)
+
+
+def report() -> str:
+    """Returns a table of compressed size, ratio and CPU time per page for each setting."""
+    lines = [f"{'page':>6}  {'encoding':<10}  {'bytes':>9}  {'ratio':>6}  {'cpu/page':>10}  {'MB/s':>8}"]
+    for size in PAGE_SIZES:
+        body = objective_page(size)
+        lines.append(f"{size:>6}  {'identity':<10}  {len(body):>9}  {1.0:>6.2f}  {'-':>10}  {'-':>8}")
+        for encoding in available_encodings():
+            for level in LEVELS[encoding]:
+                result = time_callable(
+                    f"{encoding}-{level}", lambda: _compress_once(encoding, level, body), rounds=3
+                )
+                compressed = len(_compress_once(encoding, level, body))
+                throughput = len(body) / (result.median_us / 1e6) / 1e6
+                lines.append(
+                    f"{size:>6}  {encoding + '-' + str(level):<10}  {compressed:>9}  "
+                    f"{len(body) / compressed:>6.2f}  {result.median_us:>8.1f}us  {throughput:>8.1f}"
+                )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(report())
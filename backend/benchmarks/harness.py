@@ -0,0 +1,145 @@
+"""
+Benchmark Harness.
+
+A tiny, dependency-free runner in the spirit of pytest-benchmark. Benchmarks are
+plain functions registered with the `benchmark` decorator; each one may return a
+zero-argument callable (the timed body) after doing its own setup.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional
+
+# The application reads its settings at import time; make sure benchmarks can
+# import it without a .env file and never touch a real database.
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("OPENAI_API_KEY", "")
+os.environ.setdefault("SQLALCHEMY_DATABASE_URL", "sqlite://")
+
+_REGISTRY: Dict[str, Callable[[], Callable[[], object]]] = {}
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark setup function under `name`.
+
+    The decorated function is called once per run; it must return the callable
+    that is actually timed.
+    """
+    def decorator(setup: Callable[[], Callable[[], object]]):
+        _REGISTRY[name] = setup
+        return setup
+    return decorator
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    rounds: int
+    iterations: int
+    min_us: float
+    median_us: float
+    mean_us: float
+    stdev_us: float
+
+
+def _calibrate(func: Callable[[], object], target_seconds: float) -> int:
+    """Finds an iteration count so that one round takes roughly `target_seconds`."""
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= target_seconds or iterations >= 1_000_000:
+            return iterations
+        if elapsed <= 0:
+            iterations *= 10
+        else:
+            iterations = max(iterations + 1, int(iterations * target_seconds / elapsed * 1.1))
+
+
+def run_one(name: str, rounds: int = 7, round_seconds: float = 0.05) -> BenchmarkResult:
+    """Runs a single registered benchmark and returns per-call timings in microseconds."""
+    return time_callable(name, _REGISTRY[name](), rounds=rounds, round_seconds=round_seconds)
+
+
+def time_callable(
+    name: str, func: Callable[[], object], rounds: int = 7, round_seconds: float = 0.05
+) -> BenchmarkResult:
+    """Times an arbitrary zero-argument callable the same way registered benchmarks are timed."""
+    func()  # warm up caches, lazy imports and mapper configuration
+    iterations = _calibrate(func, round_seconds)
+    samples: List[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        samples.append((time.perf_counter() - start) / iterations * 1e6)
+    return BenchmarkResult(
+        name=name,
+        rounds=rounds,
+        iterations=iterations,
+        min_us=min(samples),
+        median_us=statistics.median(samples),
+        mean_us=statistics.fmean(samples),
+        stdev_us=statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    )
+
+
+def run_all(pattern: Optional[str] = None, rounds: int = 7, round_seconds: float = 0.05) -> List[BenchmarkResult]:
+    names = sorted(n for n in _REGISTRY if pattern is None or pattern in n)
+    return [run_one(name, rounds=rounds, round_seconds=round_seconds) for name in names]
+
+
+def save_results(path: str, results: List[BenchmarkResult]) -> None:
+    data = {
+        "python": sys.version.split()[0],
+        "machine": platform.machine(),
+        "results": {r.name: asdict(r) for r in results},
+    }
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+
+
+def compare_results(baseline_path: str, results: List[BenchmarkResult], threshold: float) -> List[str]:
+    """
+    Compares `results` against a saved baseline.
+
+    The median is used for comparison because it is robust against the odd
+    scheduler hiccup. Returns a list of human readable regression messages.
+    """
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)["results"]
+    regressions = []
+    for result in results:
+        previous = baseline.get(result.name)
+        if not previous:
+            continue
+        change = result.median_us / previous["median_us"] - 1.0
+        if change > threshold:
+            regressions.append(
+                f"{result.name}: {previous['median_us']:.2f}us -> {result.median_us:.2f}us (+{change:.0%})"
+            )
+    return regressions
+
+
+def format_table(results: List[BenchmarkResult], baseline_path: Optional[str] = None) -> str:
+    baseline = {}
+    if baseline_path:
+        with open(baseline_path, encoding="utf-8") as fh:
+            baseline = json.load(fh)["results"]
+    width = max([len(r.name) for r in results] + [len("benchmark")])
+    lines = [f"{'benchmark':<{width}}  {'median':>12}  {'min':>12}  {'stdev':>10}  {'change':>8}"]
+    for r in results:
+        change = ""
+        if r.name in baseline:
+            change = f"{r.median_us / baseline[r.name]['median_us'] - 1.0:+.0%}"
+        lines.append(
+            f"{r.name:<{width}}  {r.median_us:>10.2f}us  {r.min_us:>10.2f}us  {r.stdev_us:>8.2f}us  {change:>8}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,229 @@
+"""
+Hot-path micro-benchmarks.
+
+Covers JWT creation/verification, Pydantic validation and serialization of the
+list response schemas, the CRUD read functions against an in-memory SQLite
+database and the rewrite-text prompt construction.
+"""
+import itertools
+from datetime import date, datetime
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.harness import benchmark
+
+from app import crud, models, schemas
+from app.core.security import create_access_token, verify_token
+from app.db.base_class import Base
+
+PAGE_SIZE = 100
+SEED_ROWS = 500
+FAKE_PASSWORD_HASH = "$2b$12$" + "x" * 53  # never verified, hashing is benchmarked elsewhere
+
+
+def _objective_dict(i: int) -> dict:
+    return {
+        "id": i,
+        "title": f"Objective {i}",
+        "description": "Grow recurring revenue in the DACH region by expanding the partner channel. " * 3,
+        "level": "TEAM",
+        "owner_id": i % 50 + 1,
+        "parent_objective_id": None,
+        "status": "ON_TRACK",
+        "priority": "HIGH",
+        "start_date": date(2025, 1, 1),
+        "target_completion_date": date(2025, 12, 31),
+        "actual_completion_date": None,
+        "alignment_statement": "Supports the company-wide growth objective.",
+        "tags": ["growth", "sales"],
+        "confidentiality": "INTERNAL",
+        "strategic_perspective": "CUSTOMER",
+        "review_cadence": "QUARTERLY",
+        "last_review_date": None,
+        "last_updated_date": datetime(2025, 5, 10, 12, 0, 0),
+        "version": 1,
+    }
+
+
+def _user_dict(i: int) -> dict:
+    return {
+        "id": i,
+        "email": f"user{i}@example.com",
+        "username": f"user{i}",
+        "first_name": "Jane",
+        "last_name": f"Doe {i}",
+        "note": None,
+        "active": True,
+        "team_member_id": i,
+        "created_at": datetime(2025, 5, 10, 12, 0, 0),
+        "updated_at": None,
+        "version": 1,
+    }
+
+
+def seed_rows(db) -> None:
+    """Inserts SEED_ROWS team members, users and objectives plus progress updates."""
+    db.add_all(
+        models.TeamMember(
+            id=i, first_name="Team", last_name=f"Member {i}", email=f"member{i}@example.com",
+            supervisor_id=(i // 10) or None,
+        )
+        for i in range(1, SEED_ROWS + 1)
+    )
+    db.add_all(
+        models.User(
+            id=i, username=f"user{i}", email=f"user{i}@example.com", hashed_password=FAKE_PASSWORD_HASH,
+            team_member_id=i,
+        )
+        for i in range(1, SEED_ROWS + 1)
+    )
+    for i in range(1, SEED_ROWS + 1):
+        data = _objective_dict(i)
+        data["tags"] = None
+        db.add(models.Objective(**data))
+    db.add_all(
+        models.ProgressUpdate(
+            objective_id=i % 50 + 1, progress_date=date(2025, 1 + i % 12, 1 + i % 28),
+            comment="Weekly check-in", progress=float(i % 100),
+        )
+        for i in range(1, SEED_ROWS * 4 + 1)
+    )
+    db.commit()
+
+
+_session_factory = None
+
+
+def _sessions():
+    """Creates (once) an in-memory SQLite database seeded with representative rows."""
+    global _session_factory
+    if _session_factory is not None:
+        return _session_factory
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with factory() as db:
+        seed_rows(db)
+    _session_factory = factory
+    return factory
+
+
+# --- Security -------------------------------------------------------------
+
+
+@benchmark("security.create_access_token")
+def bench_create_access_token():
+    claims = {"sub": "42", "username": "jane.doe"}
+    return lambda: create_access_token(claims)
+
+
+@benchmark("security.verify_token")
+def bench_verify_token():
+    token = create_access_token({"sub": "42", "username": "jane.doe"})
+    return lambda: verify_token(token, token_type="access")
+
+
+# --- Schemas --------------------------------------------------------------
+
+_objective_list = TypeAdapter(List[schemas.Objective])
+_user_list = TypeAdapter(List[schemas.User])
+
+
+@benchmark("schemas.objective_list.validate")
+def bench_objective_list_validate():
+    rows = [_objective_dict(i) for i in range(PAGE_SIZE)]
+    return lambda: _objective_list.validate_python(rows)
+
+
+@benchmark("schemas.objective_list.dump_json")
+def bench_objective_list_dump():
+    items = _objective_list.validate_python([_objective_dict(i) for i in range(PAGE_SIZE)])
+    return lambda: _objective_list.dump_json(items)
+
+
+@benchmark("schemas.user_list.validate")
+def bench_user_list_validate():
+    rows = [_user_dict(i) for i in range(PAGE_SIZE)]
+    return lambda: _user_list.validate_python(rows)
+
+
+@benchmark("schemas.user_list.dump_json")
+def bench_user_list_dump():
+    items = _user_list.validate_python([_user_dict(i) for i in range(PAGE_SIZE)])
+    return lambda: _user_list.dump_json(items)
+
+
+# --- CRUD (SQLite in-memory, one session per call like a request) ---------
+
+
+def _crud_call(fn, ids):
+    factory = _sessions()
+    ids = itertools.cycle(ids)
+
+    def run():
+        with factory() as db:
+            return fn(db, next(ids))
+    return run
+
+
+@benchmark("crud.get_objective")
+def bench_get_objective():
+    return _crud_call(lambda db, i: crud.get_objective(db, objective_id=i), range(1, SEED_ROWS + 1))
+
+
+@benchmark("crud.get_objectives.page")
+def bench_get_objectives():
+    return _crud_call(lambda db, skip: crud.get_objectives(db, skip=skip, limit=PAGE_SIZE), [0, 100, 200, 300])
+
+
+@benchmark("crud.get_team_member")
+def bench_get_team_member():
+    return _crud_call(lambda db, i: crud.get_team_member(db, member_id=i), range(1, SEED_ROWS + 1))
+
+
+@benchmark("crud.get_team_members.page")
+def bench_get_team_members():
+    return _crud_call(lambda db, skip: crud.get_team_members(db, skip=skip, limit=PAGE_SIZE), [0, 100, 200, 300])
+
+
+@benchmark("crud.get_user")
+def bench_get_user():
+    return _crud_call(lambda db, i: crud.get_user(db, user_id=i), range(1, SEED_ROWS + 1))
+
+
+@benchmark("crud.get_user_by_username")
+def bench_get_user_by_username():
+    return _crud_call(
+        lambda db, name: crud.get_user_by_username(db, username=name),
+        [f"user{i}" for i in range(1, SEED_ROWS + 1)],
+    )
+
+
+@benchmark("crud.get_users.page")
+def bench_get_users():
+    return _crud_call(lambda db, skip: crud.get_users(db, skip=skip, limit=PAGE_SIZE), [0, 100, 200, 300])
+
+
+@benchmark("crud.get_progress_updates_by_objective")
+def bench_get_progress_updates_by_objective():
+    return _crud_call(
+        lambda db, i: crud.get_progress_updates_by_objective(db, i, skip=0, limit=PAGE_SIZE), range(1, 51)
+    )
+
+
+# --- Rewrite text ---------------------------------------------------------
+
+
+@benchmark("rewrite_text.build_prompt")
+def bench_build_rewrite_prompt():
+    from app.api.endpoints.rewrite_text import build_rewrite_prompt
+
+    original = "Increase customer satisfaction scores by improving onboarding. " * 20
+    instructions = "Keep it short and use bullet points."
+    return lambda: build_rewrite_prompt(original, instructions)
@@ -0,0 +1,94 @@
+"""
+Password hashing benchmarks.
+
+Registers hash/verify benchmarks of the configured password policy and, when
+run directly, prints the cost of a hash and a verify for a range of bcrypt
+work factors and argon2id parameters (argon2id only if `argon2-cffi` is
+installed), to pick `PASSWORD_BCRYPT_ROUNDS` / `PASSWORD_ARGON2_*` against the
+login latency budget:
+
+    python -m benchmarks.passwords
+    python -m benchmarks.passwords --bcrypt-rounds 10 12 14 --argon2 2:19456:1 3:65536:4
+
+Each login costs one verify, plus one hash when the stored hash is upgraded.
+"""
+import argparse
+from typing import Callable, List, Sequence, Tuple
+
+from benchmarks.harness import benchmark, time_callable
+
+from app.core.security import get_password_hash, verify_and_update_password
+
+PASSWORD = "correct horse battery staple"
+BCRYPT_ROUNDS = (10, 11, 12, 13)
+ARGON2_PARAMETERS = ((2, 19456, 1), (3, 65536, 4))
+"""argon2id `(time_cost, memory_cost KiB, parallelism)` presets: the OWASP minimum and the default."""
+
+
+@benchmark("passwords.hash")
+def bench_hash():
+    return lambda: get_password_hash(PASSWORD)
+
+
+@benchmark("passwords.verify")
+def bench_verify():
+    hashed = get_password_hash(PASSWORD)
+    return lambda: verify_and_update_password(PASSWORD, hashed)
+
+
+def _handlers(
+    bcrypt_rounds: Sequence[int], argon2_parameters: Sequence[Tuple[int, int, int]]
+) -> List[Tuple[str, object]]:
+    """The passlib handlers of the settings to compare, by name; argon2id only if its backend is installed."""
+    from passlib.exc import MissingBackendError
+    from passlib.hash import argon2, bcrypt
+
+    handlers: List[Tuple[str, object]] = [
+        (f"bcrypt rounds={rounds}", bcrypt.using(rounds=rounds)) for rounds in bcrypt_rounds
+    ]
+    try:
+        argon2.get_backend()
+    except MissingBackendError:
+        return handlers
+    for time_cost, memory_cost, parallelism in argon2_parameters:
+        handler = argon2.using(type="ID", time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+        handlers.append((f"argon2id t={time_cost} m={memory_cost}KiB p={parallelism}", handler))
+    return handlers
+
+
+def report(
+    bcrypt_rounds: Sequence[int] = BCRYPT_ROUNDS,
+    argon2_parameters: Sequence[Tuple[int, int, int]] = ARGON2_PARAMETERS,
+    rounds: int = 3,
+) -> str:
+    """Returns a table of the hash and verify time per hashing setting."""
+    handlers = _handlers(bcrypt_rounds, argon2_parameters)
+    width = max(len(name) for name, _ in handlers)
+    lines = [f"{'setting':<{width}}  {'hash':>10}  {'verify':>10}  {'logins/s/core':>13}"]
+    for name, handler in handlers:
+        hashed = handler.hash(PASSWORD)
+        operations: List[Callable[[], object]] = [
+            lambda: handler.hash(PASSWORD), lambda: handler.verify(PASSWORD, hashed)
+        ]
+        hash_ms, verify_ms = (
+            time_callable(name, operation, rounds=rounds, round_seconds=0).median_us / 1000 for operation in operations
+        )
+        lines.append(f"{name:<{width}}  {hash_ms:>8.1f}ms  {verify_ms:>8.1f}ms  {1000 / verify_ms:>13.1f}")
+    return "\n".join(lines)
+
+
+def _argon2_parameters(value: str) -> Tuple[int, int, int]:
+    time_cost, memory_cost, parallelism = (int(part) for part in value.split(":"))
+    return time_cost, memory_cost, parallelism
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.passwords", description=__doc__.splitlines()[1])
+    parser.add_argument("--bcrypt-rounds", type=int, nargs="*", default=list(BCRYPT_ROUNDS))
+    parser.add_argument(
+        "--argon2", type=_argon2_parameters, nargs="*", default=list(ARGON2_PARAMETERS),
+        metavar="TIME:MEMORY_KIB:PARALLELISM",
+    )
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per setting (default: 3).")
+    args = parser.parse_args()
+    print(report(args.bcrypt_rounds, args.argon2, args.rounds))
@@ -0,0 +1,133 @@
+"""
+Read row benchmarks: ORM instances versus lightweight rows.
+
+Registers benchmarks loading a 10,000-row page of objectives and team members
+from an in-memory SQLite database, once as ORM instances (the `get_objectives`
+/ `get_team_members` path on a cache miss) and once as the named tuple rows of
+app/crud/rows.py, each in a fresh session like a request. When run directly,
+prints the latency of loading and of loading plus serializing the page with
+the response schema, and the memory the loaded page holds and peaks at:
+
+    python -m benchmarks.rows
+    python -m benchmarks.rows --rows 1000
+"""
+import argparse
+import tracemalloc
+from datetime import date, datetime
+from typing import Callable, List, Tuple
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.harness import benchmark, time_callable
+
+from app import models, schemas
+from app.crud.rows import fetch_rows, select_rows
+from app.db.base_class import Base
+
+PAGE_ROWS = 10_000
+MODELS = {
+    "objectives": (models.Objective, schemas.Objective),
+    "team_members": (models.TeamMember, schemas.TeamMember),
+}
+
+_session_factories = {}
+
+
+def _sessions(rows: int = PAGE_ROWS):
+    """Creates (once per size) an in-memory SQLite database with `rows` team members and objectives."""
+    factory = _session_factories.get(rows)
+    if factory is not None:
+        return factory
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(models.TeamMember), [
+            {"id": i, "first_name": "Team", "last_name": f"Member {i}", "email": f"member{i}@example.com",
+             "position": "Engineer", "supervisor_id": (i // 10) or None}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(models.Objective), [
+            {"id": i, "title": f"Objective {i}", "description": "Grow recurring revenue via partners. " * 3,
+             "level": "TEAM", "owner_id": i % rows + 1, "status": "ON_TRACK", "priority": "HIGH",
+             "start_date": date(2025, 1, 1), "target_completion_date": date(2025, 12, 31),
+             "alignment_statement": "Supports the company-wide growth objective.", "confidentiality": "INTERNAL",
+             "strategic_perspective": "CUSTOMER", "review_cadence": "QUARTERLY",
+             "last_updated_date": datetime(2025, 5, 10, 12, 0, 0)}
+            for i in range(1, rows + 1)
+        ])
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    _session_factories[rows] = factory
+    return factory
+
+
+def _loaders(model: type, rows: int) -> List[Tuple[str, Callable[[], list]]]:
+    """The ORM and the row path loading one page of `model`, each in a fresh session."""
+    factory = _sessions(rows)
+
+    def orm() -> list:
+        with factory() as db:
+            return db.scalars(select(model).where(model.active).limit(rows)).all()
+
+    def lightweight() -> list:
+        with factory() as db:
+            return fetch_rows(db, model, select_rows(model).where(model.active).limit(rows))
+
+    return [("orm", orm), ("rows", lightweight)]
+
+
+def _register(name: str, model: type) -> None:
+    for path in ("orm", "rows"):
+        # The database is seeded when the benchmark runs, not when this module is imported
+        @benchmark(f"rows.{name}.{path}")
+        def bench(path=path):
+            return dict(_loaders(model, PAGE_ROWS))[path]
+
+
+for _name, (_model, _) in MODELS.items():
+    _register(_name, _model)
+
+
+def _memory(load: Callable[[], list]) -> Tuple[int, int]:
+    """Bytes allocated by a page that are still held while it is in use, and the peak during loading."""
+    load()  # warm up statement caches and row types
+    tracemalloc.start()
+    try:
+        page = load()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del page
+    return retained, peak
+
+
+def report(rows: int = PAGE_ROWS, rounds: int = 5) -> str:
+    """Returns a table of the latency and memory of each path per model."""
+    lines = [
+        f"{'page':<14}  {'path':<5}  {'load':>9}  {'load+json':>10}  {'retained':>10}  {'peak':>10}  {'per row':>8}"
+    ]
+    for name, (model, schema) in MODELS.items():
+        adapter = TypeAdapter(List[schema])
+        for path, load in _loaders(model, rows):
+            def load_and_dump(load=load):
+                return adapter.dump_json(adapter.validate_python(load(), from_attributes=True))
+            load_ms = time_callable(f"{name}.{path}", load, rounds=rounds, round_seconds=0).median_us / 1000
+            dump_ms = time_callable(
+                f"{name}.{path}.json", load_and_dump, rounds=rounds, round_seconds=0
+            ).median_us / 1000
+            retained, peak = _memory(load)
+            lines.append(
+                f"{name:<14}  {path:<5}  {load_ms:>7.1f}ms  {dump_ms:>8.1f}ms  "
+                f"{retained / 1024:>8.0f}KiB  {peak / 1024:>8.0f}KiB  {retained / rows:>7.0f}B"
+            )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.rows", description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=PAGE_ROWS, help=f"Rows per page (default: {PAGE_ROWS}).")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per path (default: 5).")
+    args = parser.parse_args()
+    print(report(args.rows, args.rounds))
@@ -0,0 +1,188 @@
+"""
+End-to-end throughput benchmark for the production server.
+
+Starts `python -m app.serve` against a seeded SQLite file once per requested
+worker count, drives it with keep-alive HTTP clients for a fixed duration and
+prints requests per second and latency percentiles:
+
+    python -m benchmarks.throughput --workers 1,2,4 --duration 10
+
+The load generator runs on the same machine and competes with the server for
+CPU; on small machines pin it elsewhere (e.g. `taskset`) or point `--url` at a
+server started separately, in which case `--workers` is only used as a label.
+"""
+import argparse
+import http.client
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks import harness  # noqa: F401  (sets the environment defaults)
+
+DEFAULT_PATHS = ["/api/v1/objectives/?limit=20", "/api/v1/team-members/?limit=20"]
+
+
+def _seed_database(path: str) -> None:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+
+    from app.db.base_class import Base
+    from benchmarks.micro import seed_rows
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        seed_rows(db)
+    engine.dispose()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_ready(host: str, port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=1)
+            conn.request("GET", "/")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server on port {port} did not become ready within {timeout:.0f}s")
+
+
+def _client(host: str, port: int, paths: List[str], duration: float, connections: int) -> Tuple[List[float], int]:
+    """Runs `connections` keep-alive clients in threads; returns latencies (ms) and error count."""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(offset: int):
+        conn = http.client.HTTPConnection(host, port, timeout=30)
+        local: List[float] = []
+        i = offset
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                conn = http.client.HTTPConnection(host, port, timeout=30)
+                ok = False
+            if ok:
+                local.append((time.perf_counter() - start) * 1000)
+            else:
+                with lock:
+                    errors[0] += 1
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(connections)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def measure(url: str, paths: List[str], duration: float, concurrency: int, clients: int) -> dict:
+    """Drives the server at `url` and returns throughput and latency figures."""
+    parts = urlsplit(url)
+    per_client = max(concurrency // clients, 1)
+    with ProcessPoolExecutor(max_workers=clients) as pool:
+        futures = [
+            pool.submit(_client, parts.hostname, parts.port, paths, duration, per_client) for _ in range(clients)
+        ]
+        results = [future.result() for future in futures]
+    latencies = sorted(ms for result in results for ms in result[0])
+    errors = sum(result[1] for result in results)
+    if not latencies:
+        raise RuntimeError("no successful requests")
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+    }
+
+
+def run_server(workers: int, database: str, port: int) -> subprocess.Popen:
+    # All requests come from one IP, so the per-client quotas would reject most of them
+    env = dict(
+        os.environ, SQLALCHEMY_DATABASE_URL=f"sqlite:///{database}", WEB_CONCURRENCY=str(workers), CLIENT_RATE_LIMITS=""
+    )
+    return subprocess.Popen(
+        # No logins in the benchmark, so the per-process revocation store is fine with several workers
+        [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port), "--allow-memory-revocation"],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.throughput", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts (default: 1,2,4).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load per run (default: 10).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent connections (default: 32).")
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1, help="Load generator processes.")
+    parser.add_argument("--path", action="append", help="Request path, may be repeated (default: list endpoints).")
+    parser.add_argument("--url", help="Benchmark an already running server instead of starting one.")
+    args = parser.parse_args(argv)
+    paths = args.path or DEFAULT_PATHS
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        database = os.path.join(tmp, "throughput.db")
+        if not args.url:
+            _seed_database(database)
+        for workers in (int(n) for n in args.workers.split(",")):
+            server: Optional[subprocess.Popen] = None
+            url = args.url
+            if not url:
+                port = _free_port()
+                server = run_server(workers, database, port)
+                url = f"http://127.0.0.1:{port}"
+            try:
+                parts = urlsplit(url)
+                _wait_until_ready(parts.hostname, parts.port)
+                measure(url, paths, min(args.duration, 2.0), args.concurrency, args.clients)  # warm up
+                rows.append((workers, measure(url, paths, args.duration, args.concurrency, args.clients)))
+            finally:
+                if server is not None:
+                    server.send_signal(signal.SIGTERM)
+                    server.wait(timeout=60)
+
+    print(f"cpu cores: {os.cpu_count()}, concurrency: {args.concurrency}, paths: {', '.join(paths)}")
+    print(f"{'workers':>7}  {'req/s':>9}  {'req/s/worker':>12}  {'p50':>9}  {'p99':>9}  {'errors':>6}")
+    for workers, r in rows:
+        print(
+            f"{workers:>7}  {r['rps']:>9.0f}  {r['rps'] / workers:>12.0f}  "
+            f"{r['p50_ms']:>7.1f}ms  {r['p99_ms']:>7.1f}ms  {r['errors']:>6}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+JWT signing and verification benchmarks.
+
+Registers sign/verify benchmarks of the token service for every supported
+algorithm and, when run directly (`python -m benchmarks.tokens`), prints the
+per-token cost of each algorithm next to python-jose's, which resolves the key
+on every call:
+
+    python -m benchmarks.tokens
+"""
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519, rsa
+from jose import jwt as jose_jwt
+
+from benchmarks.harness import benchmark, time_callable
+
+from app.core.tokens import HMACKey, SigningKey, TokenService, load_pem_key
+
+ALGORITHMS = ("HS256", "ES256", "RS256", "EdDSA")
+SECRET = "benchmark-secret-key"
+CLAIMS = {"sub": "42", "username": "jane.doe", "type": "access"}
+
+
+def _claims() -> dict:
+    return {**CLAIMS, "iat": int(time.time()), "exp": int(time.time()) + 3600}
+
+
+def _private_pem(algorithm: str) -> Optional[bytes]:
+    if algorithm == "HS256":
+        return None
+    private_key = {
+        "ES256": lambda: ec.generate_private_key(ec.SECP256R1()),
+        "RS256": lambda: rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        "EdDSA": ed25519.Ed25519PrivateKey.generate,
+    }[algorithm]()
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+
+
+def _service(algorithm: str) -> Tuple[TokenService, Optional[bytes]]:
+    pem = _private_pem(algorithm)
+    key: SigningKey = HMACKey(SECRET) if pem is None else load_pem_key(pem)
+    return TokenService(key), pem
+
+
+def _register(algorithm: str) -> None:
+    @benchmark(f"tokens.{algorithm}.sign")
+    def bench_sign():
+        service, _ = _service(algorithm)
+        claims = _claims()
+        return lambda: service.encode(claims)
+
+    @benchmark(f"tokens.{algorithm}.verify")
+    def bench_verify():
+        service, _ = _service(algorithm)
+        token = service.encode(_claims())
+        return lambda: service.decode(token)
+
+
+for _algorithm in ALGORITHMS:
+    _register(_algorithm)
+
+
+def _jose_callables(algorithm: str, pem: Optional[bytes]) -> Dict[str, Callable[[], object]]:
+    """python-jose equivalents, keyed by operation; EdDSA is not supported by python-jose."""
+    if algorithm == "EdDSA":
+        return {}
+    if pem is None:
+        signing_key = verifying_key = SECRET
+    else:
+        private_key = serialization.load_pem_private_key(pem, password=None)
+        signing_key = pem.decode()
+        verifying_key = private_key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        ).decode()
+    claims = _claims()
+    token = jose_jwt.encode(claims, signing_key, algorithm=algorithm)
+    return {
+        "sign": lambda: jose_jwt.encode(claims, signing_key, algorithm=algorithm),
+        "verify": lambda: jose_jwt.decode(token, verifying_key, algorithms=[algorithm]),
+    }
+
+
+def report() -> str:
+    """Returns a table of the per-token sign and verify cost per algorithm and library."""
+    lines = [f"{'algorithm':<10}  {'operation':<9}  {'token service':>14}  {'python-jose':>12}  {'speed-up':>8}"]
+    for algorithm in ALGORITHMS:
+        service, pem = _service(algorithm)
+        claims = _claims()
+        token = service.encode(claims)
+        ours = {"sign": lambda: service.encode(claims), "verify": lambda: service.decode(token)}
+        jose = _jose_callables(algorithm, pem)
+        for operation, func in ours.items():
+            ours_us = time_callable(f"{algorithm}.{operation}", func, rounds=5).median_us
+            if operation in jose:
+                jose_us = time_callable(f"jose.{algorithm}.{operation}", jose[operation], rounds=5).median_us
+                jose_cell, ratio = f"{jose_us:>10.1f}us", f"{jose_us / ours_us:>7.1f}x"
+            else:
+                jose_cell, ratio = f"{'n/a':>12}", f"{'-':>8}"
+            lines.append(f"{algorithm:<10}  {operation:<9}  {ours_us:>12.1f}us  {jose_cell}  {ratio}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(report())
@@ -0,0 +1,222 @@
+"""
+Query plan check.
+
+Seeds a scratch database, calls every read endpoint (and the crud lookups used
+by authentication) while recording the SQL they emit, then EXPLAINs each
+statement and fails if any of them scans a table sequentially for more rows
+than `--threshold`:
+
+    python -m scripts.check_query_plans                              # SQLite scratch file
+    python -m scripts.check_query_plans --database-url postgresql://...  # empty scratch database!
+
+- PostgreSQL: runs `EXPLAIN (ANALYZE, FORMAT JSON)` with `enable_seqscan = off`,
+  so a remaining Seq Scan means no usable index exists; the rows it actually
+  examined are compared against the threshold.
+- SQLite: `EXPLAIN QUERY PLAN` has no row counts, so a full `SCAN` of a table
+  with more rows than the threshold is reported when the statement filters
+  (has a WHERE clause); pagination that only skips inactive rows is a scan by
+  design.
+
+Statements that aggregate over a whole table on purpose are listed in
+`ALLOWED_FULL_SCANS`. The tables are created from the models, so run the check
+after changing indexes in the models and migrations alike.
+
+On PostgreSQL progress_updates is partitioned like the migration does
+(`app.db.partitioning`), so its plans are those of production; partition
+pruning itself is covered by tests/test_partitioning.py.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Callable, List, Tuple
+
+# The app reads its settings at import time; never cache, so every probe hits the database.
+os.environ.setdefault("SECRET_KEY", "query-plan-check")
+os.environ.setdefault("OPENAI_API_KEY", "")
+os.environ["CACHE_BACKEND"] = "none"
+
+ALLOWED_FULL_SCANS = {
+    # (count, max(id), max(changed_at)) fingerprint behind the list ETag
+    "team_members.list",
+    # dashboard counts over all objectives
+    "objectives.stats",
+}
+"""Probes whose statements are allowed to scan a whole table."""
+
+ACTIVE_ONLY = re.compile(r"\bWHERE\s+\w+\.active = 1\s+(LIMIT|OFFSET|ORDER)\b", re.IGNORECASE)
+"""Matches list pages whose only filter is the soft-delete flag."""
+
+
+def _seed(engine, rows: int) -> None:
+    from sqlalchemy import insert
+    from app import models
+    from app.models.objective import ObjectiveLevel, ObjectiveStatus
+
+    members = max(rows // 10, 10)
+    with engine.begin() as conn:
+        conn.execute(insert(models.TeamMember), [
+            {"id": i, "first_name": "Team", "last_name": f"Member {i}", "email": f"member{i}@example.com",
+             "supervisor_id": (i // 10) or None, "active": True}
+            for i in range(1, members + 1)
+        ])
+        conn.execute(insert(models.User), [
+            {"id": i, "username": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x",
+             "team_member_id": i, "active": True}
+            for i in range(1, members + 1)
+        ])
+        conn.execute(insert(models.Objective), [
+            {"id": i, "title": f"Objective {i}", "description": "d", "owner_id": i % members + 1,
+             "parent_objective_id": (i // 5) or None, "level": ObjectiveLevel.TEAM, "status": ObjectiveStatus.ON_TRACK,
+             "start_date": date(2025, 1, 1), "target_completion_date": date(2025, 12, 31),
+             "last_updated_date": datetime(2025, 1, 1), "active": True}
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(insert(models.ProgressUpdate), [
+            {"id": i, "objective_id": i % rows + 1, "progress_date": date(2023, 1, 1) + timedelta(days=i % 1095),
+             "comment": "c", "progress": float(i % 100), "active": True}
+            for i in range(1, rows * 5 + 1)
+        ])
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("ANALYZE")
+
+
+def _probes(client, db) -> List[Tuple[str, Callable[[], object]]]:
+    from app import crud
+
+    return [
+        ("objectives.list", lambda: client.get("/api/v1/objectives/?skip=0&limit=100")),
+        ("objectives.get", lambda: client.get("/api/v1/objectives/42")),
+        ("objectives.stats", lambda: client.get("/api/v1/objectives/stats")),
+        ("objectives.stats_subtree", lambda: client.get("/api/v1/objectives/stats?owner_id=7")),
+        ("objectives.progress_updates", lambda: client.get("/api/v1/objectives/42/progress-updates")),
+        ("team_members.list", lambda: client.get("/api/v1/team-members/?limit=100")),
+        ("team_members.get", lambda: client.get("/api/v1/team-members/7")),
+        ("team_members.by_supervisor", lambda: client.get("/api/v1/team-members/by-supervisor/7")),
+        ("team_members.objectives", lambda: client.get("/api/v1/team-members/7/objectives")),
+        ("users.list", lambda: client.get("/api/v1/users/?limit=100")),
+        ("users.get", lambda: client.get("/api/v1/users/7")),
+        ("users.by_team_member", lambda: client.get("/api/v1/users/by-team-member/7")),
+        ("users.by_username", lambda: crud.get_user_by_username(db, "user7")),
+        ("users.by_email", lambda: crud.get_user_by_email(db, "user7@example.com")),
+        ("progress_updates.list", lambda: client.get("/api/v1/progress-updates/?limit=100")),
+        ("progress_updates.get", lambda: client.get("/api/v1/progress-updates/42")),
+        ("progress_updates.by_objective", lambda: client.get("/api/v1/progress-updates/by-objective/42")),
+        ("progress_updates.aggregate", lambda: client.get(
+            "/api/v1/progress-updates/aggregate?objective_ids=42&objective_ids=43&interval=month"
+        )),
+        ("progress_updates.by_objective_range", lambda: client.get(
+            "/api/v1/progress-updates/by-objective/42?start=2025-03-01&end=2025-03-31"
+        )),
+        ("progress_updates.aggregate_range", lambda: client.get(
+            "/api/v1/progress-updates/aggregate?objective_ids=42&interval=week&start=2024-01-01&end=2024-06-30"
+        )),
+    ]
+
+
+def _postgres_violations(conn, statement, parameters, threshold: int) -> List[str]:
+    plan = conn.exec_driver_sql("EXPLAIN (ANALYZE, FORMAT JSON) " + statement, parameters).scalar()
+    violations = []
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        stack.extend(node.get("Plans", []))
+        if node["Node Type"] != "Seq Scan":
+            continue
+        examined = (node["Actual Rows"] + node.get("Rows Removed by Filter", 0)) * node["Actual Loops"]
+        if examined > threshold:
+            violations.append(f"Seq Scan on {node['Relation Name']} examined {examined} rows")
+    return violations
+
+
+def _sqlite_violations(conn, statement, parameters, threshold: int, table_rows) -> List[str]:
+    if not re.search(r"\bWHERE\b", statement, re.IGNORECASE) or ACTIVE_ONLY.search(statement):
+        return []
+    violations = []
+    for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters):
+        match = re.match(r"SCAN (\w+)", row[-1])
+        if match and "USING" not in row[-1]:
+            table = match.group(1)  # may also be a subquery or CTE, which has no row count of its own
+            if table_rows(table) > threshold:
+                violations.append(f"full SCAN of {table} ({table_rows(table)} rows)")
+    return violations
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m scripts.check_query_plans", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", help="Empty scratch database to seed (default: a temporary SQLite file).")
+    parser.add_argument("--rows", type=int, default=20000, help="Objectives to seed (default: 20000).")
+    parser.add_argument("--threshold", type=int, default=1000, help="Allowed rows per sequential scan.")
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.TemporaryDirectory()
+    url = args.database_url or f"sqlite:///{os.path.join(tmp.name, 'plans.db')}"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = url
+
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event, text
+    from app.db.base_class import Base
+    from app.db.session import SessionLocal, engine
+    from app.main import app
+
+    Base.metadata.create_all(bind=engine)
+    _seed(engine, args.rows)
+    if engine.dialect.name == "postgresql":
+        from app.db import partitioning
+
+        with engine.begin() as conn:
+            for statement in partitioning.convert_statements():
+                conn.execute(text(statement))
+            conn.exec_driver_sql("ANALYZE")
+
+    captured: List[Tuple[str, str, object]] = []
+    current = [None]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if current[0] is not None and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            captured.append((current[0], statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    with TestClient(app) as client, SessionLocal() as db:
+        for name, probe in _probes(client, db):
+            current[0] = name
+            response = probe()
+            current[0] = None
+            status = getattr(response, "status_code", 200)
+            if status != 200:
+                print(f"{name}: unexpected status {status}")
+                return 2
+    event.remove(engine, "before_cursor_execute", record)
+
+    failures = 0
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            conn.exec_driver_sql("SET enable_seqscan = off")
+
+        def table_rows(table: str) -> int:
+            if table not in Base.metadata.tables:
+                return 0
+            return conn.exec_driver_sql(f"SELECT count(*) FROM {table}").scalar()
+
+        for name, statement, parameters in captured:
+            if engine.dialect.name == "postgresql":
+                violations = _postgres_violations(conn, statement, parameters, args.threshold)
+            else:
+                violations = _sqlite_violations(conn, statement, parameters, args.threshold, table_rows)
+            if not violations:
+                print(f"ok    {name}")
+            elif name in ALLOWED_FULL_SCANS:
+                print(f"allow {name}: {'; '.join(violations)}")
+            else:
+                failures += 1
+                print(f"FAIL  {name}: {'; '.join(violations)}\n      {' '.join(statement.split())}")
+    engine.dispose()
+    tmp.cleanup()
+    print(f"\n{len(captured)} statements checked, {failures} with sequential scans above {args.threshold} rows")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Test configuration: the app runs against a fresh SQLite database file, set up
+before `app` is imported (the engine is created at import time).
+"""
+import os
+import tempfile
+
+import pytest
+
+_db_dir = tempfile.mkdtemp(prefix="okr-tests-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("OPENAI_API_KEY", "")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app, create_db_and_tables  # noqa: E402
+
+API = "/api/v1"
+
+
+@pytest.fixture(scope="session")
+def client() -> TestClient:
+    create_db_and_tables()
+    with TestClient(app) as test_client:
+        yield test_client
@@ -0,0 +1,48 @@
+"""Admission control: per-client quotas."""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import MemoryRateLimitBackend
+from app.core.security import create_access_token, verify_token
+from app.middleware import AdmissionControlMiddleware
+
+
+def _client(capacity: int) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/items")
+    def items():
+        return []
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        rate_limiter=MemoryRateLimitBackend(),
+        quotas={"default": (capacity, 60)},
+        verify_token=verify_token,
+    )
+    return TestClient(app)
+
+
+def test_made_up_tokens_are_charged_to_the_ip():
+    client = _client(capacity=3)
+
+    statuses = [
+        client.get("/items", headers={"Authorization": f"Bearer fake-{i}"}).status_code for i in range(10)
+    ]
+
+    assert statuses == [200] * 3 + [429] * 7
+
+
+def test_valid_tokens_get_a_quota_per_user():
+    client = _client(capacity=3)
+    for _ in range(3):
+        assert client.get("/items").status_code == 200
+    assert client.get("/items").status_code == 429
+
+    token = create_access_token({"sub": "1", "username": "ada"})
+    statuses = [client.get("/items", headers={"Authorization": f"Bearer {token}"}).status_code for _ in range(4)]
+    assert statuses == [200] * 3 + [429]
+
+    # Another token of the same user shares the quota
+    other = create_access_token({"sub": "1", "username": "ada", "nonce": "x"})
+    assert client.get("/items", headers={"Authorization": f"Bearer {other}"}).status_code == 429
@@ -0,0 +1,33 @@
+"""Read-through cache: reads from a lagging replica must not fill it."""
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import crud, models
+from app.core.cache import cache
+from app.db.base_class import Base
+from app.db.session import SessionLocal, from_replica
+from tests.conftest import API
+
+
+def test_replica_reads_are_not_cached(client):
+    member = client.post(
+        f"{API}/team-members/", json={"first_name": "New", "last_name": "Name", "email": "replica@example.com"}
+    ).json()
+
+    # A replica that has not seen the write yet
+    replica = create_engine("sqlite://")
+    Base.metadata.create_all(bind=replica)
+    with replica.begin() as conn:
+        conn.execute(insert(models.TeamMember).values(
+            id=member["id"], first_name="Old", last_name="Name", email="replica@example.com"
+        ))
+    cache.invalidate(crud.crud_team_member.CACHE_NAMESPACE, member["id"])
+
+    with Session(bind=replica, info={"replica": True}) as replica_db:
+        assert from_replica(replica_db)
+        assert crud.get_team_member(replica_db, member["id"]).first_name == "Old"
+        assert [m.first_name for m in crud.get_team_members_by_ids(replica_db, [member["id"]])] == ["Old"]
+
+    with SessionLocal() as db:
+        assert not from_replica(db)
+        assert crud.get_team_member(db, member["id"]).first_name == "New"
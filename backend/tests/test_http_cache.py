@@ -0,0 +1,22 @@
+"""Conditional GETs of list endpoints."""
+from tests.conftest import API
+
+
+def test_team_member_list_etag_changes_on_updates_within_one_second(client):
+    member = client.post(
+        f"{API}/team-members/", json={"first_name": "A0", "last_name": "Tick", "email": "tick@example.com"}
+    ).json()
+    url = f"{API}/team-members/?limit=1000"
+
+    # SQLite's CURRENT_TIMESTAMP has second resolution, so both updates share
+    # one `updated_at` unless the clock ticks between them
+    assert client.patch(f"{API}/team-members/{member['id']}", json={"first_name": "A1"}).status_code == 200
+    first = client.get(url)
+    assert client.patch(f"{API}/team-members/{member['id']}", json={"first_name": "A2"}).status_code == 200
+
+    second = client.get(url, headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.headers["etag"] != first.headers["etag"]
+    assert {m["first_name"] for m in second.json() if m["id"] == member["id"]} == {"A2"}
+
+    assert client.get(url, headers={"If-None-Match": second.headers["etag"]}).status_code == 304
@@ -0,0 +1,71 @@
+"""Partial updates: conditional writes, null fields and empty bodies."""
+import itertools
+
+from tests.conftest import API
+
+_ids = itertools.count(1)
+
+
+def _objective(client, description: str = "Grow revenue.") -> dict:
+    n = next(_ids)
+    member = client.post(
+        f"{API}/team-members/", json={"first_name": "Ada", "last_name": "Lovelace", "email": f"patch{n}@example.com"}
+    )
+    assert member.status_code == 201, member.text
+    objective = client.post(f"{API}/objectives/", json={
+        "title": f"Objective {n}", "description": description, "level": "TEAM", "owner_id": member.json()["id"],
+        "status": "ON_TRACK", "start_date": "2025-01-01", "target_completion_date": "2025-12-31",
+        "last_updated_date": "2025-01-01T00:00:00",
+    })
+    assert objective.status_code == 201, objective.text
+    return objective.json()
+
+
+def test_if_match_accepts_etag_of_compressed_response(client):
+    objective = _objective(client, description="Grow recurring revenue via partners. " * 100)
+
+    read = client.get(f"{API}/objectives/{objective['id']}", headers={"Accept-Encoding": "gzip"})
+    assert read.headers["content-encoding"] == "gzip"
+    assert read.headers["etag"] == 'W/"v1"'
+
+    patched = client.patch(
+        f"{API}/objectives/{objective['id']}", json={"title": "Renamed"}, headers={"If-Match": read.headers["etag"]}
+    )
+    assert patched.status_code == 200, patched.text
+    assert patched.json()["version"] == 2
+
+    stale = client.patch(
+        f"{API}/objectives/{objective['id']}", json={"title": "Again"}, headers={"If-Match": read.headers["etag"]}
+    )
+    assert stale.status_code == 412
+
+
+def test_null_for_not_null_column_is_rejected(client):
+    objective = _objective(client)
+
+    for field in ("title", "status", "owner_id"):
+        response = client.patch(f"{API}/objectives/{objective['id']}", json={field: None})
+        assert response.status_code == 422, response.text
+        assert response.json()["detail"][0]["loc"] == ["body", field]
+
+    cleared = client.patch(f"{API}/objectives/{objective['id']}", json={"priority": None})
+    assert cleared.status_code == 200
+    assert cleared.json()["priority"] is None
+
+    update = client.post(f"{API}/progress-updates/", json={
+        "objective_id": objective["id"], "progress_date": "2025-02-01", "comment": "Kickoff", "progress": 10,
+    }).json()
+    response = client.patch(f"{API}/progress-updates/{update['id']}", json={"comment": None})
+    assert response.status_code == 422, response.text
+
+
+def test_empty_patch_writes_nothing(client):
+    objective = _objective(client)
+
+    response = client.patch(f"{API}/objectives/{objective['id']}", json={}, headers={"If-Match": '"v1"'})
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+    assert client.get(f"{API}/objectives/{objective['id']}").json()["version"] == 1
+
+    assert client.patch(f"{API}/objectives/{objective['id']}", json={}, headers={"If-Match": '"v9"'}).status_code == 412
+    assert client.patch(f"{API}/objectives/999999", json={}).status_code == 404
@@ -0,0 +1,82 @@
+"""
+Token revocation: the revocation store (app/core/revocation.py) and how the
+authentication endpoints use it.
+"""
+import time
+from types import SimpleNamespace
+
+from app.core import security
+from app.core.revocation import MemoryRevocationStore
+from app.db.session import engine
+from tests.conftest import API
+
+
+def test_memory_store_revocations_survive_a_restart(client):
+    store = MemoryRevocationStore(engine=engine)
+    store.clear()
+    expires_at = time.time() + 3600
+    assert store.use_token("used-jti", expires_at)
+    store.revoke_family("stolen-family", expires_at)
+    store.revoke_user(42, 1000, expires_at)
+    store.revoke_family("expired-family", time.time() - 1)
+
+    restarted = MemoryRevocationStore(engine=engine)
+    assert restarted.load() == 3  # the expired entry is dropped
+
+    assert not restarted.use_token("used-jti", expires_at)
+    assert restarted.is_revoked(7, 2000, family="stolen-family")
+    assert restarted.is_revoked(42, 999)
+    assert not restarted.is_revoked(42, 1000)
+    assert not restarted.is_revoked(7, 2000, family="expired-family")
+    restarted.clear()
+
+
+def _login(client, username: str) -> dict:
+    response = client.post(f"{API}/users/login", json={"username": username, "password": "old-password"})
+    assert response.status_code == 200
+    return response.json()
+
+
+def _create_user(client, username: str) -> None:
+    response = client.post(
+        f"{API}/users/", json={"email": f"{username}@example.com", "username": username, "password": "old-password"}
+    )
+    assert response.status_code == 201
+
+
+def test_refresh_token_reuse_revokes_the_family(client):
+    _create_user(client, "reuse")
+    first = _login(client, "reuse")["refresh_token"]
+    other_login = _login(client, "reuse")["refresh_token"]
+
+    rotated = client.post(f"{API}/users/refresh-token", params={"refresh_token": first})
+    assert rotated.status_code == 200
+    second = rotated.json()["refresh_token"]
+
+    # The used token comes back (stolen): refused, and the token rotated from it is revoked too
+    assert client.post(f"{API}/users/refresh-token", params={"refresh_token": first}).status_code == 401
+    assert client.post(f"{API}/users/refresh-token", params={"refresh_token": second}).status_code == 401
+    # Other logins are separate families
+    assert client.post(f"{API}/users/refresh-token", params={"refresh_token": other_login}).status_code == 200
+
+
+def test_password_change_revokes_tokens_issued_before(client, monkeypatch):
+    _create_user(client, "changer")
+    # Tokens issued within the second of the change stay valid, so issue these a few seconds earlier
+    issued_at = time.time() - 5
+    monkeypatch.setattr(security, "time", SimpleNamespace(time=lambda: issued_at))
+    old = _login(client, "changer")
+    monkeypatch.undo()
+
+    changed = client.post(
+        f"{API}/users/change-password",
+        json={"current_password": "old-password", "new_password": "new-password"},
+        headers={"Authorization": f"Bearer {old['access_token']}"},
+    )
+    assert changed.status_code == 200
+
+    assert client.get(f"{API}/users/me", headers={"Authorization": f"Bearer {old['access_token']}"}).status_code == 401
+    assert client.post(f"{API}/users/refresh-token", params={"refresh_token": old["refresh_token"]}).status_code == 401
+    me = client.get(f"{API}/users/me", headers={"Authorization": f"Bearer {changed.json()['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["username"] == "changer"
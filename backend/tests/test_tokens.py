@@ -0,0 +1,131 @@
+"""JWT signing and verification (app/core/tokens.py)."""
+import json
+import time
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, rsa
+from jose import jwt
+from jose.exceptions import ExpiredSignatureError, JWTError
+
+from app.core import tokens
+from app.core.tokens import ES256Key, HMACKey, RS256Key, TokenService, _b64encode
+
+SECRET = "test-token-secret"
+
+
+@pytest.fixture(scope="module")
+def rsa_key() -> RS256Key:
+    return RS256Key(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+
+
+@pytest.fixture(scope="module")
+def ec_key() -> ES256Key:
+    return ES256Key(ec.generate_private_key(ec.SECP256R1()))
+
+
+def _claims(**claims):
+    return {"sub": "1", "type": "access", "exp": int(time.time()) + 600, **claims}
+
+
+def _unsigned(header: dict, claims: dict, signature: bytes = b"") -> str:
+    encode = lambda value: _b64encode(json.dumps(value).encode())  # noqa: E731
+    return f"{encode(header)}.{encode(claims)}.{_b64encode(signature)}"
+
+
+@pytest.mark.parametrize("key_fixture", ["rsa_key", "ec_key"])
+def test_hmac_token_keyed_with_the_public_key_is_rejected(request, key_fixture):
+    key = request.getfixturevalue(key_fixture)
+    service = TokenService(key)
+    public_pem = key.public_key.public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ).decode()
+
+    # The classic confusion: HS256 with the (public) verification key as the secret, under the key's kid
+    forged = TokenService(HMACKey(public_pem, kid=key.kid)).encode(_claims())
+
+    with pytest.raises(JWTError, match="algorithm"):
+        service.decode(forged)
+
+
+@pytest.mark.parametrize("kid", [None, "signing"])
+def test_alg_none_is_rejected(rsa_key, kid):
+    for service in (TokenService(HMACKey(SECRET)), TokenService(rsa_key)):
+        header = {"alg": "none", "typ": "JWT"}
+        if kid:
+            header["kid"] = service.signing_key.kid
+        with pytest.raises(JWTError):
+            service.decode(_unsigned(header, _claims()))
+
+
+def test_token_signed_with_another_algorithm_for_the_kid_is_rejected(rsa_key, ec_key):
+    service = TokenService(rsa_key, [ec_key])
+    token = TokenService(ES256Key(ec_key.private_key, kid=rsa_key.kid)).encode(_claims())
+
+    with pytest.raises(JWTError, match="algorithm"):
+        service.decode(token)
+
+
+def test_unknown_kid_is_rejected(rsa_key, ec_key):
+    other = RS256Key(rsa.generate_private_key(public_exponent=65537, key_size=2048))
+    token = TokenService(other).encode(_claims())
+
+    with pytest.raises(JWTError, match="Unknown signing key"):
+        TokenService(rsa_key, [ec_key]).decode(token)
+
+
+def test_rotated_out_key_still_verifies(rsa_key, ec_key):
+    token = TokenService(ec_key).encode(_claims())
+
+    assert TokenService(rsa_key, [ES256Key(public_key=ec_key.public_key)]).decode(token)["sub"] == "1"
+
+
+@pytest.mark.parametrize("key_fixture", [None, "rsa_key", "ec_key"])
+def test_tampered_token_is_rejected(request, key_fixture):
+    service = TokenService(request.getfixturevalue(key_fixture) if key_fixture else HMACKey(SECRET))
+    header, payload, signature = service.encode(_claims()).split(".")
+    elevated = _b64encode(json.dumps(_claims(sub="2")).encode())
+    flipped = signature[:-2] + ("A" if signature[-2] != "A" else "B") + signature[-1]
+
+    for token in (f"{header}.{elevated}.{signature}", f"{header}.{payload}.{flipped}", f"{header}.{payload}."):
+        with pytest.raises(JWTError, match="Signature verification failed"):
+            service.decode(token)
+
+
+def test_expired_token_is_rejected():
+    service = TokenService(HMACKey(SECRET))
+
+    with pytest.raises(ExpiredSignatureError):
+        service.decode(service.encode(_claims(exp=int(time.time()) - 1)))
+
+
+def test_token_before_nbf_is_rejected():
+    service = TokenService(HMACKey(SECRET))
+
+    with pytest.raises(JWTError, match="not yet valid"):
+        service.decode(service.encode(_claims(nbf=int(time.time()) + 60)))
+    assert service.decode(service.encode(_claims(nbf=int(time.time()) - 60)))["sub"] == "1"
+
+
+@pytest.mark.parametrize("algorithm", ["HS256", "HS384", "HS512"])
+def test_python_jose_hmac_tokens_without_kid_still_verify(algorithm):
+    legacy = jwt.encode(_claims(iat=int(time.time())), SECRET, algorithm=algorithm)
+
+    assert "kid" not in jwt.get_unverified_header(legacy)
+    assert TokenService(HMACKey(SECRET, alg=algorithm)).decode(legacy)["sub"] == "1"
+    # and tokens issued now still verify with python-jose, for services that have not moved on
+    assert jwt.decode(TokenService(HMACKey(SECRET, alg=algorithm)).encode(_claims()), SECRET, algorithms=[algorithm])
+
+
+@pytest.mark.parametrize("algorithm, supported", [("HS256", True), ("HS384", True), ("HS512", True), ("RS512", False)])
+def test_startup_accepts_the_hmac_algorithms(monkeypatch, algorithm, supported):
+    monkeypatch.setattr(tokens.settings, "ALGORITHM", algorithm)
+    tokens.get_token_service.cache_clear()
+    try:
+        if supported:
+            assert tokens.get_token_service().algorithm == algorithm
+        else:
+            with pytest.raises(ValueError, match="Unsupported ALGORITHM"):
+                tokens.get_token_service()
+    finally:
+        tokens.get_token_service.cache_clear()